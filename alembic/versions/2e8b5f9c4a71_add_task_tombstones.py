@@ -0,0 +1,45 @@
+"""add task tombstones
+
+Revision ID: 2e8b5f9c4a71
+Revises: 9a4f2c7d3e15
+Create Date: 2026-10-17 21:14:37.508214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e8b5f9c4a71'
+down_revision: Union[str, None] = '9a4f2c7d3e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_tombstones',
+    sa.Column('task_uuid', sa.Uuid(), nullable=False),
+    sa.Column('user_uuid', sa.Uuid(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_uuid'], ['users.uuid'], ),
+    sa.PrimaryKeyConstraint('task_uuid')
+    )
+    op.create_index('ix_task_tombstones_user_uuid_deleted_at_task_uuid', 'task_tombstones',
+                    ['user_uuid', 'deleted_at', 'task_uuid'], unique=False)
+    op.create_index('ix_task_tombstones_deleted_at', 'task_tombstones', ['deleted_at'], unique=False)
+    # Built concurrently so writes to a large tasks table are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_user_uuid_updated_at_uuid', 'tasks', ['user_uuid', 'updated_at', 'uuid'],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_user_uuid_updated_at_uuid', table_name='tasks', postgresql_concurrently=True)
+    op.drop_index('ix_task_tombstones_deleted_at', table_name='task_tombstones')
+    op.drop_index('ix_task_tombstones_user_uuid_deleted_at_task_uuid', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
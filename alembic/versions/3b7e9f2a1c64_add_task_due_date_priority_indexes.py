@@ -0,0 +1,33 @@
+"""add task due date and priority indexes
+
+Revision ID: 3b7e9f2a1c64
+Revises: 8d2c4e1b7a93
+Create Date: 2026-10-17 14:20:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e9f2a1c64'
+down_revision: Union[str, None] = '8d2c4e1b7a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so writes to a large tasks table are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_user_uuid_due_date_uuid', 'tasks', ['user_uuid', 'due_date', 'uuid'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_tasks_user_uuid_priority_uuid', 'tasks', ['user_uuid', 'priority', 'uuid'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_user_uuid_priority_uuid', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_uuid_due_date_uuid', table_name='tasks', postgresql_concurrently=True)
@@ -0,0 +1,46 @@
+"""add task counters
+
+Revision ID: 5c1d8a6e4f27
+Revises: 3b7e9f2a1c64
+Create Date: 2026-10-17 16:05:12.402957
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1d8a6e4f27'
+down_revision: Union[str, None] = '3b7e9f2a1c64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_counters',
+    sa.Column('user_uuid', sa.Uuid(), nullable=False),
+    sa.Column('dimension', sa.String(), nullable=False),
+    sa.Column('bucket', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_uuid'], ['users.uuid'], ),
+    sa.PrimaryKeyConstraint('user_uuid', 'dimension', 'bucket')
+    )
+    # Backfill from the existing tasks; jobs.reconcile_counters catches up on
+    # anything written while this runs
+    op.execute("""
+        INSERT INTO task_counters (user_uuid, dimension, bucket, count)
+        SELECT user_uuid, 'status', status, count(*) FROM tasks GROUP BY user_uuid, status
+        UNION ALL
+        SELECT user_uuid, 'priority', CAST(priority AS VARCHAR), count(*) FROM tasks GROUP BY user_uuid, priority
+    """)
+    op.create_index('ix_tasks_user_uuid_due_date_open', 'tasks', ['user_uuid', 'due_date'], unique=False,
+                    postgresql_where=sa.text("status <> 'completed'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_user_uuid_due_date_open', table_name='tasks', postgresql_where=sa.text("status <> 'completed'"))
+    op.drop_table('task_counters')
@@ -0,0 +1,50 @@
+"""order task changes by transaction id
+
+Revision ID: 6f3a9d2b8c40
+Revises: 2e8b5f9c4a71
+Create Date: 2026-10-17 23:02:11.640193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f3a9d2b8c40'
+down_revision: Union[str, None] = '2e8b5f9c4a71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows get 0, below any sync token; the app stamps new writes.
+    # A constant default makes adding the column a catalog-only change.
+    op.add_column('tasks', sa.Column('change_xid', sa.BigInteger(), server_default='0', nullable=False))
+    op.alter_column('tasks', 'change_xid', server_default=None)
+    op.add_column('task_tombstones', sa.Column('deleted_xid', sa.BigInteger(), server_default='0', nullable=False))
+    op.alter_column('task_tombstones', 'deleted_xid', server_default=None)
+
+    op.drop_index('ix_task_tombstones_user_uuid_deleted_at_task_uuid', table_name='task_tombstones')
+    op.create_index('ix_task_tombstones_user_uuid_deleted_xid_task_uuid', 'task_tombstones',
+                    ['user_uuid', 'deleted_xid', 'task_uuid'], unique=False)
+    # Built concurrently so writes to a large tasks table are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_user_uuid_change_xid_uuid', 'tasks', ['user_uuid', 'change_xid', 'uuid'],
+                        unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_uuid_updated_at_uuid', table_name='tasks', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_user_uuid_updated_at_uuid', 'tasks', ['user_uuid', 'updated_at', 'uuid'],
+                        unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_uuid_change_xid_uuid', table_name='tasks', postgresql_concurrently=True)
+    op.drop_index('ix_task_tombstones_user_uuid_deleted_xid_task_uuid', table_name='task_tombstones')
+    op.create_index('ix_task_tombstones_user_uuid_deleted_at_task_uuid', 'task_tombstones',
+                    ['user_uuid', 'deleted_at', 'task_uuid'], unique=False)
+    op.drop_column('task_tombstones', 'deleted_xid')
+    op.drop_column('tasks', 'change_xid')
@@ -0,0 +1,39 @@
+"""add task search vector
+
+Revision ID: 8d2c4e1b7a93
+Revises: f16adc04a559
+Create Date: 2026-10-17 11:02:17.530811
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2c4e1b7a93'
+down_revision: Union[str, None] = 'f16adc04a559'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Lets the GIN index lead with user_uuid, so a search only walks the user's own postings
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    # Stored generated column: adding it rewrites the tasks table once
+    op.add_column('tasks', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))", persisted=True),
+        nullable=True,
+    ))
+    op.create_index('ix_tasks_user_uuid_search_vector', 'tasks', ['user_uuid', 'search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_user_uuid_search_vector', table_name='tasks', postgresql_using='gin')
+    op.drop_column('tasks', 'search_vector')
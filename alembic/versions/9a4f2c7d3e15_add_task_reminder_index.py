@@ -0,0 +1,32 @@
+"""add task reminder index
+
+Revision ID: 9a4f2c7d3e15
+Revises: 5c1d8a6e4f27
+Create Date: 2026-10-17 18:31:09.774120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f2c7d3e15'
+down_revision: Union[str, None] = '5c1d8a6e4f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so writes to a large tasks table are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_due_date_uuid_open', 'tasks', ['due_date', 'uuid'], unique=False,
+                        postgresql_where=sa.text("status <> 'completed'"), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_due_date_uuid_open', table_name='tasks', postgresql_concurrently=True)
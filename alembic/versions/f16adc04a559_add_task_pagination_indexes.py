@@ -0,0 +1,33 @@
+"""add task pagination indexes
+
+Revision ID: f16adc04a559
+Revises: 0fd6759938d8
+Create Date: 2026-10-17 09:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f16adc04a559'
+down_revision: Union[str, None] = '0fd6759938d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so writes to a large tasks table are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_user_uuid_status_created_at_uuid', 'tasks', ['user_uuid', 'status', 'created_at', 'uuid'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_tasks_user_uuid_created_at_uuid', 'tasks', ['user_uuid', 'created_at', 'uuid'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_user_uuid_created_at_uuid', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_uuid_status_created_at_uuid', table_name='tasks', postgresql_concurrently=True)
@@ -1,9 +1,12 @@
 from fastapi import APIRouter
 
+from .admin import admin_router
 from .auth import auth_router
+from .metrics import metrics_router
 from .task import task_router
 
 router = APIRouter(prefix=f"/v1")
 
 router.include_router(auth_router)
-router.include_router(task_router)
\ No newline at end of file
+router.include_router(task_router)
+router.include_router(admin_router)
\ No newline at end of file
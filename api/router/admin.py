@@ -0,0 +1,186 @@
+import secrets
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from core.config import Config
+from db.database import async_pool_metrics, pool_metrics
+from db.pool import pool_stats
+from db.redis import redis_client
+from schema.response import ErrorResponse, SuccessResponse
+from service.password_hasher import password_hasher
+from service.task_cache import task_cache
+from service.user import user_service
+from service.user_cache import user_cache
+from utils.response import success_response
+
+
+def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """
+    Dependency guarding the admin routes with the ADMIN_API_KEY setting.
+    The routes are disabled entirely when no key is configured.
+    """
+    if not Config.ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_key or not secrets.compare_digest(x_admin_key, Config.ADMIN_API_KEY):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin key")
+
+
+admin_router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@admin_router.get(
+    "/cache/users",
+    status_code=status.HTTP_200_OK,
+    response_model=SuccessResponse,
+    responses={
+        403: {
+            'model': ErrorResponse,
+            'description': 'Forbidden, when the X-Admin-Key header is missing or wrong'
+        }
+    }
+)
+async def user_cache_stats():
+    return success_response(
+        data=user_cache.stats(),
+        message="User cache stats retrieved successfully",
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@admin_router.get(
+    "/cache/tasks",
+    status_code=status.HTTP_200_OK,
+    response_model=SuccessResponse,
+    responses={
+        403: {
+            'model': ErrorResponse,
+            'description': 'Forbidden, when the X-Admin-Key header is missing or wrong'
+        }
+    }
+)
+async def task_cache_stats():
+    return success_response(
+        data=task_cache.stats(),
+        message="Task cache stats retrieved successfully",
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@admin_router.get(
+    "/password-hasher",
+    status_code=status.HTTP_200_OK,
+    response_model=SuccessResponse,
+    responses={
+        403: {
+            'model': ErrorResponse,
+            'description': 'Forbidden, when the X-Admin-Key header is missing or wrong'
+        }
+    }
+)
+async def password_hasher_stats():
+    return success_response(
+        data=password_hasher.stats(),
+        message="Password hasher stats retrieved successfully",
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@admin_router.get(
+    "/db/pool",
+    status_code=status.HTTP_200_OK,
+    response_model=SuccessResponse,
+    responses={
+        403: {
+            'model': ErrorResponse,
+            'description': 'Forbidden, when the X-Admin-Key header is missing or wrong'
+        }
+    }
+)
+async def db_pool_stats():
+    return success_response(
+        data=pool_stats({"sync": pool_metrics, "async": async_pool_metrics}),
+        message="Database pool stats retrieved successfully",
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@admin_router.post(
+    "/users/{user_uuid}/revoke",
+    status_code=status.HTTP_200_OK,
+    response_model=SuccessResponse,
+    responses={
+        403: {
+            'model': ErrorResponse,
+            'description': 'Forbidden, when the X-Admin-Key header is missing or wrong'
+        }
+    }
+)
+async def revoke_user(user_uuid: UUID):
+    await user_service.revoke_user(user_uuid)
+    return success_response(
+        data=None,
+        message="User access tokens revoked successfully",
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@admin_router.get(
+    "/cache/tokens",
+    status_code=status.HTTP_200_OK,
+    response_model=SuccessResponse,
+    responses={
+        403: {
+            'model': ErrorResponse,
+            'description': 'Forbidden, when the X-Admin-Key header is missing or wrong'
+        }
+    }
+)
+async def token_cache_stats():
+    return success_response(
+        data=user_service.tokenCache.stats(),
+        message="Token cache stats retrieved successfully",
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@admin_router.delete(
+    "/cache/tokens",
+    status_code=status.HTTP_200_OK,
+    response_model=SuccessResponse,
+    responses={
+        403: {
+            'model': ErrorResponse,
+            'description': 'Forbidden, when the X-Admin-Key header is missing or wrong'
+        }
+    }
+)
+async def clear_token_cache():
+    # Per worker: after a key rotation every worker is restarted anyway,
+    # this covers clearing one without a restart.
+    user_service.clear_token_cache()
+    return success_response(
+        data=None,
+        message="Token cache cleared successfully",
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@admin_router.get(
+    "/redis",
+    status_code=status.HTTP_200_OK,
+    response_model=SuccessResponse,
+    responses={
+        403: {
+            'model': ErrorResponse,
+            'description': 'Forbidden, when the X-Admin-Key header is missing or wrong'
+        }
+    }
+)
+async def redis_stats():
+    return success_response(
+        data=redis_client.stats(),
+        message="Redis client stats retrieved successfully",
+        status_code=status.HTTP_200_OK,
+    )
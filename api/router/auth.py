@@ -1,42 +1,66 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import datetime as dt
+import logging
+from redis.exceptions import RedisError
 
-from models.user import User
+from core.config import Config
 from schema.response import ErrorResponse, SuccessResponse
 from schema.token import TokenType
 from db.database import get_db
 from service.user import user_service
+from utils.rate_limit import RateLimit, body_field, client_ip, rate_limit
 from utils.response import success_response
 from schema.user import UserOut, UserData, UserLogin, UserRegister, UserResponse
 
 
+logger = logging.getLogger(__name__)
+
 auth_router = APIRouter(prefix="/auth",tags=["Auth"])
 
+# Every login or registration costs a bcrypt hash, so bursts are cut off before it
+login_rate_limit = rate_limit(
+    RateLimit("login:ip", Config.RATE_LIMIT_LOGIN_PER_IP, Config.RATE_LIMIT_WINDOW, client_ip),
+    RateLimit("login:account", Config.RATE_LIMIT_LOGIN_PER_ACCOUNT, Config.RATE_LIMIT_WINDOW, body_field("email")),
+)
+register_rate_limit = rate_limit(
+    RateLimit("register:ip", Config.RATE_LIMIT_REGISTER_PER_IP, Config.RATE_LIMIT_WINDOW, client_ip),
+)
+
+_rate_limited = {
+    'model': ErrorResponse,
+    'description': 'Too many requests; retry after the number of seconds in the Retry-After header'
+}
+
 
 @auth_router.post(
     "/register",
     status_code=status.HTTP_201_CREATED,
     response_model=UserResponse,
+    dependencies=[Depends(register_rate_limit)],
         responses={
         409: {
             'model': ErrorResponse,
             'description': 'Conflict error, such as when a user with the same email already exists'
         },
+        429: _rate_limited,
         500: {
             'model': ErrorResponse,
             'description': 'Internal server error, such as database connection issues or unexpected errors'
         }
     })
-def register(
+async def register(
     data: UserRegister,
-    db: Session=Depends(get_db)
+    db: Session | AsyncSession = Depends(get_db)
 ):
     
-    user = user_service.create_user(data=data, db=db)
+    user = await user_service.create_user(data=data, db=db)
 
-    access_token = user_service._create_token(uuid=user.uuid, type=TokenType.ACCESS)
+    access_token = user_service._create_token(
+        uuid=user.uuid, type=TokenType.ACCESS, username=user.username, email=user.email
+    )
     refresh_token = user_service._create_token(uuid=user.uuid, type=TokenType.REFRESH)
 
 
@@ -48,7 +72,7 @@ def register(
                 email=user.email
             ),
             accessToken=access_token,
-        ).model_dump(),
+        ),
         message="user registered successfully",
         status_code=status.HTTP_201_CREATED,
     )
@@ -71,22 +95,26 @@ def register(
     "/login",
     status_code=status.HTTP_200_OK,
     response_model=UserResponse,
+    dependencies=[Depends(login_rate_limit)],
     responses={
         401: {
             'model': ErrorResponse,
             'description': 'Unauthorized error, such as when the user credentials are invalid'
         },
+        429: _rate_limited,
         500: {
             'model': ErrorResponse,
             'description': 'Internal server error, such as database connection issues or unexpected errors'
         }
     })
 
-def login(data: UserLogin, db: Session = Depends(get_db)):
-    user = user_service.authenticate_user(data=data, db=db)
+async def login(data: UserLogin, db: Session | AsyncSession = Depends(get_db)):
+    user = await user_service.authenticate_user(data=data, db=db)
     
 
-    access_token = user_service._create_token(uuid=user.uuid, type=TokenType.ACCESS)
+    access_token = user_service._create_token(
+        uuid=user.uuid, type=TokenType.ACCESS, username=user.username, email=user.email
+    )
     refresh_token = user_service._create_token(uuid=user.uuid, type=TokenType.REFRESH)
 
     response = success_response(
@@ -97,7 +125,7 @@ def login(data: UserLogin, db: Session = Depends(get_db)):
                 email=user.email
             ),
             accessToken=access_token,
-        ).model_dump(),
+        ),
         message="user logged in successfully",
         status_code=status.HTTP_200_OK,
     )
@@ -129,13 +157,17 @@ def login(data: UserLogin, db: Session = Depends(get_db)):
             'description': 'Internal server error, such as database connection issues or unexpected errors'
         }
     })
-def logout_user(request: Request, response: Response,
-                        current_user: User = Depends(user_service.get_current_user)) -> success_response:
+async def logout_user(request: Request, response: Response,
+                        current_user: UserData = Depends(user_service.get_current_user)) -> success_response:
 
     refresh_token = request.cookies.get("refresh_token")
-    user_service.redisClient.setex(
-        f"blacklisted_token:{refresh_token}", dt.timedelta(days=30), "blacklisted"
-    )
+    try:
+        await user_service.redisClient.setex(
+            f"blacklisted_token:{refresh_token}", dt.timedelta(days=30), "blacklisted"
+        )
+    except RedisError as e:
+        # Still clear the cookie; the token itself expires on its own
+        logger.warning("Could not blacklist refresh token: %s", e)
     if not refresh_token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,117 @@
+from typing import Iterable
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.pool import QueuePool
+
+from core.config import Config
+from db.database import async_pool_metrics, pool_metrics
+from db.redis import redis_client
+from service.task import task_service
+from service.task_cache import task_cache
+from service.task_events import task_events
+from service.user import user_service
+from service.user_cache import user_cache
+from utils.metrics import gauge_lines, registry
+from utils.rate_limit import rate_limiter
+from api.router.admin import require_admin
+
+
+@registry.collector
+def _pool_metrics() -> Iterable[str]:
+    engines = {name: m for name, m in (("sync", pool_metrics), ("async", async_pool_metrics)) if m is not None}
+    queue_pools = {name: m.pool for name, m in engines.items() if isinstance(m.pool, QueuePool)}
+
+    yield from gauge_lines("db_pool_connections", "Pooled DB connections by state", [
+        sample for name, pool in queue_pools.items()
+        for sample in (({"engine": name, "state": "in_use"}, pool.checkedout()),
+                       ({"engine": name, "state": "idle"}, pool.checkedin()))
+    ])
+    yield from gauge_lines("db_pool_overflow", "DB connections opened beyond pool_size", [
+        ({"engine": name}, max(pool.overflow(), 0)) for name, pool in queue_pools.items()
+    ])
+    for metric, attr, help in (
+        ("db_pool_checkouts_total", "checkouts", "DB connection checkouts"),
+        ("db_pool_checkout_seconds_total", "checkout_time", "Time spent checking out DB connections"),
+        ("db_pool_waits_total", "waits", "Checkouts that found the pool exhausted"),
+        ("db_pool_timeouts_total", "timeouts", "Checkouts that timed out"),
+        ("db_pool_connects_total", "connects", "New DB connections opened"),
+    ):
+        yield from gauge_lines(metric, help, [
+            ({"engine": name}, getattr(m, attr)) for name, m in engines.items()
+        ], type="counter")
+
+
+@registry.collector
+def _redis_metrics() -> Iterable[str]:
+    metrics = redis_client.metrics
+    yield from gauge_lines("redis_calls_total", "Redis commands sent", [({}, metrics.calls)], type="counter")
+    yield from gauge_lines("redis_errors_total", "Redis commands that failed", [({}, metrics.errors)], type="counter")
+    yield from gauge_lines("redis_rejected_total", "Redis commands refused by the open circuit breaker",
+                           [({}, metrics.rejected)], type="counter")
+    yield from gauge_lines("redis_call_seconds_total", "Time spent in Redis commands",
+                           [({}, metrics.latency)], type="counter")
+    yield from gauge_lines("redis_breaker_open", "1 while the Redis circuit breaker is not closed",
+                           [({}, int(redis_client.breaker.state != redis_client.breaker.CLOSED))])
+
+
+@registry.collector
+def _cache_metrics() -> Iterable[str]:
+    caches = {
+        "task": (task_cache.hits, task_cache.misses),
+        "user_local": (user_cache.local.hits, user_cache.local.misses),
+        "token": (user_service.tokenCache.hits, user_service.tokenCache.misses),
+    }
+    yield from gauge_lines("cache_hits_total", "Cache hits", [
+        ({"cache": name}, hits) for name, (hits, _) in caches.items()
+    ], type="counter")
+    yield from gauge_lines("cache_misses_total", "Cache misses", [
+        ({"cache": name}, misses) for name, (_, misses) in caches.items()
+    ], type="counter")
+
+
+@registry.collector
+def _group_commit_metrics() -> Iterable[str]:
+    group_commit = task_service.group_commit
+    yield from gauge_lines("task_group_commit_batches_total", "Group-commit batches written",
+                           [({}, group_commit.batches)], type="counter")
+    yield from gauge_lines("task_group_commit_items_total", "Tasks created through group commit",
+                           [({}, group_commit.items)], type="counter")
+    yield from gauge_lines("task_group_commit_retried_total", "Tasks retried on their own after their batch failed",
+                           [({}, group_commit.retried)], type="counter")
+    yield from gauge_lines("task_group_commit_failed_total", "Tasks failed with their whole batch, without retry",
+                           [({}, group_commit.failed)], type="counter")
+
+
+@registry.collector
+def _rate_limit_metrics() -> Iterable[str]:
+    yield from gauge_lines("rate_limit_requests_total", "Rate-limited requests by outcome", [
+        ({"outcome": "allowed"}, rate_limiter.allowed),
+        ({"outcome": "limited"}, rate_limiter.limited),
+    ], type="counter")
+    yield from gauge_lines("rate_limit_fallbacks_total", "Checks served by the local token buckets while Redis failed",
+                           [({}, rate_limiter.fallbacks)], type="counter")
+
+
+@registry.collector
+def _task_stream_metrics() -> Iterable[str]:
+    stats = task_events.stats()
+    yield from gauge_lines("task_stream_clients", "Open task streams (SSE and WebSocket)", [({}, stats["clients"])])
+    yield from gauge_lines("task_stream_events_total", "Task events fanned out to this worker's streams",
+                           [({}, stats["events"])], type="counter")
+    yield from gauge_lines("task_stream_resyncs_total", "Events dropped for slow consumers, replaced by a resync",
+                           [({}, stats["resyncs"])], type="counter")
+    yield from gauge_lines("task_stream_listening", "1 while the LISTEN connection is up",
+                           [({}, int(stats["listening"]))])
+
+
+# Route latencies and pool, cache and Redis internals: scraped with the
+# X-Admin-Key header like the admin routes, and off without ADMIN_API_KEY
+metrics_router = APIRouter(tags=["Metrics"], dependencies=[Depends(require_admin)])
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    if not Config.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
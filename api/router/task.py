@@ -1,19 +1,37 @@
-from typing import Optional
+import asyncio
+import datetime
+from typing import Annotated, AsyncIterator, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, status
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, WebSocket, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from models.user import User
 from schema.response import ErrorResponse
 from service.task import task_service
+from service.task_events import Subscription, task_events
 from service.user import user_service
-from schema.task import TaskCreate, TaskListResponse, TaskOut, TaskData, TaskListOut, TaskResponse, TaskStatus, TaskUpdate, TaskType
-from db.database import get_db
-from utils.response import success_response
+from schema.user import UserData
+from schema.task import (ExportFormat, TaskBulkCreate, TaskBulkDelete, TaskBulkOut, TaskBulkResponse, TaskBulkResult, TaskBulkStatus,
+                         TaskChangesResponse, TaskCreate, TaskListQuery, TaskListResponse, TaskOut, TaskResponse, TaskSearchSort, TaskStatsResponse, TaskStatus,
+                         TaskUpdate)
+from db.database import get_db, open_session
+from utils.etag import etag_headers, etag_matches, make_etag
+from utils.query_budget import query_budget
+from utils.response import success_json_response, success_response
 
 
 task_router = APIRouter(prefix="/tasks", tags=["Task"])
 
+# Every task route is a single statement, plus the current-user lookup on a
+# user cache miss; see utils.query_budget. Writes add the task_counters
+# upsert and the pg_notify of the task stream; deletes the tombstone insert.
+# Status or priority changes read the values they replace in the UPDATE
+# itself on Postgres; the budgets leave room for the SELECT ... FOR UPDATE
+# SQLite needs instead.
+
 
 @task_router.post(
     "/",
@@ -30,22 +48,11 @@ task_router = APIRouter(prefix="/tasks", tags=["Task"])
         }
     }
     )
-def create_task(data: TaskCreate, db: Session = Depends(get_db), current_user: User = Depends(user_service.get_current_user)):
-    task = task_service.create_task(task_data=data, db=db, user_uuid=current_user.uuid)
+@query_budget(4)
+async def create_task(data: TaskCreate, db: Session | AsyncSession = Depends(get_db), current_user: UserData = Depends(user_service.get_current_user)):
+    task = await task_service.create_task(task_data=data, db=db, user_uuid=current_user.uuid)
     response = success_response(
-        data=TaskOut(
-                task= TaskData(title=task.title,
-                        description=task.description,
-                        status=task.status,
-                        uuid=task.uuid,
-                        user_uuid=task.user_uuid,
-                        due_date=task.due_date,
-                        priority=task.priority,
-                        status_change=task.status_change,
-                        created_at=task.created_at,
-                        updated_at=task.updated_at)
-
-        ).model_dump(),
+        data=TaskOut(task=task),
         message="Task created successfully",
         status_code=status.HTTP_201_CREATED
     )
@@ -57,28 +64,334 @@ def create_task(data: TaskCreate, db: Session = Depends(get_db), current_user: U
     status_code=status.HTTP_200_OK,
     response_model=TaskListResponse,
     responses={
+        304: {
+            'description': 'Not Modified, when If-None-Match matches the current ETag'
+        },
         500: {
             'model': ErrorResponse,
             'description': 'Internal server error, such as database connection issues or unexpected errors'
         }
     }
 )
-def list_tasks(status_filter: Optional[TaskType]=None, current_user: User = Depends(user_service.get_current_user), db: Session = Depends(get_db)):
-    tasks = task_service.list_tasks(user_uuid=current_user.uuid, db=db, status_filter=status_filter)
-    response = success_response(
-        data=TaskListOut(tasks=[TaskData(
-            uuid=task.uuid,
-            title=task.title,
-            description=task.description,
-            status=task.status,
-            user_uuid=task.user_uuid,
-            due_date=task.due_date,
-            priority=task.priority,
-            status_change=task.status_change,
-            created_at=task.created_at,
-            updated_at=task.updated_at
-        ) for task in tasks]).model_dump(),
+@query_budget(2)
+async def list_tasks(request: Request,
+                     filters: Annotated[TaskListQuery, Query()],
+                     if_none_match: Optional[str] = Header(None),
+                     current_user: UserData = Depends(user_service.get_current_user), db: Session | AsyncSession = Depends(get_db)):
+    # What counts as overdue moves with the clock, not the task version
+    version = await task_service.get_version(current_user.uuid) if not filters.overdue else None
+    etag = make_etag(version, current_user.uuid, request) if version else None
+    if etag and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
+
+    data = await task_service.list_tasks_json(user_uuid=current_user.uuid, db=db, query=filters, version=version)
+    response = success_json_response(
+        data=data,
         message="Tasks retrieved successfully",
+        status_code=status.HTTP_200_OK,
+        headers=etag_headers(etag) if etag else None
+    )
+    return response
+
+
+@task_router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            'content': {'application/x-ndjson': {}, 'text/csv': {}},
+            'description': 'Every task of the user, one per line (NDJSON) or row (CSV), oldest first'
+        }
+    }
+)
+@query_budget(2)
+async def export_tasks(export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+                       current_user: UserData = Depends(user_service.get_current_user)):
+    media_type = "text/csv" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        task_service.export_tasks(user_uuid=current_user.uuid, export_format=export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks.{export_format.value}"'},
+    )
+
+
+
+def _stream_token(authorization: Optional[str] = Header(None), access_token: Optional[str] = Query(None)) -> str:
+    """Browsers can't set headers on an EventSource or WebSocket, so the access token may come as ?access_token=."""
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return token
+    if access_token:
+        return access_token
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Not authenticated",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def _subscribe(token: str) -> Subscription:
+    # A stream outlives its request, so it must not keep get_db's session (and its pooled connection)
+    async with open_session() as db:
+        current_user = await user_service.authenticate(token=token, db=db)
+    return task_events.subscribe(current_user.uuid)
+
+
+async def _sse(subscription: Subscription) -> AsyncIterator[bytes]:
+    yield b": connected\n\n"
+    async for event in task_events.listen(subscription):
+        if event is None:
+            # Keeps proxies from timing out the idle connection, and notices clients that left
+            yield b": ping\n\n"
+        else:
+            kind, data = event
+            yield f"event: {kind}\ndata: {data}\n\n".encode()
+
+
+@task_router.get(
+    "/stream",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            'content': {'text/event-stream': {}},
+            'description': 'Server-sent events (created, updated, status, deleted, resync) with the ids of the '
+                           'tasks concerned; on resync, events were missed and the tasks should be refetched'
+        },
+        401: {
+            'model': ErrorResponse,
+            'description': 'Unauthorized, when the access token is missing or invalid'
+        },
+        429: {
+            'model': ErrorResponse,
+            'description': 'Too many open streams for this user'
+        },
+        503: {
+            'model': ErrorResponse,
+            'description': 'The worker holds as many streams as it accepts; retry after Retry-After seconds'
+        }
+    }
+)
+@query_budget(1)
+async def stream_tasks(token: str = Depends(_stream_token)):
+    subscription = await _subscribe(token)
+    return StreamingResponse(
+        _sse(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also runs when the client left before the stream started
+        background=BackgroundTask(task_events.unsubscribe, subscription),
+    )
+
+
+async def _send_events(websocket: WebSocket, subscription: Subscription) -> None:
+    # Idle connections are kept alive by the server's WebSocket pings
+    async for event in task_events.listen(subscription):
+        if event is not None:
+            await websocket.send_text(event[1])
+    await websocket.close(code=status.WS_1001_GOING_AWAY)
+
+
+@task_router.websocket("/stream")
+async def stream_tasks_ws(websocket: WebSocket, authorization: Optional[str] = Header(None),
+                          access_token: Optional[str] = Query(None)):
+    """The events of GET /tasks/stream as JSON text messages: {"type": ..., "tasks": [...]}."""
+
+    try:
+        subscription = await _subscribe(_stream_token(authorization, access_token))
+    except HTTPException as e:
+        code = status.WS_1013_TRY_AGAIN_LATER if e.status_code == status.HTTP_503_SERVICE_UNAVAILABLE else status.WS_1008_POLICY_VIOLATION
+        await websocket.close(code=code, reason=str(e.detail))
+        return
+
+    await websocket.accept()
+    sender = asyncio.create_task(_send_events(websocket, subscription))
+    try:
+        # Clients send nothing; receiving is how a disconnect is noticed
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+        task_events.unsubscribe(subscription)
+
+@task_router.get(
+    "/search",
+    status_code=status.HTTP_200_OK,
+    response_model=TaskListResponse,
+    responses={
+        304: {
+            'description': 'Not Modified, when If-None-Match matches the current ETag'
+        },
+        500: {
+            'model': ErrorResponse,
+            'description': 'Internal server error, such as database connection issues or unexpected errors'
+        }
+    }
+)
+@query_budget(2)
+async def search_tasks(request: Request,
+                       q: str = Query(..., min_length=1, max_length=200,
+                                      description='Words to find in title or description; supports "phrases" and -exclusions'),
+                       limit: int = Query(50, ge=1, le=100, description="Maximum number of tasks to return"),
+                       cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+                       sort: TaskSearchSort = Query(TaskSearchSort.RANK,
+                                                    description="Best match first, or newest first"),
+                       if_none_match: Optional[str] = Header(None),
+                       current_user: UserData = Depends(user_service.get_current_user), db: Session | AsyncSession = Depends(get_db)):
+    version = await task_service.get_version(current_user.uuid)
+    etag = make_etag(version, current_user.uuid, request) if version else None
+    if etag and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
+
+    data = await task_service.search_tasks_json(user_uuid=current_user.uuid, q=q, db=db, limit=limit, cursor=cursor,
+                                                sort=sort, version=version)
+    return success_json_response(
+        data=data,
+        message="Tasks retrieved successfully",
+        status_code=status.HTTP_200_OK,
+        headers=etag_headers(etag) if etag else None
+    )
+
+
+@task_router.get(
+    "/stats",
+    status_code=status.HTTP_200_OK,
+    response_model=TaskStatsResponse,
+    responses={
+        422: {
+            'model': ErrorResponse,
+            'description': 'Unprocessable Entity, such as when tz is not a known time zone'
+        },
+        500: {
+            'model': ErrorResponse,
+            'description': 'Internal server error, such as database connection issues or unexpected errors'
+        }
+    }
+)
+@query_budget(3)
+async def task_stats(tz: Optional[str] = Query(None, description='IANA time zone that decides what "today" is; UTC by default'),
+                     current_user: UserData = Depends(user_service.get_current_user), db: Session | AsyncSession = Depends(get_db)):
+    try:
+        zone = ZoneInfo(tz) if tz else datetime.timezone.utc
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Unknown time zone")
+
+    stats = await task_service.task_stats(user_uuid=current_user.uuid, db=db, tz=zone)
+    return success_response(
+        data=stats,
+        message="Task stats retrieved successfully",
+        status_code=status.HTTP_200_OK
+    )
+
+
+
+@task_router.get(
+    "/changes",
+    status_code=status.HTTP_200_OK,
+    response_model=TaskChangesResponse,
+    responses={
+        400: {
+            'model': ErrorResponse,
+            'description': 'Bad Request, when the sync token is malformed'
+        },
+        410: {
+            'model': ErrorResponse,
+            'description': 'Gone, when the sync token is older than deleted tasks are remembered; sync again without one'
+        },
+        500: {
+            'model': ErrorResponse,
+            'description': 'Internal server error, such as database connection issues or unexpected errors'
+        }
+    }
+)
+@query_budget(4)
+async def task_changes(since: Optional[str] = Query(None, description="`next_token` of the previous sync; omit for a full sync"),
+                       limit: int = Query(500, ge=1, le=1000, description="Maximum number of changes to return"),
+                       current_user: UserData = Depends(user_service.get_current_user), db: Session | AsyncSession = Depends(get_db)):
+    changes = await task_service.task_changes(user_uuid=current_user.uuid, db=db, since=since, limit=limit)
+    return success_response(
+        data=changes,
+        message="Task changes retrieved successfully",
+        status_code=status.HTTP_200_OK
+    )
+
+@task_router.post(
+    "/bulk",
+    status_code=status.HTTP_201_CREATED,
+    response_model=TaskBulkResponse,
+    responses={
+        422: {
+            'model': ErrorResponse,
+            'description': 'Unprocessable Entity, such as when any due date is in the past or there are too many tasks'
+        },
+        500: {
+            'model': ErrorResponse,
+            'description': 'Internal server error, such as database connection issues or unexpected errors'
+        }
+    }
+)
+@query_budget(4)
+async def create_tasks(data: TaskBulkCreate, db: Session | AsyncSession = Depends(get_db), current_user: UserData = Depends(user_service.get_current_user)):
+    tasks = await task_service.create_tasks(data=data, db=db, user_uuid=current_user.uuid)
+    response = success_response(
+        data=TaskBulkOut(results=[
+            TaskBulkResult(uuid=task.uuid, result="created", task=task) for task in tasks
+        ]),
+        message="Tasks created successfully",
+        status_code=status.HTTP_201_CREATED
+    )
+    return response
+
+
+@task_router.patch(
+    "/bulk/status",
+    status_code=status.HTTP_200_OK,
+    response_model=TaskBulkResponse,
+    responses={
+        500: {
+            'model': ErrorResponse,
+            'description': 'Internal server error, such as database connection issues or unexpected errors'
+        }
+    }
+)
+@query_budget(5)
+async def update_tasks_status(data: TaskBulkStatus, db: Session | AsyncSession = Depends(get_db), current_user: UserData = Depends(user_service.get_current_user)):
+    updated = await task_service.update_tasks_status(data=data, user_uuid=current_user.uuid, db=db)
+    response = success_response(
+        data=TaskBulkOut(results=[
+            TaskBulkResult(uuid=task_id, result="updated", task=updated[task_id])
+            if task_id in updated else TaskBulkResult(uuid=task_id, result="not_found")
+            for task_id in data.task_ids
+        ]),
+        message="Task statuses updated successfully",
+        status_code=status.HTTP_200_OK
+    )
+    return response
+
+
+@task_router.delete(
+    "/bulk",
+    status_code=status.HTTP_200_OK,
+    response_model=TaskBulkResponse,
+    responses={
+        500: {
+            'model': ErrorResponse,
+            'description': 'Internal server error, such as database connection issues or unexpected errors'
+        }
+    }
+)
+@query_budget(5)
+async def delete_tasks(data: TaskBulkDelete, db: Session | AsyncSession = Depends(get_db), current_user: UserData = Depends(user_service.get_current_user)):
+    deleted = await task_service.delete_tasks(data=data, user_uuid=current_user.uuid, db=db)
+    response = success_response(
+        data=TaskBulkOut(results=[
+            TaskBulkResult(uuid=task_id, result="deleted" if task_id in deleted else "not_found")
+            for task_id in data.task_ids
+        ]),
+        message="Tasks deleted successfully",
         status_code=status.HTTP_200_OK
     )
     return response
@@ -89,6 +402,9 @@ def list_tasks(status_filter: Optional[TaskType]=None, current_user: User = Depe
     status_code=status.HTTP_200_OK,
     response_model=TaskResponse,
     responses={
+        304: {
+            'description': 'Not Modified, when If-None-Match matches the current ETag'
+        },
         404: {
             'model': ErrorResponse,
             'description': 'Not Found, such as when the task does not exist or the user does not have access to it'
@@ -99,25 +415,20 @@ def list_tasks(status_filter: Optional[TaskType]=None, current_user: User = Depe
         }
     }
 )
-def get_task(task_id: str, db: Session = Depends(get_db), current_user: User = Depends(user_service.get_current_user)):
-    task = task_service.get_task(task_id=task_id, db=db, user_uuid=current_user.uuid)
-    response = success_response(
-        data=TaskOut(
-            task=TaskData(
-                uuid=task.uuid,
-                title=task.title,
-                description=task.description,
-                status=task.status,
-                user_uuid=task.user_uuid,
-                due_date=task.due_date,
-                priority=task.priority,
-                status_change=task.status_change,
-                created_at=task.created_at,
-                updated_at=task.updated_at
-            )
-        ).model_dump(),
+@query_budget(2)
+async def get_task(task_id: UUID, request: Request, if_none_match: Optional[str] = Header(None),
+                   db: Session | AsyncSession = Depends(get_db), current_user: UserData = Depends(user_service.get_current_user)):
+    version = await task_service.get_version(current_user.uuid)
+    etag = make_etag(version, current_user.uuid, request) if version else None
+    if etag and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
+
+    data = await task_service.get_task_json(task_id=task_id, db=db, user_uuid=current_user.uuid, version=version)
+    response = success_json_response(
+        data=data,
         message="Task retrieved successfully",
-        status_code=status.HTTP_200_OK
+        status_code=status.HTTP_200_OK,
+        headers=etag_headers(etag) if etag else None
     )
 
     return response
@@ -144,23 +455,11 @@ def get_task(task_id: str, db: Session = Depends(get_db), current_user: User = D
         }
     }
 )
-def update_task(task_id: str, task_data: TaskUpdate, db: Session = Depends(get_db), current_user: User = Depends(user_service.get_current_user)):
-    task = task_service.update_task(task_id=task_id, task_data=task_data, user_uuid=current_user.uuid, db=db)
+@query_budget(5)
+async def update_task(task_id: UUID, task_data: TaskUpdate, db: Session | AsyncSession = Depends(get_db), current_user: UserData = Depends(user_service.get_current_user)):
+    task = await task_service.update_task(task_id=task_id, task_data=task_data, user_uuid=current_user.uuid, db=db)
     response = success_response(
-        data=TaskOut(
-            task=TaskData(
-                uuid=task.uuid,
-                title=task.title,
-                description=task.description,
-                status=task.status,
-                user_uuid=task.user_uuid,
-                due_date=task.due_date,
-                priority=task.priority,
-                status_change=task.status_change,
-                created_at=task.created_at,
-                updated_at=task.updated_at
-            )
-        ).model_dump(),
+        data=TaskOut(task=task),
         message="Task updated successfully",
         status_code=status.HTTP_200_OK
     )
@@ -182,8 +481,9 @@ def update_task(task_id: str, task_data: TaskUpdate, db: Session = Depends(get_d
         }
     }
 )
-def delete_task(task_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(user_service.get_current_user)):
-    task_deleted = task_service.delete_task(task_id=task_id, user_uuid=current_user.uuid, db=db)
+@query_budget(5)
+async def delete_task(task_id: UUID, db: Session | AsyncSession = Depends(get_db), current_user: UserData = Depends(user_service.get_current_user)):
+    task_deleted = await task_service.delete_task(task_id=task_id, user_uuid=current_user.uuid, db=db)
 
     if isinstance(task_deleted, dict) and "detail" in task_deleted:
         return 
@@ -191,23 +491,11 @@ def delete_task(task_id: UUID, db: Session = Depends(get_db), current_user: User
 
 
 @task_router.put("/{task_id}/status")
-def update_task_status(task_id: str, data: TaskStatus, db: Session = Depends(get_db), current_user: User = Depends(user_service.get_current_user)):
-    task = task_service.update_task_status(task_id=task_id, data=data, user_uuid=current_user.uuid, db=db)
+@query_budget(5)
+async def update_task_status(task_id: UUID, data: TaskStatus, db: Session | AsyncSession = Depends(get_db), current_user: UserData = Depends(user_service.get_current_user)):
+    task = await task_service.update_task_status(task_id=task_id, data=data, user_uuid=current_user.uuid, db=db)
     response = success_response(
-        data=TaskOut(
-            task=TaskData(
-                uuid=task.uuid,
-                title=task.title,
-                description=task.description,
-                status=task.status,
-                user_uuid=task.user_uuid,
-                due_date=task.due_date,
-                priority=task.priority,
-                status_change=task.status_change,
-                created_at=task.created_at,
-                updated_at=task.updated_at
-            )
-        ).model_dump(),
+        data=TaskOut(task=task),
         message="Task status updated successfully",
         status_code=status.HTTP_200_OK
     )
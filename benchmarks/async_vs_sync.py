@@ -0,0 +1,88 @@
+"""
+Requests/sec for the task API under a fixed number of concurrent clients.
+
+Start the API once with DB_ASYNC_MODE=false and once with DB_ASYNC_MODE=true,
+then point this script at it:
+
+    uvicorn main:app --workers 1 --port 8000
+    python -m benchmarks.async_vs_sync --base-url http://localhost:8000 --concurrency 500
+
+On the SQLite stand-in, async mode needs DB_ASYNC_URL too:
+
+    DB_URL=sqlite:///bench.db DB_ASYNC_MODE=true DB_ASYNC_URL=sqlite+aiosqlite:///bench.db uvicorn main:app --port 8000
+
+Each run registers a throwaway user, seeds a few tasks and then hammers
+GET /api/v1/tasks/ with the given number of concurrent clients.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+
+async def _seed(client: httpx.AsyncClient, tasks: int) -> str:
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"username": "bench", "email": email, "password": "bench-password"},
+    )
+    response.raise_for_status()
+    token = response.json()["data"]["accessToken"]
+
+    due_date = int(time.time()) + 30 * 24 * 3600
+    for i in range(tasks):
+        response = await client.post(
+            "/api/v1/tasks/",
+            json={"title": f"task {i}", "description": "benchmark", "due_date": due_date},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
+    return token
+
+
+async def _client_loop(client: httpx.AsyncClient, token: str, deadline: float, counts: dict):
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() < deadline:
+        try:
+            response = await client.get("/api/v1/tasks/", headers=headers)
+            counts["ok" if response.status_code == 200 else "failed"] += 1
+        except httpx.HTTPError:
+            counts["failed"] += 1
+
+
+async def run(base_url: str, concurrency: int, duration: float, tasks: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        token = await _seed(client, tasks)
+        counts = {"ok": 0, "failed": 0}
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(_client_loop(client, token, deadline, counts) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests_ok": counts["ok"],
+        "requests_failed": counts["failed"],
+        "requests_per_s": round(counts["ok"] / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--tasks", type=int, default=20, help="tasks seeded for the benchmark user")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.base_url, args.concurrency, args.duration, args.tasks))
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
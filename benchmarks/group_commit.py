@@ -0,0 +1,100 @@
+"""
+Task creation throughput with and without group commit (TASK_GROUP_COMMIT).
+
+Fires TaskService.create_task calls at a fixed arrival rate (open loop, so
+a slow database shows up as latency and backlog rather than as a lower
+offered load), once per commit mode, and reports achieved creates/sec,
+latency percentiles and the number of transactions committed:
+
+    python -m benchmarks.group_commit --rate 1000 --duration 10
+    DB_URL=sqlite:///bench.db python -m benchmarks.group_commit --rate 1000 --max-delay-ms 2
+
+Each create gets its own session, as it would from get_db. Run it against
+the Postgres the API uses; with synchronous_commit on, the difference is
+mostly fsyncs saved.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.load import summarize
+from benchmarks.seed import seed
+from core.config import Config
+from db.database import AsyncSessionLocal, SessionLocal
+from models import User
+from schema.task import TaskCreate
+from service.task import task_service
+
+
+async def _create(user_uuid, due_date: int, latencies: list[float], errors: list[int]) -> None:
+    task_data = TaskCreate(title="group commit", description="benchmark", due_date=due_date)
+    started = time.perf_counter()
+    try:
+        if AsyncSessionLocal is not None:
+            async with AsyncSessionLocal() as db:
+                await task_service.create_task(task_data=task_data, db=db, user_uuid=user_uuid)
+        else:
+            with SessionLocal() as db:
+                await task_service.create_task(task_data=task_data, db=db, user_uuid=user_uuid)
+    except Exception:
+        errors[0] += 1
+        return
+    latencies.append(time.perf_counter() - started)
+
+
+async def run(user_uuids: list, rate: float, duration: float) -> dict:
+    latencies: list[float] = []
+    errors = [0]
+    due_date = int(time.time()) + 30 * 24 * 3600
+    batches_before = task_service.group_commit.batches
+
+    pending = []
+    started = time.perf_counter()
+    total = int(rate * duration)
+    for i in range(total):
+        # Open loop: the i-th create starts at i / rate, whether or not earlier ones finished
+        delay = started + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        pending.append(asyncio.create_task(_create(user_uuids[i % len(user_uuids)], due_date, latencies, errors)))
+    await asyncio.gather(*pending)
+    elapsed = time.perf_counter() - started
+
+    result = summarize(latencies, errors[0], elapsed)
+    result["transactions"] = (
+        task_service.group_commit.batches - batches_before if Config.TASK_GROUP_COMMIT else len(latencies)
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=1000, help="creates per second offered")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per mode")
+    parser.add_argument("--users", type=int, default=100, help="users the creates are spread over")
+    parser.add_argument("--max-delay-ms", type=float, default=Config.TASK_GROUP_COMMIT_MAX_DELAY_MS)
+    parser.add_argument("--max-batch", type=int, default=Config.TASK_GROUP_COMMIT_MAX_BATCH)
+    args = parser.parse_args()
+
+    seed(args.users, 0)
+    with SessionLocal() as db:
+        user_uuids = list(db.scalars(User.__table__.select().with_only_columns(User.uuid).limit(args.users)))
+
+    task_service.group_commit.max_delay = args.max_delay_ms / 1000
+    task_service.group_commit.max_batch = args.max_batch
+
+    results = {}
+    for mode in (False, True):
+        Config.TASK_GROUP_COMMIT = mode
+        results[mode] = asyncio.run(run(user_uuids, args.rate, args.duration))
+
+    print(f"{args.rate:.0f} creates/s offered for {args.duration:.0f}s, "
+          f"max delay {args.max_delay_ms}ms, max batch {args.max_batch}")
+    print(f"{'mode':<14} {'creates/s':>10} {'errors':>7} {'p50 ms':>9} {'p99 ms':>9} {'commits':>8}")
+    for mode, result in results.items():
+        print(f"{'group commit' if mode else 'per request':<14} {result['throughput_rps']:>10.1f} {result['errors']:>7} "
+              f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['transactions']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+HTTP load test of the auth and task endpoints, with results saved as JSON.
+
+Seeds users and tasks (see benchmarks.seed), then runs --concurrency
+virtual users. Each one registers a fresh account, logs in as a seeded
+user and repeats create, list, get, update, status and delete for
+--iterations rounds. By default requests go to the app in-process through
+httpx's ASGI transport, lifespan included, so nothing but the database is
+needed; with --base-url they go to a running server instead:
+
+    DB_URL=sqlite:///bench.db python -m benchmarks.load --users 50 --tasks 200 --concurrency 20
+    python -m benchmarks.load --base-url http://localhost:8000 --baseline benchmarks/results/main.json
+
+Redis is optional: when it is unreachable the app runs degraded (no
+caches, no ETags), which the results record. Per-operation latency
+percentiles and throughput are written to --out; with --baseline the run
+is compared against an earlier result file.
+
+The auth rate limits are switched off in-process; start a server used
+with --base-url with RATE_LIMIT_ENABLED=false, or registrations and
+logins past the limits get 429s.
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime as dt
+import json
+import os
+import platform
+import subprocess
+import time
+import uuid
+from collections import defaultdict
+from typing import Optional
+
+import httpx
+
+from benchmarks.seed import PASSWORD, seed
+from core.config import Config
+
+OPERATIONS = ["register", "login", "create", "list", "get", "update", "status", "delete"]
+
+
+class Recorder:
+    """Latency samples and error counts per operation."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def call(self, operation: str, request, expected: int) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            self.errors[operation] += 1
+            return None
+        self.samples[operation].append(time.perf_counter() - started)
+        if response.status_code != expected:
+            self.errors[operation] += 1
+            return None
+        return response
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def summarize(samples: list[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        **{f"p{int(q * 100)}_ms": round(_percentile(ordered, q) * 1000, 3) for q in (0.5, 0.9, 0.95, 0.99)},
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+async def _virtual_user(client: httpx.AsyncClient, recorder: Recorder, email: str, iterations: int) -> None:
+    await recorder.call("register", client.post("/api/v1/auth/register", json={
+        "username": "load", "email": f"load-{uuid.uuid4().hex[:12]}@example.com", "password": PASSWORD,
+    }), 201)
+
+    response = await recorder.call("login", client.post(
+        "/api/v1/auth/login", json={"email": email, "password": PASSWORD}
+    ), 200)
+    if response is None:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['data']['accessToken']}"}
+
+    due_date = int(time.time()) + 30 * 24 * 3600
+    for i in range(iterations):
+        response = await recorder.call("create", client.post("/api/v1/tasks/", headers=headers, json={
+            "title": f"load {i}", "description": "load test", "due_date": due_date, "priority": i % 5 + 1,
+        }), 201)
+        if response is None:
+            continue
+        task_id = response.json()["data"]["task"]["uuid"]
+
+        await recorder.call("list", client.get("/api/v1/tasks/", headers=headers, params={"limit": 50}), 200)
+        await recorder.call("get", client.get(f"/api/v1/tasks/{task_id}", headers=headers), 200)
+        await recorder.call("update", client.put(
+            f"/api/v1/tasks/{task_id}", headers=headers, json={"title": f"load {i} updated"}
+        ), 200)
+        await recorder.call("status", client.put(
+            f"/api/v1/tasks/{task_id}/status", headers=headers, json={"status": "completed"}
+        ), 200)
+        await recorder.call("delete", client.delete(f"/api/v1/tasks/{task_id}", headers=headers), 204)
+
+
+@contextlib.asynccontextmanager
+async def _client(base_url: Optional[str], concurrency: int):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+            yield client
+        return
+
+    from main import app
+
+    # Every virtual user comes from one address and would hit the auth rate limits
+    Config.RATE_LIMIT_ENABLED = False
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60.0) as client:
+            yield client
+
+
+async def run(base_url: Optional[str], emails: list[str], concurrency: int, iterations: int) -> dict:
+    recorder = Recorder()
+    async with _client(base_url, concurrency) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _virtual_user(client, recorder, emails[i % len(emails)], iterations) for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    all_samples = [sample for samples in recorder.samples.values() for sample in samples]
+    return {
+        "operations": {
+            operation: summarize(recorder.samples[operation], recorder.errors[operation], elapsed)
+            for operation in OPERATIONS
+        },
+        "total": {**summarize(all_samples, sum(recorder.errors.values()), elapsed), "duration_s": round(elapsed, 2)},
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(result: dict, baseline: dict) -> None:
+    print(f"\n{'operation':<10} {'p50 ms':>10} {'base':>10} {'delta':>8} {'p99 ms':>10} {'base':>10} {'delta':>8}")
+    for operation in [*OPERATIONS, "total"]:
+        now = result["total"] if operation == "total" else result["operations"][operation]
+        then = baseline["total"] if operation == "total" else baseline["operations"].get(operation)
+        if not then:
+            continue
+        row = [f"{operation:<10}"]
+        for key in ("p50_ms", "p99_ms"):
+            delta = (now[key] - then[key]) / then[key] * 100 if then[key] else 0.0
+            row.append(f"{now[key]:>10.2f} {then[key]:>10.2f} {delta:>+7.1f}%")
+        print(" ".join(row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="run against a server instead of in-process")
+    parser.add_argument("--users", type=int, default=20, help="users to seed")
+    parser.add_argument("--tasks", type=int, default=100, help="tasks seeded per user")
+    parser.add_argument("--concurrency", type=int, default=20, help="virtual users")
+    parser.add_argument("--iterations", type=int, default=20, help="task rounds per virtual user")
+    parser.add_argument("--out", help="result file, defaults to benchmarks/results/<timestamp>.json")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    emails = seed(args.users, args.tasks)
+    result = asyncio.run(run(args.base_url, emails, args.concurrency, args.iterations))
+    result["meta"] = {
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "target": args.base_url or "in-process",
+        "database": Config.DB_URL.split(":", 1)[0] if Config.DB_URL else "postgresql",
+        "async_mode": Config.DB_ASYNC_MODE,
+        **{key: getattr(args, key) for key in ("users", "tasks", "concurrency", "iterations")},
+    }
+
+    out = args.out or os.path.join(
+        "benchmarks", "results", f"{dt.datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2)
+
+    for operation, stats in result["operations"].items():
+        print(f"{operation:<10} n={stats['count']:<6} err={stats['errors']:<4} "
+              f"p50={stats['p50_ms']:8.2f}ms p99={stats['p99_ms']:8.2f}ms")
+    print(f"total      {result['total']['throughput_rps']} req/s over {result['total']['duration_s']}s")
+    print(f"saved to {out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
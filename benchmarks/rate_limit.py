@@ -0,0 +1,69 @@
+"""
+Per-request overhead of the auth rate limiter: one sliding-window script
+call in Redis for the two login limits (per IP and per account), and the
+in-process token buckets used while Redis is down. Uses the Redis from
+the normal settings (.env); no database is needed:
+
+    python -m benchmarks.rate_limit --iterations 10000
+
+"spread" checks a new account each time, as a credential-stuffing run
+does; "hot" repeats one key, so most checks are rejected. The limiter's
+budget is 1ms per request.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from benchmarks.load import summarize
+from core.config import Config
+from db.redis import redis_client
+from utils.rate_limit import rate_limiter
+
+
+def _login_keys(ip: str, account: str) -> list[tuple[str, int, int]]:
+    return [
+        (f"bench:login:ip:{ip}", Config.RATE_LIMIT_LOGIN_PER_IP, Config.RATE_LIMIT_WINDOW),
+        (f"bench:login:account:{account}", Config.RATE_LIMIT_LOGIN_PER_ACCOUNT, Config.RATE_LIMIT_WINDOW),
+    ]
+
+
+async def _time(label: str, iterations: int, keys) -> None:
+    samples = []
+    limited = 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter()
+        if await rate_limiter.hit(keys(i)):
+            limited += 1
+        samples.append(time.perf_counter() - call_started)
+    result = summarize(samples, 0, time.perf_counter() - started)
+    print(f"{label:<22} {result['p50_ms'] * 1000:9.1f} {result['p99_ms'] * 1000:9.1f} "
+          f"{result['max_ms'] * 1000:9.1f} {limited:>8}")
+
+
+async def run(iterations: int) -> None:
+    run_id = uuid.uuid4().hex[:8]
+    print(f"{'check':<22} {'p50 us':>9} {'p99 us':>9} {'max us':>9} {'limited':>8}")
+
+    await _time("redis spread", iterations, lambda i: _login_keys(f"{run_id}-{i}", f"{run_id}-{i}"))
+    await _time("redis hot", iterations, lambda i: _login_keys(run_id, run_id))
+
+    # Route every check to the fallback, as the open circuit breaker does
+    breaker = redis_client.breaker
+    breaker.state, breaker._opened_at, breaker.reset_timeout = breaker.OPEN, time.monotonic(), float("inf")
+    await _time("local spread", iterations, lambda i: _login_keys(f"{run_id}-{i}", f"{run_id}-{i}"))
+    await _time("local hot", iterations, lambda i: _login_keys(run_id, run_id))
+    print(rate_limiter.stats())
+    await redis_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Cost of serializing a GET /tasks response body.
+
+Compares the old pipeline (TaskData built by hand, model_dump, the
+ResponseSchemas envelope dumped again, jsonable_encoder, stdlib json) with
+success_response's single pydantic-core pass. No database is needed:
+
+    python -m benchmarks.response_serialization --tasks 5000
+"""
+import argparse
+import datetime as dt
+import time
+import timeit
+import uuid
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Union
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from schema.task import TaskData, TaskListOut
+from utils.response import success_response
+
+
+class _ResponseSchemas(BaseModel):
+    status: str
+    message: str
+    data: Optional[Union[Dict[str, Any], List[Any]]] = None
+    errors: Optional[str] = None
+
+
+def _fake_tasks(count: int) -> list:
+    now = dt.datetime.now()
+    user_uuid = uuid.uuid4()
+    due_date = int(time.time()) + 86400
+    return [
+        SimpleNamespace(
+            uuid=uuid.uuid4(), title=f"task {i}", description="a task description", status="pending",
+            user_uuid=user_uuid, due_date=due_date, priority=i % 5 + 1, status_change=None,
+            created_at=now, updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def old_pipeline(tasks: list) -> bytes:
+    data = {"tasks": [TaskData(
+        uuid=task.uuid,
+        title=task.title,
+        description=task.description,
+        status=task.status,
+        user_uuid=task.user_uuid,
+        due_date=task.due_date,
+        priority=task.priority,
+        status_change=task.status_change,
+        created_at=task.created_at,
+        updated_at=task.updated_at
+    ) for task in tasks]}
+    data = {"tasks": [task.model_dump() for task in data["tasks"]], "next_cursor": None}
+    response = _ResponseSchemas(status="success", message="Tasks retrieved successfully", data=data, errors=None)
+    return JSONResponse(content=jsonable_encoder(response.model_dump())).body
+
+
+def new_pipeline(tasks: list) -> bytes:
+    return success_response(
+        data=TaskListOut.model_validate({"tasks": tasks, "next_cursor": None}),
+        message="Tasks retrieved successfully",
+    ).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tasks = _fake_tasks(args.tasks)
+    assert old_pipeline(tasks) == new_pipeline(tasks), "response bodies differ"
+
+    old = min(timeit.repeat(lambda: old_pipeline(tasks), number=1, repeat=args.repeat))
+    new = min(timeit.repeat(lambda: new_pipeline(tasks), number=1, repeat=args.repeat))
+    print(f"{args.tasks} tasks")
+    print(f"old pipeline: {old * 1000:8.2f} ms")
+    print(f"new pipeline: {new * 1000:8.2f} ms")
+    print(f"speed-up:     {old / new:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Synthetic data for the benchmarks: N users with M tasks each.
+
+Writes straight to the database from the normal settings (.env). Every
+user gets the same password, so the load driver can log in as any of them.
+Task dates, priorities and statuses are spread out so that list, filter
+and sort queries see realistic selectivity. For a local stand-in without
+Postgres, point DB_URL at a SQLite file; the tables are created for it:
+
+    DB_URL=sqlite:///bench.db python -m benchmarks.seed --users 100 --tasks 1000
+"""
+import argparse
+import datetime as dt
+import json
+import random
+import time
+import uuid
+
+import bcrypt
+from sqlalchemy import insert
+
+from core.config import Config
+from db.database import Base, SessionLocal, engine
+from models import Task, User
+from schema.task import TaskType
+from service.password_hasher import password_hasher
+from service.task_counters import task_counters
+
+PASSWORD = "benchmark-password"
+
+_STATUSES = [TaskType.PENDING.value, TaskType.IN_PROGRESS.value, TaskType.COMPLETED.value]
+
+
+def ensure_schema() -> None:
+    """Create the tables on SQLite; Postgres schemas come from alembic."""
+
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+
+
+def _hash_password() -> str:
+    # One hash at the cost the server will pick, so logins don't trigger a rehash
+    rounds = Config.PASSWORD_HASH_ROUNDS or password_hasher.calibrate(Config.PASSWORD_HASH_TARGET_MS)
+    return bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=rounds)).decode()
+
+
+def _task_rows(user_uuid: uuid.UUID, count: int, rng: random.Random) -> list[dict]:
+    now = time.time()
+    rows = []
+    for _ in range(count):
+        created_at = dt.datetime.now() - dt.timedelta(seconds=rng.randint(0, 180 * 24 * 3600))
+        rows.append({
+            "uuid": uuid.uuid4(),
+            "user_uuid": user_uuid,
+            "title": f"task {rng.randint(0, 10**6)}",
+            "description": rng.choice(["", "short description", "a somewhat longer task description " * 4]),
+            "status": rng.choice(_STATUSES),
+            "priority": rng.randint(1, 5),
+            # Mostly upcoming, some overdue
+            "due_date": int(now + rng.randint(-30, 90) * 24 * 3600),
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+    return rows
+
+
+def seed(users: int, tasks: int, batch_size: int = 5000, rng_seed: int = 0) -> list[str]:
+    """
+    Inserts users × tasks rows and returns the users' emails, which are
+    unique per run so seeding can be repeated against the same database.
+    """
+    ensure_schema()
+    rng = random.Random(rng_seed)
+    run = uuid.uuid4().hex[:8]
+    password_hash = _hash_password()
+
+    user_rows = [
+        {"uuid": uuid.uuid4(), "username": f"bench{i}", "email": f"bench-{run}-{i}@example.com",
+         "password_hash": password_hash}
+        for i in range(users)
+    ]
+    with SessionLocal() as db:
+        db.execute(insert(User), user_rows)
+        pending: list[dict] = []
+        for user in user_rows:
+            pending.extend(_task_rows(user["uuid"], tasks, rng))
+            if len(pending) >= batch_size:
+                db.execute(insert(Task), pending)
+                pending = []
+        if pending:
+            db.execute(insert(Task), pending)
+        # The rows bypass TaskService, so count them into task_counters here
+        task_counters.reconcile(db, [user["uuid"] for user in user_rows])
+        db.commit()
+    return [user["email"] for user in user_rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=100, help="tasks per user")
+    parser.add_argument("--out", help="write the seeded users to this JSON file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    emails = seed(args.users, args.tasks)
+    print(f"seeded {args.users} users x {args.tasks} tasks in {time.perf_counter() - started:.1f}s")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"password": PASSWORD, "emails": emails}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Idle-connection capacity and fan-out latency of GET /tasks/stream.
+
+Opens --connections SSE streams against a running server (one worker, so
+they all land on it), spread over seeded users at --per-user streams
+each, keeps them idle for --idle seconds, then creates a task for
+--writers of those users and times how long each of their streams takes
+to receive the event:
+
+    python -m benchmarks.task_stream --base-url http://localhost:8000 --connections 10000
+
+Watch the worker's RSS and task_stream_clients on /metrics (with X-Admin-Key) meanwhile.
+Start the server with a file descriptor limit above the connection count
+(ulimit -n) and a TASK_STREAM_MAX_PER_USER of at least --per-user.
+"""
+import argparse
+import asyncio
+import resource
+import time
+
+import httpx
+from sqlalchemy import select
+
+from benchmarks.load import summarize
+from benchmarks.seed import seed
+from db.database import SessionLocal
+from models import User
+from schema.token import TokenType
+from service.user import user_service
+
+
+async def _open(client: httpx.AsyncClient, token: str, index: int, received: dict, opened: list[int],
+                total: int, ready: asyncio.Event) -> None:
+    """Holds one stream open, recording when it gets its first created event; opened counts [open, refused]."""
+
+    def count(outcome: int) -> None:
+        opened[outcome] += 1
+        if sum(opened) == total:
+            ready.set()
+
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        async with client.stream("GET", "/api/v1/tasks/stream", headers=headers) as response:
+            if response.status_code != 200:
+                count(1)
+                return
+            async for line in response.aiter_lines():
+                if line == ": connected":
+                    count(0)
+                elif line.startswith("event: created"):
+                    received.setdefault(index, time.perf_counter())
+    except httpx.HTTPError:
+        count(1)
+
+
+async def run(base_url: str, connections: int, per_user: int, idle: float, writers: int) -> None:
+    users = -(-connections // per_user)
+    emails = seed(users, 0)
+    with SessionLocal() as db:
+        rows = db.execute(select(User.uuid, User.username, User.email).where(User.email.in_(emails))).all()
+    tokens = [
+        user_service._create_token(uuid=uuid, type=TokenType.ACCESS, username=username, email=email)
+        for uuid, username, email in rows
+    ]
+
+    received: dict[int, float] = {}
+    opened = [0, 0]
+    ready = asyncio.Event()
+    limits = httpx.Limits(max_connections=connections + writers, max_keepalive_connections=writers)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+        started = time.perf_counter()
+        streams = [
+            asyncio.create_task(_open(client, tokens[i // per_user], i, received, opened, connections, ready))
+            for i in range(connections)
+        ]
+        await ready.wait()
+        print(f"{opened[0]} streams open ({opened[1]} refused) in {time.perf_counter() - started:.1f}s")
+        await asyncio.sleep(idle)
+
+        # Each writer's task goes to the per_user streams of its user
+        due_date = int(time.time()) + 30 * 24 * 3600
+        sent = {}
+        for user in range(min(writers, len(tokens))):
+            sent[user] = time.perf_counter()
+            await client.post("/api/v1/tasks/", json={"title": "stream", "due_date": due_date},
+                              headers={"Authorization": f"Bearer {tokens[user]}"})
+        await asyncio.sleep(2)
+
+        latencies = [received[i] - sent[i // per_user] for i in received if i // per_user in sent]
+        expected = sum(min(per_user, connections - user * per_user) for user in sent)
+        result = summarize(latencies, expected - len(latencies), 1.0)
+        print(f"fan-out to {len(latencies)}/{expected} streams: p50 {result['p50_ms']}ms "
+              f"p99 {result['p99_ms']}ms max {result['max_ms']}ms")
+        for stream in streams:
+            stream.cancel()
+        await asyncio.gather(*streams, return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--per-user", type=int, default=10)
+    parser.add_argument("--idle", type=float, default=30, help="seconds to hold the streams idle")
+    parser.add_argument("--writers", type=int, default=50, help="users that create a task")
+    args = parser.parse_args()
+
+    # The client holds one socket per stream too
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, args.connections + 1024)), hard))
+    asyncio.run(run(args.base_url, args.connections, args.per_user, args.idle, args.writers))
+
+
+if __name__ == "__main__":
+    main()
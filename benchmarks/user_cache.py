@@ -0,0 +1,72 @@
+"""
+Per-request cost of resolving the current user: the users SELECT that
+get_current_user used to run every time versus the two-tier user cache.
+
+Uses the database and Redis from the normal settings (.env):
+
+    python -m benchmarks.user_cache --iterations 5000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from db.database import SessionLocal
+from models import User
+from schema.user import UserData
+from service.user import user_service
+from service.user_cache import user_cache
+
+
+def _create_user() -> User:
+    with SessionLocal() as db:
+        user = User(
+            username="bench",
+            email=f"bench-{uuid.uuid4().hex[:12]}@example.com",
+            password_hash="not-a-real-hash",
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+
+
+async def _time(label: str, iterations: int, fn) -> None:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {elapsed / iterations * 1e6:9.1f} us/lookup")
+
+
+async def run(iterations: int) -> None:
+    user = _create_user()
+    user_data = UserData(uuid=user.uuid, username=user.username, email=user.email)
+
+    with SessionLocal() as db:
+        await _time("database query", iterations, lambda: user_service.get_user_with_uuid(uuid=user.uuid, db=db))
+
+    await user_cache.set(user_data)
+    await _time("local tier hit", iterations, lambda: user_cache.get(user.uuid))
+
+    async def redis_hit():
+        user_cache.local.pop(user.uuid)
+        await user_cache.get(user.uuid)
+
+    await _time("redis tier hit", iterations, redis_hit)
+    print(user_cache.stats())
+
+    with SessionLocal() as db:
+        db.delete(db.get(User, user.uuid))
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -16,6 +17,34 @@ class Settings(BaseSettings):
     DB_USER: str
     DB_PASSWORD: str
     DB_NAME: str
+    DB_ASYNC_MODE: bool = False
+    # Full SQLAlchemy URLs overriding the DB_* parts above, e.g. sqlite:///bench.db
+    # as a local stand-in for benchmarks. Not for production.
+    DB_URL: Optional[str] = None
+    DB_ASYNC_URL: Optional[str] = None
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds; keep below any server/LB idle timeout
+    DB_PGBOUNCER_MODE: bool = False  # PgBouncer does the pooling: NullPool, no prepared statement caches
+
+    # Task settings
+    TASK_BULK_MAX_ITEMS: int = 1000
+    TASK_EXPORT_BATCH_SIZE: int = 1000
+    TASK_TOMBSTONE_RETENTION_DAYS: int = 30  # sync tokens older than this must resync from scratch
+    # Group commit: concurrent POST /tasks wait up to MAX_DELAY_MS and are written together
+    TASK_GROUP_COMMIT: bool = False
+    TASK_GROUP_COMMIT_MAX_DELAY_MS: float = 2
+    TASK_GROUP_COMMIT_MAX_BATCH: int = 100
+    # Live task streams (GET /tasks/stream), per worker
+    TASK_STREAM_MAX_CLIENTS: int = 10000
+    TASK_STREAM_MAX_PER_USER: int = 20
+    TASK_STREAM_QUEUE_SIZE: int = 100  # events buffered per client before it is sent a resync instead
+    TASK_STREAM_HEARTBEAT: float = 25  # seconds between SSE keep-alive comments
+    # Direct Postgres URL for the LISTEN connection; needed behind PgBouncer in transaction mode
+    TASK_STREAM_LISTEN_URL: Optional[str] = None
 
     # Security Settings
     SECRET_KEY: str
@@ -23,9 +52,56 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     JWT_REFRESH_EXPIRY: int
     DEBUG_MODE: bool
+    AUTH_STATELESS: bool = False  # authorize from access-token claims, no per-request user lookup
+    TOKEN_CACHE_SIZE: int = 10000  # verified JWTs kept per process; 0 disables
+
+    # Password hashing settings
+    PASSWORD_HASH_ROUNDS: Optional[int] = None  # fixed bcrypt cost; calibrated at startup when unset
+    PASSWORD_HASH_TARGET_MS: int = 250
+    PASSWORD_HASH_ROUNDS_TTL: int = 24 * 3600  # how long workers keep the first worker's calibrated cost
+    PASSWORD_HASH_MIN_ROUNDS: int = 10
+    PASSWORD_HASH_MAX_ROUNDS: int = 14
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+
+    # Reminder worker settings (python -m jobs.reminders)
+    REMINDER_HORIZON: int = 3600  # seconds of upcoming reminders held in memory
+    REMINDER_LEAD: int = 0  # seconds before the due date to send the reminder
+    REMINDER_BATCH_SIZE: int = 1000
+    REMINDER_SINK: str = "jobs.reminders:LogSink"  # module:class of the ReminderSink
+
+    # Rate limits of the auth routes, per window seconds
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_WINDOW: int = 60
+    RATE_LIMIT_LOGIN_PER_IP: int = 30
+    RATE_LIMIT_LOGIN_PER_ACCOUNT: int = 10
+    RATE_LIMIT_REGISTER_PER_IP: int = 10
+    RATE_LIMIT_LOCAL_KEYS: int = 10000  # token buckets kept per process while Redis is down
+
+    # Admin settings
+    ADMIN_API_KEY: Optional[str] = None
+
+    # Observability settings
+    METRICS_ENABLED: bool = True  # request timing middleware and GET /metrics (needs ADMIN_API_KEY)
+    QUERY_REPEAT_WARN_THRESHOLD: int = 3  # DEBUG_MODE: warn when one statement runs this often in a request
 
     # Redis settings
     REDIS_URL: str
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    REDIS_CONNECT_TIMEOUT: float = 0.5
+    REDIS_BREAKER_FAILURES: int = 5  # consecutive errors before failing fast
+    REDIS_BREAKER_RESET: float = 10  # seconds before probing Redis again
+
+    # User cache settings
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_LOCAL_TTL: int = 30
+    USER_CACHE_REDIS_TTL: int = 300
+
+    # Task cache settings
+    TASK_CACHE_ENABLED: bool = True
+    TASK_CACHE_TTL: int = 300
+    TASK_VERSION_TTL: int = 60  # a version is replaced at least this often, even without writes
 
     class Config:
         env_file = ".env"
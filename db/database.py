@@ -1,18 +1,52 @@
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from core.config import Config
+from db.pool import engine_options, instrument
+
+DATABASE_URL = Config.DB_URL or f"postgresql://{Config.DB_USER}:{Config.DB_PASSWORD}@{Config.DB_HOST}:{Config.DB_PORT}/{Config.DB_NAME}"
+ASYNC_DATABASE_URL = Config.DB_ASYNC_URL or f"postgresql+asyncpg://{Config.DB_USER}:{Config.DB_PASSWORD}@{Config.DB_HOST}:{Config.DB_PORT}/{Config.DB_NAME}"
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, is_async=False))
+pool_metrics = instrument(engine)
+
+
+def sqlite_functions(dbapi_connection, connection_record):
+    """
+    Stand-ins for the Postgres functions the schema's generated columns call
+    (tasks.search_vector), so the SQLite benchmark database can store rows.
+    Full-text search itself stays Postgres-only.
+    """
+    dbapi_connection.create_function("to_tsvector", 2, lambda config, text: text, deterministic=True)
 
-DATABASE_URL = f"postgresql://{Config.DB_USER}:{Config.DB_PASSWORD}@{Config.DB_HOST}:{Config.DB_PORT}/{Config.DB_NAME}"
 
-engine = create_engine(DATABASE_URL, echo=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", sqlite_functions)
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
+# The async engine is only built in async mode so that asyncpg is not
+# imported by deployments that stay on the psycopg2 threadpool path.
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True)) if Config.DB_ASYNC_MODE else None
+async_pool_metrics = instrument(async_engine.sync_engine) if async_engine is not None else None
+if async_engine is not None and async_engine.dialect.name == "sqlite":
+    event.listen(async_engine.sync_engine, "connect", sqlite_functions)
+AsyncSessionLocal = (
+    async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine is not None else None
+)
+
+T = TypeVar("T")
 
 
-def get_db():
+def get_sync_db():
     """
     Dependency to get a database session.
     """
@@ -20,4 +54,51 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()  
+        db.close()
+
+
+async def get_async_db():
+    """
+    Dependency to get an async database session.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+get_db = get_async_db if Config.DB_ASYNC_MODE else get_sync_db
+
+
+@asynccontextmanager
+async def open_session() -> AsyncIterator[Session | AsyncSession]:
+    """
+    A session of the kind get_db hands out, for work outside a request's
+    dependencies (batches serving many requests, long-lived connections
+    that must not hold a pooled connection). Closed on exit.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        with SessionLocal() as db:
+            yield db
+
+
+async def run_in_session(db: Session | AsyncSession, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Run a service function that works on a sync ``Session`` against whichever
+    session ``get_db`` handed out.
+
+    In async mode the function runs through ``AsyncSession.run_sync`` so the
+    queries go over asyncpg without holding a thread. In sync mode it runs in
+    the threadpool against the psycopg2 session, as the sync routes used to.
+
+    Args:
+        db (Session | AsyncSession): session from ``get_db``
+        fn (Callable): function taking the sync session as ``db``
+
+    Returns:
+        whatever ``fn`` returns
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: fn(*args, db=session, **kwargs))
+    return await run_in_threadpool(fn, *args, db=db, **kwargs)
@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from core.config import Config
+
+
+class PoolMetrics:
+    """
+    Connection pool telemetry for one engine, fed by instrument() below
+    from the pool's public API and SQLAlchemy pool events.
+
+    Checkout latency is the time spent in the pool handing out a connection,
+    including opening a new one. Wait time is the part of that spent when the
+    pool was exhausted on arrival, i.e. queueing for another request to
+    check a connection back in. Recent samples are kept for percentiles.
+    """
+
+    def __init__(self, samples: int = 1024):
+        self.pool: Optional[Pool] = None
+        self.checkouts = 0
+        self.checkout_time = 0.0
+        self.checkout_time_max = 0.0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self._recent: deque[float] = deque(maxlen=samples)
+        self._lock = threading.Lock()
+
+    def record_checkout(self, elapsed: float, waited: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_time += elapsed
+            self.checkout_time_max = max(self.checkout_time_max, elapsed)
+            self._recent.append(elapsed)
+            if waited:
+                self.waits += 1
+                self.wait_time += elapsed
+                self.wait_time_max = max(self.wait_time_max, elapsed)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self, soft: bool) -> None:
+        with self._lock:
+            if soft:
+                self.soft_invalidations += 1
+            else:
+                self.invalidations += 1
+
+    def _percentile(self, samples: list[float], q: float) -> float:
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent)
+        pool = self.pool
+        return {
+            "pool_class": type(pool).__name__ if pool else None,
+            "size": pool.size() if isinstance(pool, QueuePool) else None,
+            "in_use": pool.checkedout() if isinstance(pool, QueuePool) else None,
+            "idle": pool.checkedin() if isinstance(pool, QueuePool) else None,
+            "overflow": pool.overflow() if isinstance(pool, QueuePool) else None,
+            "checkouts": self.checkouts,
+            "checkout_ms_avg": round(self.checkout_time / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "checkout_ms_p50": round(self._percentile(recent, 0.50) * 1000, 3),
+            "checkout_ms_p99": round(self._percentile(recent, 0.99) * 1000, 3),
+            "checkout_ms_max": round(self.checkout_time_max * 1000, 3),
+            "waits": self.waits,
+            "wait_ms_total": round(self.wait_time * 1000, 3),
+            "wait_ms_max": round(self.wait_time_max * 1000, 3),
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "soft_invalidations": self.soft_invalidations,
+        }
+
+
+def engine_options(url: str, is_async: bool) -> dict[str, Any]:
+    """
+    create_engine/create_async_engine keyword arguments from the DB_* settings.
+
+    In PgBouncer mode the app keeps no pool of its own (PgBouncer is the
+    pool) and asyncpg's prepared statement caches are disabled, since
+    prepared statements do not survive transaction pooling.
+    """
+    options: dict[str, Any] = {"echo": Config.DB_ECHO, "pool_pre_ping": Config.DB_POOL_PRE_PING}
+    if make_url(url).get_backend_name() == "sqlite":
+        # Local stand-in only; sessions move between threadpool threads
+        options["connect_args"] = {"check_same_thread": False}
+    elif Config.DB_PGBOUNCER_MODE:
+        options["poolclass"] = NullPool
+        if is_async:
+            options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+        return options
+
+    options.update(
+        poolclass=AsyncAdaptedQueuePool if is_async else QueuePool,
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def _is_exhausted(pool: Pool) -> bool:
+    """Whether a checkout from pool has to wait for a connection to come back."""
+
+    if not isinstance(pool, QueuePool) or Config.DB_MAX_OVERFLOW < 0:
+        return False
+    return pool.checkedin() == 0 and pool.overflow() >= Config.DB_MAX_OVERFLOW
+
+
+def _time_connect(pool: Pool, metrics: PoolMetrics) -> None:
+    """Wraps pool.connect(), through which the engine checks out every connection, to time it."""
+
+    connect = pool.connect
+
+    def timed_connect():
+        waited = _is_exhausted(pool)
+        started = time.perf_counter()
+        try:
+            connection = connect()
+        except TimeoutError:
+            metrics.record_timeout()
+            raise
+        metrics.record_checkout(time.perf_counter() - started, waited)
+        return connection
+
+    pool.connect = timed_connect
+    metrics.pool = pool
+
+
+def instrument(engine: Engine) -> PoolMetrics:
+    """Attach a PoolMetrics to the engine's pool and subscribe it to pool events."""
+
+    metrics = PoolMetrics()
+    _time_connect(engine.pool, metrics)
+
+    @event.listens_for(engine, "engine_disposed")
+    def _disposed(disposed_engine):
+        # dispose() swaps in a fresh pool; keep reporting into the same metrics
+        _time_connect(engine.pool, metrics)
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        metrics.record_connect()
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(dbapi_connection, connection_record, exception):
+        metrics.record_invalidation(soft=False)
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _soft_invalidate(dbapi_connection, connection_record, exception):
+        metrics.record_invalidation(soft=True)
+
+    return metrics
+
+
+def pool_stats(engines: dict[str, Optional[PoolMetrics]]) -> dict[str, Any]:
+    """Snapshot of every instrumented engine in this worker, by name."""
+
+    return {
+        "pid": os.getpid(),
+        "engines": {name: m.snapshot() for name, m in engines.items() if m is not None},
+    }
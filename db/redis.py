@@ -0,0 +1,240 @@
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+import redis.asyncio as redis
+from redis.asyncio.client import PubSub
+from redis.exceptions import ConnectionError, TimeoutError
+
+from core.config import Config
+from utils.metrics import record_redis_call
+
+
+class RedisUnavailable(ConnectionError):
+    """
+    Raised without touching the network while the circuit breaker is open.
+    It is a RedisError, so every caller's existing degraded path handles it.
+    """
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After REDIS_BREAKER_FAILURES connection errors or timeouts in a row the
+    breaker opens and calls fail fast for REDIS_BREAKER_RESET seconds. The
+    first call after that is let through as a probe: success closes the
+    breaker, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        # One probe per reset_timeout; a probe that never reports back (e.g.
+        # cancelled) just lets the next one through a timeout later.
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+class RedisMetrics:
+    """Latency and error counters for commands sent through RedisClient."""
+
+    def __init__(self, samples: int = 1024):
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0
+        self.latency = 0.0
+        self.latency_max = 0.0
+        self._recent: deque[float] = deque(maxlen=samples)
+
+    def record(self, elapsed: float, failed: bool) -> None:
+        self.calls += 1
+        self.latency += elapsed
+        self.latency_max = max(self.latency_max, elapsed)
+        self._recent.append(elapsed)
+        if failed:
+            self.errors += 1
+
+    def _percentile(self, samples: list[float], q: float) -> float:
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def snapshot(self) -> dict[str, Any]:
+        recent = sorted(self._recent)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "latency_ms_avg": round(self.latency / self.calls * 1000, 3) if self.calls else 0.0,
+            "latency_ms_p50": round(self._percentile(recent, 0.50) * 1000, 3),
+            "latency_ms_p99": round(self._percentile(recent, 0.99) * 1000, 3),
+            "latency_ms_max": round(self.latency_max * 1000, 3),
+        }
+
+
+class _GuardedPipeline:
+    """A redis pipeline whose execute() goes through the client's breaker."""
+
+    def __init__(self, client: "RedisClient", pipeline):
+        self._client = client
+        self._pipeline = pipeline
+
+    async def __aenter__(self):
+        await self._pipeline.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return await self._pipeline.__aexit__(*exc_info)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._pipeline, name)
+        if not callable(attr):
+            return attr
+
+        def queue(*args, **kwargs):
+            attr(*args, **kwargs)
+            return self
+
+        return queue
+
+    async def execute(self, *args, **kwargs):
+        return await self._client._run(lambda: self._pipeline.execute(*args, **kwargs))
+
+
+class RedisClient:
+    """
+    The app's shared redis.asyncio client.
+
+    start() (called from the app lifespan) builds one connection pool with
+    socket and connect timeouts; scripts that never run the lifespan get the
+    same pool on first use. Every command is timed and goes through a
+    circuit breaker, and all failures surface as RedisError so callers keep
+    their degraded behavior. Commands are proxied, so call sites use the
+    usual redis.asyncio API: ``await redis_client.get(key)``.
+
+    use() swaps in another client, e.g. a fakeredis FakeAsyncRedis in tests.
+    """
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(Config.REDIS_BREAKER_FAILURES, Config.REDIS_BREAKER_RESET)
+        self.metrics = RedisMetrics()
+        self._client: Optional[redis.Redis] = None
+        self._owned = False
+
+    def _connect(self) -> redis.Redis:
+        return redis.Redis.from_url(
+            Config.REDIS_URL,
+            decode_responses=True,
+            max_connections=Config.REDIS_MAX_CONNECTIONS,
+            socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=Config.REDIS_CONNECT_TIMEOUT,
+            health_check_interval=30,
+        )
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client, self._owned = self._connect(), True
+        return self._client
+
+    def use(self, client: redis.Redis) -> None:
+        """Serve every command from client; start() and close() leave it alone."""
+
+        self._client, self._owned = client, False
+
+    async def start(self) -> None:
+        self.client
+
+    async def close(self) -> None:
+        if self._client is not None and self._owned:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    async def _run(self, command: Callable[[], Any]) -> Any:
+        if not self.breaker.allow():
+            self.metrics.rejected += 1
+            raise RedisUnavailable("Redis circuit breaker is open")
+
+        started = time.perf_counter()
+        try:
+            result = await command()
+        except (ConnectionError, TimeoutError):
+            self._record(started, failed=True)
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            # Command errors (WRONGTYPE and the like) mean the server is up
+            self._record(started, failed=True)
+            self.breaker.record_success()
+            raise
+        self._record(started, failed=False)
+        self.breaker.record_success()
+        return result
+
+    def _record(self, started: float, failed: bool) -> None:
+        elapsed = time.perf_counter() - started
+        self.metrics.record(elapsed, failed)
+        record_redis_call(elapsed)
+
+    def pipeline(self, transaction: bool = True) -> _GuardedPipeline:
+        return _GuardedPipeline(self, self.client.pipeline(transaction=transaction))
+
+    def pubsub(self) -> PubSub:
+        """
+        A PubSub on its own connection. Subscriptions are long-lived, so they
+        bypass the circuit breaker and metrics; poll with get_message(timeout=...)
+        rather than listen(), which would trip the pool's socket timeout.
+        """
+        return self.client.pubsub(ignore_subscribe_messages=True)
+
+    def __getattr__(self, name: str):
+        command = getattr(self.client, name)
+        if not callable(command):
+            return command
+
+        async def run(*args, **kwargs):
+            return await self._run(lambda: command(*args, **kwargs))
+
+        return run
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "breaker": self.breaker.state,
+            "breaker_opened": self.breaker.opened,
+            "consecutive_failures": self.breaker.failures,
+            **self.metrics.snapshot(),
+        }
+
+
+# Shared by every service that talks to Redis (token blacklist, caches, task versions).
+redis_client = RedisClient()
@@ -0,0 +1,61 @@
+"""
+Deletes task tombstones older than TASK_TOMBSTONE_RETENTION_DAYS.
+
+GET /tasks/changes answers 410 to sync tokens older than the retention,
+so those clients sync from scratch and never need the purged tombstones.
+Run it daily from cron; it is safe next to live traffic and can be re-run
+at any time:
+
+    python -m jobs.purge_tombstones
+    python -m jobs.purge_tombstones --batch-size 5000
+
+Tombstones are deleted oldest first, one transaction per batch, so locks
+and WAL stay bounded whatever the backlog.
+"""
+import argparse
+import datetime
+import time
+
+from sqlalchemy import delete, select
+
+from core.config import Config
+from db.database import SessionLocal
+from models import TaskTombstone
+from models.base import clock_now
+
+
+def purge_tombstones(batch_size: int = 1000, retention_days: int = Config.TASK_TOMBSTONE_RETENTION_DAYS) -> int:
+    """Deletes the tombstones older than retention_days; returns how many."""
+
+    with SessionLocal() as db:
+        # Database time, as GET /tasks/changes compares tokens against
+        cutoff = db.scalar(select(clock_now())) - datetime.timedelta(days=retention_days)
+
+    purged = 0
+    while True:
+        with SessionLocal() as db:
+            batch = (
+                select(TaskTombstone.task_uuid)
+                .where(TaskTombstone.deleted_at < cutoff)
+                .order_by(TaskTombstone.deleted_at)
+                .limit(batch_size)
+            )
+            deleted = db.execute(delete(TaskTombstone).where(TaskTombstone.task_uuid.in_(batch))).rowcount
+            db.commit()
+        purged += deleted
+        if deleted < batch_size:
+            return purged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000, help="tombstones per transaction")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    purged = purge_tombstones(args.batch_size)
+    print(f"purged {purged} tombstones in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Recounts every user's tasks and fixes task_counters rows that drifted.
+
+TaskService keeps the counters in step with tasks inside each write's
+transaction, so drift only comes from writes made around it (manual SQL,
+restored backups, bugs). Run it from cron or after such an event; it is
+safe next to live traffic and can be re-run at any time:
+
+    python -m jobs.reconcile_counters
+    python -m jobs.reconcile_counters --batch-size 200
+
+Users are walked in uuid order, one transaction per batch.
+"""
+import argparse
+import time
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+
+from db.database import SessionLocal
+from models import User
+from service.task_counters import task_counters
+
+
+def reconcile_all(batch_size: int = 500) -> tuple[int, int]:
+    """Reconciles every user; returns (users checked, counters fixed)."""
+
+    users = fixed = 0
+    last: Optional[UUID] = None
+    while True:
+        with SessionLocal() as db:
+            stmt = select(User.uuid).order_by(User.uuid).limit(batch_size)
+            if last is not None:
+                stmt = stmt.where(User.uuid > last)
+            batch = list(db.scalars(stmt))
+            if not batch:
+                return users, fixed
+            fixed += task_counters.reconcile(db, batch)
+            db.commit()
+        users += len(batch)
+        last = batch[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="users per transaction")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    users, fixed = reconcile_all(args.batch_size)
+    print(f"checked {users} users, fixed {fixed} counters in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
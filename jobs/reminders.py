@@ -0,0 +1,272 @@
+"""
+Reminder worker: sends a reminder when an open task comes due.
+
+Holds the reminders of the next REMINDER_HORIZON seconds in a min-heap,
+loaded in REMINDER_BATCH_SIZE batches from the open-task due_date partial
+index, so memory and queries scale with what is due soon rather than with
+the number of pending tasks. TaskService publishes tasks whose due date or
+status now put them inside that window, and every reminder is re-checked
+against the database just before it is sent. Reminders go to the sink
+named by REMINDER_SINK (LogSink, RedisStreamSink or your own class).
+
+Run exactly one instance:
+
+    python -m jobs.reminders
+
+The last send time is kept in Redis, so after a restart the reminders that
+came due while the worker was down are sent too.
+"""
+import asyncio
+import heapq
+import importlib
+import json
+import logging
+import signal
+import time
+from typing import NamedTuple, Protocol
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from sqlalchemy import select, tuple_
+
+from core.config import Config
+from db.database import SessionLocal
+from db.redis import redis_client
+from models import Task
+from service.task import OPEN_TASK, REMINDER_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_KEY = "task_reminders:watermark"
+
+
+class Reminder(NamedTuple):
+    task_uuid: UUID
+    user_uuid: UUID
+    title: str
+    due_date: int
+
+
+class ReminderSink(Protocol):
+    async def send(self, reminders: list[Reminder]) -> None:
+        """Delivers a batch of reminders; raising makes the worker retry them."""
+
+
+class LogSink:
+    """Logs every reminder. The default, until a real channel is wired in."""
+
+    async def send(self, reminders: list[Reminder]) -> None:
+        for reminder in reminders:
+            logger.info("Task %s of user %s is due: %s", reminder.task_uuid, reminder.user_uuid, reminder.title)
+
+
+class RedisStreamSink:
+    """Appends reminders to a Redis stream, for notification workers to consume."""
+
+    STREAM = "task_reminders:stream"
+    MAX_LENGTH = 100_000
+
+    async def send(self, reminders: list[Reminder]) -> None:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for reminder in reminders:
+                pipe.xadd(self.STREAM, {
+                    "task_uuid": str(reminder.task_uuid),
+                    "user_uuid": str(reminder.user_uuid),
+                    "title": reminder.title,
+                    "due_date": reminder.due_date,
+                }, maxlen=self.MAX_LENGTH, approximate=True)
+            await pipe.execute()
+
+
+def load_sink(path: str) -> ReminderSink:
+    """Instantiates the sink class named by a "module:Class" path."""
+
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)()
+
+
+class ReminderScheduler:
+    """
+    Every reminder that fires at or before watermark has been sent; the
+    heap holds every open task whose reminder fires in (watermark,
+    loaded_until], keyed on fire time (due_date - lead). The window is
+    extended by at most one horizon at a time, so catching up after a long
+    outage is done in bounded steps too.
+
+    Heap entries are never removed in place: a task that was completed,
+    deleted or rescheduled leaves a stale entry that is dropped when the
+    database check before sending no longer matches it.
+    """
+
+    def __init__(self, sink: ReminderSink, horizon: int = Config.REMINDER_HORIZON, lead: int = Config.REMINDER_LEAD,
+                 batch_size: int = Config.REMINDER_BATCH_SIZE):
+        self.sink = sink
+        self.horizon = horizon
+        self.lead = lead
+        self.batch_size = batch_size
+        self.watermark = 0.0
+        self.loaded_until = 0.0
+        self.sent = 0
+        self._heap: list[tuple[int, UUID]] = []
+        # due_date of reminders sent for tasks not yet due; with a lead, a task
+        # can be published again after its reminder went out
+        self._sent: dict[UUID, int] = {}
+        self._wake = asyncio.Event()
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+
+    def _load_range(self, start: float, end: float) -> list[tuple[int, UUID]]:
+        """(fire_at, uuid) of the open tasks whose reminder fires in (start, end], batch by batch."""
+
+        entries = []
+        last = None
+        with SessionLocal() as db:
+            while True:
+                stmt = select(Task.due_date, Task.uuid).where(
+                    OPEN_TASK, Task.due_date > int(start) + self.lead, Task.due_date <= int(end) + self.lead
+                )
+                if last is not None:
+                    stmt = stmt.where(tuple_(Task.due_date, Task.uuid) > tuple_(*last))
+                rows = db.execute(stmt.order_by(Task.due_date, Task.uuid).limit(self.batch_size)).all()
+                entries.extend((due_date - self.lead, task_uuid) for due_date, task_uuid in rows)
+                if len(rows) < self.batch_size:
+                    return entries
+                last = rows[-1]
+
+    def _current(self, due: dict[UUID, set[int]]) -> list[Reminder]:
+        """The reminders among due ({uuid: fire times}) whose task is still open and due then."""
+
+        reminders = []
+        task_ids = list(due)
+        with SessionLocal() as db:
+            for i in range(0, len(task_ids), self.batch_size):
+                rows = db.execute(
+                    select(Task.uuid, Task.user_uuid, Task.title, Task.due_date)
+                    .where(Task.uuid.in_(task_ids[i:i + self.batch_size]), OPEN_TASK)
+                )
+                reminders.extend(
+                    Reminder(*row) for row in rows if row.due_date is not None and row.due_date - self.lead in due[row.uuid]
+                )
+        return reminders
+
+    async def extend(self, now: float) -> None:
+        end = min(now + self.horizon, self.loaded_until + self.horizon)
+        start, self.loaded_until = self.loaded_until, end  # published tasks up to end are kept from here on
+        for entry in await asyncio.to_thread(self._load_range, start, end):
+            heapq.heappush(self._heap, entry)
+
+    def reload(self) -> None:
+        """Rebuilds the window, after messages may have been missed."""
+
+        self._heap = []
+        self.loaded_until = self.watermark
+        self._wake.set()
+
+    def schedule(self, task_uuid: UUID, due_date: int) -> None:
+        fire_at = due_date - self.lead
+        if fire_at <= self.loaded_until:
+            heapq.heappush(self._heap, (fire_at, task_uuid))
+            if self._heap[0] == (fire_at, task_uuid):
+                self._wake.set()
+
+    async def fire(self, now: float) -> int:
+        """Sends every reminder due by now; returns how many were sent."""
+
+        due: dict[UUID, set[int]] = {}
+        popped = []
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, task_uuid = heapq.heappop(self._heap)
+            popped.append((fire_at, task_uuid))
+            due.setdefault(task_uuid, set()).add(fire_at)
+
+        reminders = await asyncio.to_thread(self._current, due) if due else []
+        reminders = [reminder for reminder in reminders if self._sent.get(reminder.task_uuid) != reminder.due_date]
+        if reminders:
+            try:
+                await self.sink.send(reminders)
+            except Exception:
+                logger.exception("Reminder sink failed, retrying %d reminders", len(reminders))
+                for entry in popped:
+                    heapq.heappush(self._heap, entry)
+                await asyncio.sleep(1)
+                return 0
+
+        self.watermark = now
+        self.sent += len(reminders)
+        self._sent.update((reminder.task_uuid, reminder.due_date) for reminder in reminders)
+        self._sent = {task_uuid: due_date for task_uuid, due_date in self._sent.items() if due_date > now}
+        try:
+            await redis_client.set(WATERMARK_KEY, now)
+        except RedisError:
+            pass
+        return len(reminders)
+
+    async def _listen(self) -> None:
+        while not self._stopping.is_set():
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(REMINDER_CHANNEL)
+                # Anything published while unsubscribed was lost
+                self.reload()
+                while not self._stopping.is_set():
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        for task in json.loads(message["data"]):
+                            self.schedule(UUID(task["uuid"]), task["due_date"])
+            except RedisError as e:
+                logger.warning("Reminder subscription lost: %s", e)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def _initial_watermark(self) -> float:
+        try:
+            stored = await redis_client.get(WATERMARK_KEY)
+        except RedisError:
+            stored = None
+        return float(stored) if stored else time.time()
+
+    async def run(self) -> None:
+        self.watermark = self.loaded_until = await self._initial_watermark()
+        listener = asyncio.create_task(self._listen())
+        try:
+            while not self._stopping.is_set():
+                self._wake.clear()
+                now = time.time()
+                if self.loaded_until < now + self.horizon / 2:
+                    await self.extend(now)
+                await self.fire(now)
+
+                wake_at = self.loaded_until - self.horizon / 2
+                if self._heap:
+                    wake_at = min(wake_at, self._heap[0][0])
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, min(wake_at - time.time(), 60)))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+
+
+async def _main() -> None:
+    scheduler = ReminderScheduler(load_sink(Config.REMINDER_SINK))
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, scheduler.stop)
+    try:
+        await scheduler.run()
+    finally:
+        await redis_client.close()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,31 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from core.config import Config
-from api.router import router
+from api.router import metrics_router, router
+from db.redis import redis_client
+from service.password_hasher import password_hasher
+from service.task_events import task_events
+from utils.metrics import MetricsMiddleware
 from utils.response import error_response, success_response
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await redis_client.start()
+    await password_hasher.start()
+    await task_events.start()
+    yield
+    await task_events.stop()
+    await redis_client.close()
+    password_hasher.shutdown()
+
+
 app = FastAPI(
     title=Config.APP_NAME,
     description=Config.APP_DESCRIPTION,
     version=Config.APP_VERSION,
+    lifespan=lifespan,
 )
 
 #cors
@@ -19,8 +37,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the timings cover the whole stack
+if Config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 
 app.include_router(router, prefix="/api")
+app.include_router(metrics_router)
 
 
 @app.exception_handler(HTTPException)
@@ -42,6 +65,7 @@ def http_exception_handler(request: Request, exc: HTTPException) -> error_respon
         message=str(exc.detail),
         status_code=exc.status_code,
         errors=str(exc.__class__.__name__),
+        headers=exc.headers,
     )
     return response
 
@@ -1,3 +1,4 @@
 from .user import User
 from .task import Task
-
+from .task_counter import TaskCounter
+from .task_tombstone import TaskTombstone
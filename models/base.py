@@ -1,10 +1,75 @@
 from uuid import UUID, uuid4
-from sqlalchemy import func
+from sqlalchemy import BigInteger, DateTime, func
 from datetime import datetime
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.functions import FunctionElement
 
 from db.database import Base
 
+
+class clock_now(FunctionElement):
+    """
+    The database's current time when the statement runs, whereas now() is
+    fixed at the start of the transaction. As a naive timestamp, like the
+    columns it is stored in.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(clock_now)
+def _clock_now(element, compiler, **kw):
+    # SQLite: microseconds in the format SQLAlchemy stores datetimes in, so values compare as text
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+@compiles(clock_now, "postgresql")
+def _clock_now_postgresql(element, compiler, **kw):
+    return "CAST(clock_timestamp() AS TIMESTAMP WITHOUT TIME ZONE)"
+
+
+class current_xact(FunctionElement):
+    """
+    Id of the current transaction, assigned on first use: rows stamped with
+    it tell GET /tasks/changes which transaction last wrote them.
+    """
+    type = BigInteger()
+    inherit_cache = True
+
+
+class snapshot_xmin(FunctionElement):
+    """
+    The lowest transaction id still in progress when the statement's
+    snapshot was taken. Every transaction below it has committed or rolled
+    back, so no row stamped with a current_xact() below it can still
+    appear later.
+    """
+    type = BigInteger()
+    inherit_cache = True
+
+
+# SQLite has no transaction ids; it stands in with the statement time in
+# microseconds, which only approximates commit order
+_SQLITE_MICROS = "CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER)"
+
+
+@compiles(current_xact)
+@compiles(snapshot_xmin)
+def _xact_sqlite(element, compiler, **kw):
+    return _SQLITE_MICROS
+
+
+@compiles(current_xact, "postgresql")
+def _current_xact_postgresql(element, compiler, **kw):
+    # xid8 has no cast to bigint but its text form is a decimal integer
+    return "CAST(CAST(pg_current_xact_id() AS text) AS bigint)"
+
+
+@compiles(snapshot_xmin, "postgresql")
+def _snapshot_xmin_postgresql(element, compiler, **kw):
+    return "CAST(CAST(pg_snapshot_xmin(pg_current_snapshot()) AS text) AS bigint)"
+
 class BaseModel(Base):
     __abstract__ = True
 
@@ -1,14 +1,34 @@
 from uuid import UUID
-from sqlalchemy import BigInteger, ForeignKey, func
+from typing import Optional
+from sqlalchemy import BigInteger, Computed, ForeignKey, Index, Text, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 
-from .base import BaseModel
+from .base import BaseModel, current_xact
 from schema.task import TaskType
 
 
 class Task(BaseModel):
     __tablename__ = 'tasks' 
+    __table_args__ = (
+        # Keyset pagination of GET /tasks, with and without status_filter
+        Index("ix_tasks_user_uuid_status_created_at_uuid", "user_uuid", "status", "created_at", "uuid"),
+        Index("ix_tasks_user_uuid_created_at_uuid", "user_uuid", "created_at", "uuid"),
+        # GET /tasks sorted or filtered by due date (incl. overdue) and by priority
+        Index("ix_tasks_user_uuid_due_date_uuid", "user_uuid", "due_date", "uuid"),
+        Index("ix_tasks_user_uuid_priority_uuid", "user_uuid", "priority", "uuid"),
+        # Changes since a sync token (GET /tasks/changes)
+        Index("ix_tasks_user_uuid_change_xid_uuid", "user_uuid", "change_xid", "uuid"),
+        # Overdue and due-today counts of GET /tasks/stats, over open tasks only
+        Index("ix_tasks_user_uuid_due_date_open", "user_uuid", "due_date",
+              postgresql_where=text("status <> 'completed'"), sqlite_where=text("status <> 'completed'")),
+        # Batch loading of upcoming reminders (jobs.reminders), across all users
+        Index("ix_tasks_due_date_uuid_open", "due_date", "uuid",
+              postgresql_where=text("status <> 'completed'"), sqlite_where=text("status <> 'completed'")),
+        # GET /tasks/search; user_uuid in a GIN index needs the btree_gin extension
+        Index("ix_tasks_user_uuid_search_vector", "user_uuid", "search_vector", postgresql_using="gin"),
+    )
 
     title: Mapped[str] = mapped_column(nullable=False)
     description:  Mapped[str] = mapped_column(nullable=True)
@@ -27,6 +47,22 @@ class Task(BaseModel):
         comment="Last status change as epoch seconds"
     )
     
+    # Transaction that last wrote the row, for GET /tasks/changes
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger,
+        default=current_xact(),
+        onupdate=current_xact(),
+        nullable=False,
+    )
+
+    # Full-text document of title and description, maintained by Postgres.
+    # Deferred so that loading tasks never ships it back.
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR().with_variant(Text(), "sqlite"),
+        Computed("to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))", persisted=True),
+        deferred=True,
+    )
+
     # Relationship (many-to-one: Task -> User)
     user: Mapped["User"] = relationship(back_populates="tasks") # type: ignore
 
@@ -0,0 +1,23 @@
+from uuid import UUID
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.database import Base
+
+
+class TaskCounter(Base):
+    """
+    Number of a user's tasks in one bucket of one dimension, e.g.
+    ("status", "pending") or ("priority", "3"). Kept up to date by
+    TaskService in the same transaction as every write to tasks, so the
+    stats of a user are a handful of rows instead of a COUNT(*).
+    """
+    __tablename__ = 'task_counters'
+
+    user_uuid: Mapped[UUID] = mapped_column(ForeignKey("users.uuid"), primary_key=True)
+    dimension: Mapped[str] = mapped_column(primary_key=True)
+    bucket: Mapped[str] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    def __repr__(self):
+        return f"TaskCounter(user_uuid={self.user_uuid}, {self.dimension}={self.bucket}, count={self.count})"
@@ -0,0 +1,31 @@
+from datetime import datetime
+from uuid import UUID
+from sqlalchemy import BigInteger, ForeignKey, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.database import Base
+from .base import clock_now, current_xact
+
+
+class TaskTombstone(Base):
+    """
+    A deleted task, so that GET /tasks/changes can tell clients to drop it.
+    Written in the transaction of the delete; tombstones older than
+    TASK_TOMBSTONE_RETENTION_DAYS are removed by jobs.purge_tombstones.
+    """
+    __tablename__ = 'task_tombstones'
+    __table_args__ = (
+        # Deletions since a sync token
+        Index("ix_task_tombstones_user_uuid_deleted_xid_task_uuid", "user_uuid", "deleted_xid", "task_uuid"),
+        # Purge of old tombstones, across all users
+        Index("ix_task_tombstones_deleted_at", "deleted_at"),
+    )
+
+    task_uuid: Mapped[UUID] = mapped_column(primary_key=True)
+    user_uuid: Mapped[UUID] = mapped_column(ForeignKey("users.uuid"), nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(default=clock_now(), server_default=func.now(), nullable=False)
+    # Transaction of the delete, as Task.change_xid
+    deleted_xid: Mapped[int] = mapped_column(BigInteger, default=current_xact(), nullable=False)
+
+    def __repr__(self):
+        return f"TaskTombstone(task_uuid={self.task_uuid}, deleted_at={self.deleted_at})"
@@ -1,16 +1,9 @@
-from typing import Any, Dict, List, Optional, Union, Generic, TypeVar
+from typing import Optional, Generic, TypeVar
 from pydantic import BaseModel, Field
 
 
 T = TypeVar("T")
 
-class ResponseSchemas(BaseModel):
-    status: str
-    message: str
-    data: Optional[Union[Dict[str, Any], List[Any]]] = None
-    errors: Optional[str] = None
-
-
 class StandardResponse(BaseModel, Generic[T]):
     """Standard API response model for both success and error responses."""
 
@@ -1,10 +1,11 @@
 from typing import Optional
 from uuid import UUID
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from fastapi import HTTPException, status
 from datetime import datetime, timezone
 from enum import Enum
 
+from core.config import Config
 from schema.response import StandardResponse
 
 class TaskType(Enum):
@@ -17,7 +18,7 @@ class TaskType(Enum):
         return self.value
 
 
-class TaskCreate(BaseModel):
+class TaskBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=100)
     description: str | None = Field(None, max_length=500)
     due_date: int = Field(
@@ -27,7 +28,46 @@ class TaskCreate(BaseModel):
     )
     priority: int = Field(default=1, ge=1, le=5)
 
-    
+
+class TaskSort(Enum):
+    """Orderings supported by GET /tasks."""
+    CREATED_AT = 'created_at'
+    DUE_DATE = 'due_date'
+    PRIORITY = 'priority'
+
+
+class TaskSearchSort(Enum):
+    """Orderings supported by GET /tasks/search."""
+    RANK = 'rank'
+    CREATED_AT = 'created_at'
+
+
+class SortOrder(Enum):
+    ASC = 'asc'
+    DESC = 'desc'
+
+
+class TaskListQuery(BaseModel):
+    """Query string of GET /tasks: filters, ordering and the page."""
+    status_filter: Optional[TaskType] = None
+    due_after: Optional[int] = Field(None, description="Only tasks due at or after this Unix timestamp")
+    due_before: Optional[int] = Field(None, description="Only tasks due before this Unix timestamp")
+    priority_min: Optional[int] = Field(None, ge=1, le=5)
+    priority_max: Optional[int] = Field(None, ge=1, le=5)
+    overdue: bool = Field(False, description="Only tasks past their due date that are not completed")
+    sort: TaskSort = TaskSort.CREATED_AT
+    order: SortOrder = SortOrder.DESC
+    limit: int = Field(50, ge=1, le=100, description="Maximum number of tasks to return")
+    cursor: Optional[str] = Field(None, description="`next_cursor` from the previous page")
+
+
+class ExportFormat(Enum):
+    """Formats supported by GET /tasks/export."""
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+
+class TaskCreate(TaskBase):
 
     @field_validator('due_date')
     @classmethod
@@ -55,8 +95,10 @@ class TaskUpdate(BaseModel):
         return value
 
 
-class TaskData(TaskCreate):
-    """Data model for task output."""
+class TaskData(TaskBase):
+    """Data model for task output, validated straight from the ORM row."""
+    model_config = ConfigDict(from_attributes=True)
+
     uuid: UUID
     user_uuid: UUID
     status: TaskType
@@ -69,6 +111,26 @@ class TaskOut(BaseModel):
 
 class TaskListOut(BaseModel):
     tasks: list[TaskData]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` to fetch the next page; null on the last page"
+    )
+
+
+class TaskChangesOut(BaseModel):
+    """Changes to the user's tasks since a sync token, oldest first."""
+    tasks: list[TaskData] = Field(..., description="Tasks created or modified since the token, as they are now")
+    deleted: list[UUID] = Field(..., description="Tasks deleted since the token; empty when no token was given")
+    next_token: str = Field(..., description="Pass as `since` on the next sync")
+    has_more: bool = Field(..., description="More changes are waiting; call again with next_token right away")
+
+
+class TaskStats(BaseModel):
+    """Counts of the user's tasks, for dashboards."""
+    total: int
+    by_status: dict[str, int]
+    by_priority: dict[str, int]
+    overdue: int = Field(..., description="Tasks past their due date that are not completed")
+    due_today: int = Field(..., description="Tasks due today (in `tz`) that are not completed, overdue ones included")
 
 
 class TaskStatus(BaseModel):
@@ -86,3 +148,36 @@ class TaskResponse(StandardResponse):
 
 class TaskListResponse(StandardResponse):
     data: TaskListOut
+
+class TaskChangesResponse(StandardResponse):
+    data: TaskChangesOut
+
+
+class TaskStatsResponse(StandardResponse):
+    data: TaskStats
+
+
+class TaskBulkCreate(BaseModel):
+    tasks: list[TaskCreate] = Field(..., min_length=1, max_length=Config.TASK_BULK_MAX_ITEMS)
+
+
+class TaskBulkStatus(BaseModel):
+    task_ids: list[UUID] = Field(..., min_length=1, max_length=Config.TASK_BULK_MAX_ITEMS)
+    status: TaskType
+
+
+class TaskBulkDelete(BaseModel):
+    task_ids: list[UUID] = Field(..., min_length=1, max_length=Config.TASK_BULK_MAX_ITEMS)
+
+
+class TaskBulkResult(BaseModel):
+    """Outcome for one item of a bulk request, in request order."""
+    uuid: UUID
+    result: str = Field(..., description="created, updated, deleted or not_found")
+    task: Optional[TaskData] = None
+
+class TaskBulkOut(BaseModel):
+    results: list[TaskBulkResult]
+
+class TaskBulkResponse(StandardResponse):
+    data: TaskBulkOut
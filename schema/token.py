@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Optional
 from uuid import UUID
 from pydantic import BaseModel
 
@@ -8,6 +9,8 @@ class TokenType(Enum):
 
 class TokenData(BaseModel):
     uuid: UUID
+    username: Optional[str] = None
+    email: Optional[str] = None
 
 class Token(BaseModel):
     accessToken: str
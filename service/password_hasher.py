@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import bcrypt
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError
+
+from core.config import Config
+from db.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+_CALIBRATION_ROUNDS = 8
+# The calibrated cost every worker hashes with; the first worker to start sets it
+ROUNDS_KEY = "password_hash:rounds"
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=rounds)).decode()
+
+
+def _verify(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode(), hashed.encode())
+
+
+def _rounds_of(hashed: str) -> Optional[int]:
+    """Cost factor of a `$2b$12$...` hash, or None for anything else."""
+
+    parts = hashed.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a small dedicated process pool so hashing neither holds the
+    GIL of the API workers nor occupies their threadpool.
+
+    At most PASSWORD_HASH_MAX_QUEUE jobs may wait for a free process; beyond
+    that calls fail fast with a 503 instead of piling up behind each other.
+    """
+
+    def __init__(self):
+        self.rounds: int = Config.PASSWORD_HASH_ROUNDS or Config.PASSWORD_HASH_MIN_ROUNDS
+        self.max_pending = Config.PASSWORD_HASH_WORKERS + Config.PASSWORD_HASH_MAX_QUEUE
+        self.pending = 0
+        self.rejected = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def calibrate(self, target_ms: int) -> int:
+        """
+        Picks the bcrypt cost whose hash time is closest to target_ms on this
+        machine, clamped to the configured bounds. Each extra round doubles
+        the work, so a single timing at a low cost is enough to extrapolate.
+        """
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            _hash("calibration", _CALIBRATION_ROUNDS)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        rounds = _CALIBRATION_ROUNDS + round(math.log2(target_ms / min(timings)))
+        return max(Config.PASSWORD_HASH_MIN_ROUNDS, min(Config.PASSWORD_HASH_MAX_ROUNDS, rounds))
+
+    async def _shared_rounds(self, calibrated: int) -> int:
+        """
+        The cost already calibrated by another worker, or calibrated if this
+        one is first. Workers that timed bcrypt differently would otherwise
+        each rehash passwords to their own cost on login.
+        """
+        try:
+            await redis_client.set(ROUNDS_KEY, calibrated, nx=True, ex=Config.PASSWORD_HASH_ROUNDS_TTL)
+            stored = await redis_client.get(ROUNDS_KEY)
+        except RedisError as e:
+            logger.warning("Could not share the calibrated bcrypt cost: %s", e)
+            return calibrated
+        return int(stored) if stored else calibrated
+
+    async def start(self) -> None:
+        """Calibrate the cost (unless fixed in config) and spin up the pool."""
+
+        if not Config.PASSWORD_HASH_ROUNDS:
+            self.rounds = await self._shared_rounds(self.calibrate(Config.PASSWORD_HASH_TARGET_MS))
+        pool = self._get_pool()
+        # Spawn the worker processes now rather than on the first login
+        for _ in range(Config.PASSWORD_HASH_WORKERS):
+            pool.submit(_rounds_of, "")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=Config.PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Drops a pool whose worker died, unless another call already replaced it."""
+
+        with self._lock:
+            if self._pool is broken:
+                logger.warning("Password hashing pool broke, starting a new one")
+                self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn, *args):
+        pool = self._get_pool()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            # A worker was killed (e.g. OOM); the pool refuses all work from then on
+            self._replace_pool(pool)
+        return await asyncio.get_running_loop().run_in_executor(self._get_pool(), fn, *args)
+
+    async def _submit(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            return await self._run(fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._submit(_verify, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Only ever upgrades: a hash made at a higher cost is kept as it is."""
+
+        rounds = _rounds_of(hashed)
+        return rounds is None or rounds < self.rounds
+
+    def stats(self) -> dict:
+        return {
+            "rounds": self.rounds,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher()
@@ -1,22 +1,297 @@
+import csv
 import datetime
-from typing import Optional
+import hashlib
+import io
+import json
+import threading
+import time
+from typing import AsyncIterator, Callable, Iterable, Iterator, Optional
 from uuid import UUID
+from sqlalchemy import Double, Select, Update, cast, delete, func, insert, literal, select, tuple_, update
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from sqlalchemy.exc import SQLAlchemyError
+from pydantic_core import to_json
+from redis.exceptions import RedisError
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
 
-from schema.task import TaskCreate, TaskStatus, TaskUpdate, TaskType
-from models import Task
+from core.config import Config
+from db.database import AsyncSessionLocal, SessionLocal, open_session, run_in_session
+from db.redis import redis_client
+from schema.task import (ExportFormat, SortOrder, TaskBulkCreate, TaskBulkDelete, TaskBulkStatus, TaskChangesOut, TaskCreate,
+                         TaskData, TaskListOut, TaskListQuery, TaskOut, TaskSearchSort, TaskSort, TaskStats, TaskStatus, TaskUpdate, TaskType)
+from models import Task, TaskTombstone
+from models.base import clock_now, snapshot_xmin
+from service.task_cache import task_cache
+from service.task_counters import Deltas, task_counters
+from service.task_events import task_events
+from utils.group_commit import GroupCommit
+from utils.pagination import (decode_cursor, decode_key_cursor, decode_sync_token, encode_cursor, encode_key_cursor,
+                              encode_sync_token)
+
+_EXPORT_FIELDS = list(TaskData.model_fields)
+
+# Rendered inline rather than bound, so the planner can match the
+# "open tasks" partial indexes even for prepared statements
+OPEN_TASK = Task.status != literal(TaskType.COMPLETED.value, literal_execute=True)
+
+# Open tasks coming due soon are published here for the reminder worker (jobs.reminders)
+REMINDER_CHANNEL = "task_reminders"
 
 
 class TaskService:
 
-    def create_task(self, task_data: TaskCreate, db: Session, user_uuid: UUID):
+    def __init__(self):
+        self._unbumped: set[UUID] = set()
+        self._unbumped_lock = threading.Lock()
+        self.group_commit = GroupCommit(
+            self._write_batch,
+            max_delay=Config.TASK_GROUP_COMMIT_MAX_DELAY_MS / 1000,
+            max_batch=Config.TASK_GROUP_COMMIT_MAX_BATCH,
+            # Errors of one row; connection and operational errors fail the batch
+            retry_on=(IntegrityError, DataError),
+        )
+
+    @staticmethod
+    def _version_key(user_uuid: UUID) -> str:
+        return f"task_version:{user_uuid}"
+
+    async def get_version(self, user_uuid: UUID) -> Optional[str]:
+        """
+        The user's task version, which changes on every write to their tasks.
+        Returns None when it is unknown (Redis unavailable, or a bump that
+        failed while it was down is still pending), and callers must then
+        skip anything keyed on it.
+
+        Only this process knows about its own failed bumps, so the version
+        key expires TASK_VERSION_TTL after it was seeded: other workers serve
+        ETags and cached pages that miss such a write for at most that long.
+        """
+        await self._retry_bumps()
+        if user_uuid in self._unbumped:
+            return None
+        try:
+            key = self._version_key(user_uuid)
+            # Seed from the clock, not 0, so an expired or lost key never repeats an old version
+            async with redis_client.pipeline(transaction=False) as pipe:
+                _, version = await pipe.set(key, time.time_ns(), nx=True, ex=Config.TASK_VERSION_TTL).get(key).execute()
+            return version
+        except RedisError:
+            return None
+
+    async def _bump_version(self, user_uuid: UUID) -> bool:
         try:
-            task = Task(**task_data.model_dump(), status=TaskType.PENDING.value, user_uuid=user_uuid)
-            db.add(task)
+            key = self._version_key(user_uuid)
+            async with redis_client.pipeline(transaction=False) as pipe:
+                # INCR keeps the TTL, so the key still expires on schedule
+                await pipe.set(key, time.time_ns(), nx=True, ex=Config.TASK_VERSION_TTL).incr(key).execute()
+            return True
+        except RedisError:
+            # Remember it, otherwise clients could get 304s for data they have not seen
+            with self._unbumped_lock:
+                self._unbumped.add(user_uuid)
+            return False
+
+    async def _retry_bumps(self) -> None:
+        if not self._unbumped:
+            return
+        with self._unbumped_lock:
+            pending = list(self._unbumped)
+        # Each user stays in _unbumped until its bump has landed, so a
+        # concurrent get_version never reads the stale version meanwhile
+        for user_uuid in pending:
+            if await self._bump_version(user_uuid):
+                with self._unbumped_lock:
+                    self._unbumped.discard(user_uuid)
+
+    async def _publish_reminders(self, tasks: Iterable[Task]) -> None:
+        """
+        Tells the reminder worker about written tasks that now fall inside
+        the window of reminders it holds in memory; the rest it loads from
+        the database when its window gets there.
+        """
+        now = time.time()
+        horizon = now + Config.REMINDER_HORIZON + Config.REMINDER_LEAD
+        due = [
+            {"uuid": str(task.uuid), "due_date": task.due_date}
+            for task in tasks
+            if task.due_date is not None and now < task.due_date <= horizon and task.status != TaskType.COMPLETED.value
+        ]
+        if not due:
+            return
+        try:
+            await redis_client.publish(REMINDER_CHANNEL, json.dumps(due))
+        except RedisError:
+            # The worker's subscription is down too; it reloads its window when it resubscribes
+            pass
+
+    async def _changed(self, user_uuid: UUID, scheduled: Iterable[Task] = ()) -> None:
+        """
+        Runs after every committed write to the user's tasks. scheduled are
+        the written tasks whose due date or status changed.
+        """
+        await self._bump_version(user_uuid)
+        await self._publish_reminders(scheduled)
+
+    async def create_task(self, task_data: TaskCreate, db: Session | AsyncSession, user_uuid: UUID):
+        if Config.TASK_GROUP_COMMIT:
+            task = await self.group_commit.submit(
+                {**task_data.model_dump(), "status": TaskType.PENDING.value, "user_uuid": user_uuid}
+            )
+        else:
+            task = await run_in_session(db, self._create_task, task_data=task_data, user_uuid=user_uuid)
+        await self._changed(user_uuid, [task])
+        return task
+
+    async def _write_batch(self, rows: list[dict]) -> list[Task]:
+        """Writes one group-commit batch, in a session of its own since it serves many requests."""
+
+        async with open_session() as db:
+            return await run_in_session(db, self._insert_rows, rows=rows)
+
+    async def list_tasks(self, user_uuid: UUID, db: Session | AsyncSession, query: TaskListQuery):
+        return await run_in_session(db, self._list_tasks, user_uuid=user_uuid, query=query)
+
+    async def get_task(self, task_id: UUID, db: Session | AsyncSession, user_uuid: UUID):
+        return await run_in_session(db, self._get_task, task_id=task_id, user_uuid=user_uuid)
+
+    async def list_tasks_json(self, user_uuid: UUID, db: Session | AsyncSession, query: TaskListQuery,
+                              version: Optional[str] = None) -> bytes:
+        """list_tasks serialized as a TaskListOut, read through the task cache."""
+
+        async def load() -> bytes:
+            tasks, next_cursor = await self.list_tasks(user_uuid=user_uuid, db=db, query=query)
+            return to_json(TaskListOut.model_validate({"tasks": tasks, "next_cursor": next_cursor}))
+
+        query_hash = hashlib.sha256(query.model_dump_json().encode()).hexdigest()[:32]
+        key = task_cache.key(user_uuid, version, "list", query_hash) if version else None
+        return await task_cache.get_or_load(key, load)
+
+    async def task_stats(self, user_uuid: UUID, db: Session | AsyncSession, tz: datetime.tzinfo) -> TaskStats:
+        return await run_in_session(db, self._task_stats, user_uuid=user_uuid, tz=tz)
+
+    async def task_changes(self, user_uuid: UUID, db: Session | AsyncSession, since: Optional[str] = None,
+                           limit: int = 500) -> TaskChangesOut:
+        return await run_in_session(db, self._task_changes, user_uuid=user_uuid, since=since, limit=limit)
+
+    async def search_tasks(self, user_uuid: UUID, q: str, db: Session | AsyncSession, limit: int = 50,
+                           cursor: Optional[str] = None, sort: TaskSearchSort = TaskSearchSort.RANK):
+        return await run_in_session(db, self._search_tasks, user_uuid=user_uuid, q=q, limit=limit, cursor=cursor,
+                                    sort=sort)
+
+    async def search_tasks_json(self, user_uuid: UUID, q: str, db: Session | AsyncSession, limit: int = 50,
+                                cursor: Optional[str] = None, sort: TaskSearchSort = TaskSearchSort.RANK,
+                                version: Optional[str] = None) -> bytes:
+        """search_tasks serialized as a TaskListOut, read through the task cache."""
+
+        async def load() -> bytes:
+            tasks, next_cursor = await self.search_tasks(user_uuid=user_uuid, q=q, db=db, limit=limit, cursor=cursor,
+                                                         sort=sort)
+            return to_json(TaskListOut.model_validate({"tasks": tasks, "next_cursor": next_cursor}))
+
+        q_hash = hashlib.sha256(q.encode()).hexdigest()[:32]
+        key = task_cache.key(user_uuid, version, "search", sort.value, q_hash, limit, cursor) if version else None
+        return await task_cache.get_or_load(key, load)
+
+    async def get_task_json(self, task_id: str, db: Session | AsyncSession, user_uuid: UUID,
+                            version: Optional[str] = None) -> bytes:
+        """get_task serialized as a TaskOut, read through the task cache."""
+
+        async def load() -> bytes:
+            task = await self.get_task(task_id=task_id, db=db, user_uuid=user_uuid)
+            return to_json(TaskOut(task=task))
+
+        key = task_cache.key(user_uuid, version, "task", task_id) if version else None
+        return await task_cache.get_or_load(key, load)
+
+    async def update_task(self, task_id: str, task_data: TaskUpdate, user_uuid: UUID, db: Session | AsyncSession):
+        result = await run_in_session(db, self._update_task, task_id=task_id, task_data=task_data, user_uuid=user_uuid)
+        await self._changed(user_uuid, [result] if task_data.due_date is not None else ())
+        return result
+
+    async def delete_task(self, task_id: UUID, user_uuid: UUID, db: Session | AsyncSession):
+        result = await run_in_session(db, self._delete_task, task_id=task_id, user_uuid=user_uuid)
+        await self._changed(user_uuid)
+        return result
+
+    async def update_task_status(self, task_id: str, data: TaskStatus, user_uuid: UUID, db: Session | AsyncSession):
+        result = await run_in_session(db, self._update_task_status, task_id=task_id, data=data, user_uuid=user_uuid)
+        await self._changed(user_uuid, [result])
+        return result
+
+    async def create_tasks(self, data: TaskBulkCreate, db: Session | AsyncSession, user_uuid: UUID):
+        result = await run_in_session(db, self._create_tasks, data=data, user_uuid=user_uuid)
+        await self._changed(user_uuid, result)
+        return result
+
+    async def update_tasks_status(self, data: TaskBulkStatus, user_uuid: UUID, db: Session | AsyncSession):
+        result = await run_in_session(db, self._update_tasks_status, data=data, user_uuid=user_uuid)
+        await self._changed(user_uuid, result.values())
+        return result
+
+    async def delete_tasks(self, data: TaskBulkDelete, user_uuid: UUID, db: Session | AsyncSession):
+        result = await run_in_session(db, self._delete_tasks, data=data, user_uuid=user_uuid)
+        await self._changed(user_uuid)
+        return result
+
+    def export_tasks(self, user_uuid: UUID, export_format: ExportFormat) -> Iterator[bytes] | AsyncIterator[bytes]:
+        """
+        Streams every task of the user as NDJSON or CSV, oldest first.
+
+        Rows come off a server-side cursor TASK_EXPORT_BATCH_SIZE at a time
+        and each batch is encoded and yielded before the next is fetched, so
+        memory stays flat however many tasks there are. The generator opens
+        its own session because it outlives the request's get_db session.
+        """
+        stmt = (
+            select(*(getattr(Task, field) for field in _EXPORT_FIELDS))
+            .where(Task.user_uuid == user_uuid)
+            .order_by(Task.created_at, Task.uuid)
+            .execution_options(yield_per=Config.TASK_EXPORT_BATCH_SIZE)
+        )
+        if export_format == ExportFormat.CSV:
+            encode, header = self._encode_csv, self._encode_csv([_EXPORT_FIELDS])
+        else:
+            encode, header = self._encode_ndjson, b""
+        if AsyncSessionLocal is not None:
+            return self._stream_async(stmt, encode, header)
+        return self._stream_sync(stmt, encode, header)
+
+    def _stream_sync(self, stmt: Select, encode: Callable[[list], bytes], header: bytes) -> Iterator[bytes]:
+        yield header
+        with SessionLocal() as db:
+            for rows in db.execute(stmt).partitions():
+                yield encode(rows)
+
+    async def _stream_async(self, stmt: Select, encode: Callable[[list], bytes], header: bytes) -> AsyncIterator[bytes]:
+        yield header
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(stmt)
+            async for rows in result.partitions():
+                yield encode(rows)
+
+    @staticmethod
+    def _encode_ndjson(rows) -> bytes:
+        return b"".join(TaskData.model_validate(row).model_dump_json().encode() + b"\n" for row in rows)
+
+    @staticmethod
+    def _encode_csv(rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            [value.isoformat() if isinstance(value, datetime.datetime) else value for value in row] for row in rows
+        )
+        return buffer.getvalue().encode()
+
+
+    def _create_task(self, task_data: TaskCreate, db: Session, user_uuid: UUID):
+        try:
+            task = db.scalars(
+                insert(Task).returning(Task),
+                [{**task_data.model_dump(), "status": TaskType.PENDING.value, "user_uuid": user_uuid}],
+            ).one()
+            task_counters.apply(db, user_uuid, task_counters.deltas([(task.status, task.priority)]))
+            task_events.notify(db, "created", [(user_uuid, task.uuid)])
             db.commit()
-            db.refresh(task)
 
         except SQLAlchemyError as e:
             db.rollback()
@@ -28,20 +303,302 @@ class TaskService:
     
 
     
-    def list_tasks(self, user_uuid: UUID, db: Session, status_filter: Optional[TaskType] = None):
-        try:
-            if status_filter:
-                tasks = db.query(Task).filter(Task.user_uuid == user_uuid, Task.status == status_filter.value).all()
+    _SORT_COLUMNS = {
+        TaskSort.CREATED_AT: Task.created_at,
+        TaskSort.DUE_DATE: Task.due_date,
+        TaskSort.PRIORITY: Task.priority,
+    }
+
+    def _list_statement(self, user_uuid: UUID, query: TaskListQuery) -> Select:
+        """
+        The SELECT behind one page of GET /tasks: the user's tasks narrowed
+        by the filters in query, ordered by (sort key, uuid) and resuming
+        after query.cursor. One row more than the page is fetched to tell
+        whether there is a next page.
+
+        Every sort key has a (user_uuid, key, uuid) index, so a page is a
+        range scan of it no matter how deep the client has paged, and the
+        due_date index also serves the due-date range and overdue filters.
+        Tasks without a due date have no place in a due-date ordering and
+        are left out of it.
+        """
+        key = self._SORT_COLUMNS[query.sort]
+        stmt = select(Task).where(Task.user_uuid == user_uuid)
+        if query.status_filter:
+            stmt = stmt.where(Task.status == query.status_filter.value)
+        if query.due_after is not None:
+            stmt = stmt.where(Task.due_date >= query.due_after)
+        if query.due_before is not None:
+            stmt = stmt.where(Task.due_date < query.due_before)
+        if query.priority_min is not None:
+            stmt = stmt.where(Task.priority >= query.priority_min)
+        if query.priority_max is not None:
+            stmt = stmt.where(Task.priority <= query.priority_max)
+        if query.overdue:
+            now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+            stmt = stmt.where(Task.due_date < now, OPEN_TASK)
+        if query.sort == TaskSort.DUE_DATE:
+            stmt = stmt.where(Task.due_date.isnot(None))
+
+        if query.cursor:
+            if query.sort == TaskSort.CREATED_AT:
+                last = decode_cursor(query.cursor)
             else:
-                tasks = db.query(Task).filter(Task.user_uuid == user_uuid).all()
-            return tasks
+                last = decode_key_cursor(query.cursor, query.sort.value)
+            position = tuple_(key, Task.uuid)
+            stmt = stmt.where(position > tuple_(*last) if query.order == SortOrder.ASC else position < tuple_(*last))
+
+        if query.order == SortOrder.ASC:
+            stmt = stmt.order_by(key.asc(), Task.uuid.asc())
+        else:
+            stmt = stmt.order_by(key.desc(), Task.uuid.desc())
+        return stmt.limit(query.limit + 1)
+
+    def _list_tasks(self, user_uuid: UUID, db: Session, query: TaskListQuery):
+        """
+        Returns one page of the user's tasks (see _list_statement) and the
+        cursor for the next page (None on the last page).
+        """
+        try:
+            tasks = db.scalars(self._list_statement(user_uuid, query)).all()
         except SQLAlchemyError as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to retrieve tasks due to database error"
             )
 
-    def get_task(self, task_id: UUID, db: Session, user_uuid: UUID):
+        next_cursor = None
+        if len(tasks) > query.limit:
+            tasks = tasks[:query.limit]
+            last = tasks[-1]
+            if query.sort == TaskSort.CREATED_AT:
+                next_cursor = encode_cursor(last.created_at, last.uuid)
+            else:
+                next_cursor = encode_key_cursor(query.sort.value, getattr(last, query.sort.value), last.uuid)
+        return tasks, next_cursor
+
+    def _search_statement(self, user_uuid: UUID, q: str, limit: int, cursor: Optional[str],
+                          sort: TaskSearchSort) -> Select:
+        """
+        The SELECT behind one page of GET /tasks/search: the user's tasks
+        matching the web-search style query q (words, "quoted phrases",
+        -excluded), each with its sort key, resuming after cursor. One row
+        more than the page is fetched to tell whether there is a next page.
+
+        By default the best matches come first: every match of the user,
+        found through the (user_uuid, search_vector) GIN index, is ranked
+        with ts_rank and pages are keyed on (rank, uuid). The rank is
+        computed as double precision so the value in the cursor compares
+        equal on the next request. sort=created_at pages newest first on
+        (created_at, uuid) instead, which for a common term the planner can
+        serve by walking the (user_uuid, created_at, uuid) index.
+        """
+        tsquery = func.websearch_to_tsquery("english", q)
+        if sort == TaskSearchSort.RANK:
+            key = cast(func.ts_rank(Task.search_vector, tsquery), Double)
+            after = decode_key_cursor(cursor, "rank") if cursor else None
+        else:
+            key = Task.created_at
+            after = decode_cursor(cursor) if cursor else None
+
+        stmt = select(Task, key).where(Task.user_uuid == user_uuid, Task.search_vector.bool_op("@@")(tsquery))
+        if after:
+            stmt = stmt.where(tuple_(key, Task.uuid) < tuple_(*after))
+        return stmt.order_by(key.desc(), Task.uuid.desc()).limit(limit + 1)
+
+    def _search_tasks(self, user_uuid: UUID, q: str, db: Session, limit: int = 50, cursor: Optional[str] = None,
+                      sort: TaskSearchSort = TaskSearchSort.RANK):
+        """
+        Returns one page of the user's tasks matching q (see
+        _search_statement) and the cursor for the next page.
+        """
+        try:
+            rows = db.execute(self._search_statement(user_uuid, q, limit, cursor, sort)).all()
+        except SQLAlchemyError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to search tasks due to database error"
+            )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            task, key = rows[-1]
+            if sort == TaskSearchSort.RANK:
+                next_cursor = encode_key_cursor("rank", key, task.uuid)
+            else:
+                next_cursor = encode_cursor(key, task.uuid)
+        return [task for task, _ in rows], next_cursor
+
+    def _task_stats(self, user_uuid: UUID, db: Session, tz: datetime.tzinfo) -> TaskStats:
+        """
+        The user's task counts. Status and priority counts come from
+        task_counters; overdue and due-today depend on the clock, so they
+        are counted over the part of the open-task partial index that is
+        due before the end of today, an index-only range scan.
+        """
+        now = datetime.datetime.now(tz)
+        today = datetime.datetime.combine(now.date(), datetime.time(), tzinfo=tz)
+        tomorrow = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(), tzinfo=tz)
+        try:
+            counts = task_counters.read(db, user_uuid)
+            overdue, due_today = db.execute(
+                select(
+                    func.count().filter(Task.due_date < int(now.timestamp())),
+                    func.count().filter(Task.due_date >= int(today.timestamp())),
+                ).where(Task.user_uuid == user_uuid, OPEN_TASK, Task.due_date < int(tomorrow.timestamp()))
+            ).one()
+        except SQLAlchemyError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to retrieve task stats due to database error"
+            )
+        return TaskStats(
+            total=sum(counts["status"].values()),
+            by_status=counts["status"],
+            by_priority=counts["priority"],
+            overdue=overdue,
+            due_today=due_today,
+        )
+
+    def _task_changes(self, user_uuid: UUID, db: Session, since: Optional[str], limit: int) -> TaskChangesOut:
+        """
+        The user's tasks changed after the sync token since, and tombstones
+        of those deleted after it, merged in (transaction id, uuid) order;
+        the whole task list when since is None. Both are keyset range scans,
+        of (user_uuid, change_xid, uuid) and of the tombstone index, so the
+        cost follows the number of changes rather than of tasks.
+
+        Only changes below the snapshot's xmin are returned: every
+        transaction under it has finished, so no change can still commit
+        behind the returned ones, and once nothing more is pending the next
+        token starts at that xmin. Writes stay concurrent and the read takes
+        no lock; a change is held back only while an older transaction is
+        still in flight.
+        """
+        since_key = decode_sync_token(since) if since is not None else None
+        try:
+            xmin, now = db.execute(select(snapshot_xmin(), clock_now())).one()
+            if since_key is not None and since_key[2] < now - datetime.timedelta(days=Config.TASK_TOMBSTONE_RETENTION_DAYS):
+                raise HTTPException(
+                    status_code=status.HTTP_410_GONE,
+                    detail="Sync token has expired, sync again without one",
+                )
+
+            def pending(xid, uuid):
+                if since_key is None:
+                    return xid < xmin
+                if since_key[1] is None:
+                    return xid.between(since_key[0], xmin - 1)
+                return (tuple_(xid, uuid) > tuple_(since_key[0], since_key[1])) & (xid < xmin)
+
+            changes = [
+                (task.change_xid, task.uuid, task)
+                for task in db.scalars(
+                    select(Task)
+                    .where(Task.user_uuid == user_uuid, pending(Task.change_xid, Task.uuid))
+                    .order_by(Task.change_xid, Task.uuid)
+                    .limit(limit + 1)
+                )
+            ]
+            # A client without a token has nothing to delete
+            if since_key is not None:
+                changes.extend(
+                    (deleted_xid, task_id, None)
+                    for deleted_xid, task_id in db.execute(
+                        select(TaskTombstone.deleted_xid, TaskTombstone.task_uuid)
+                        .where(TaskTombstone.user_uuid == user_uuid,
+                               pending(TaskTombstone.deleted_xid, TaskTombstone.task_uuid))
+                        .order_by(TaskTombstone.deleted_xid, TaskTombstone.task_uuid)
+                        .limit(limit + 1)
+                    )
+                )
+        except SQLAlchemyError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to retrieve task changes due to database error"
+            )
+
+        changes.sort(key=lambda change: change[:2])
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        if has_more:
+            # Paging on keeps the start of this sync, which the expiry is measured from
+            issued_at = since_key[2] if since_key is not None else now
+            next_token = encode_sync_token(changes[-1][0], changes[-1][1], issued_at)
+        else:
+            next_token = encode_sync_token(xmin, None, now)
+        return TaskChangesOut(
+            tasks=[task for _, _, task in changes if task is not None],
+            deleted=[task_id for _, task_id, task in changes if task is None],
+            next_token=next_token,
+            has_more=has_more,
+        )
+
+    @staticmethod
+    def _lock_counted(db: Session, user_uuid: UUID, task_ids: list[UUID]) -> dict[UUID, tuple[str, int]]:
+        """
+        Locks the user's tasks among task_ids and returns their counted
+        fields, (status, priority), as they are before an update.
+        """
+        rows = db.execute(
+            select(Task.uuid, Task.status, Task.priority)
+            .where(Task.user_uuid == user_uuid, Task.uuid.in_(set(task_ids)))
+            .with_for_update()
+        )
+        return {task_id: (task_status, priority) for task_id, task_status, priority in rows}
+
+    @staticmethod
+    def _counted_update(user_uuid: UUID, task_ids: list[UUID], values: dict) -> Update:
+        """
+        UPDATE ... FROM (SELECT ... FOR UPDATE) old_task ... RETURNING of the user's
+        tasks among task_ids, which returns each task with its counted fields
+        from before the update: the old row is locked and read by the same
+        statement that writes the new one.
+        """
+        old = (
+            select(Task.uuid, Task.status, Task.priority)
+            .where(Task.user_uuid == user_uuid, Task.uuid.in_(set(task_ids)))
+            .with_for_update()
+            .subquery("old_task")
+        )
+        return (
+            update(Task)
+            .where(Task.uuid == old.c.uuid)
+            .values(**values)
+            .returning(Task, old.c.status, old.c.priority)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _update_counted(self, db: Session, user_uuid: UUID, task_ids: list[UUID], values: dict) -> tuple[list[Task], Deltas]:
+        """
+        Updates the user's tasks among task_ids and returns them with the
+        counter deltas of the update, in one statement on Postgres.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            rows = db.execute(self._counted_update(user_uuid, task_ids, values)).all()
+            tasks = [task for task, _, _ in rows]
+            before = {task.uuid: (task_status, priority) for task, task_status, priority in rows}
+        else:
+            # SQLite's RETURNING cannot read the FROM subquery; its writers are serialized anyway
+            before = self._lock_counted(db, user_uuid, task_ids)
+            tasks = db.scalars(
+                update(Task)
+                .where(Task.user_uuid == user_uuid, Task.uuid.in_(set(task_ids)))
+                .values(**values)
+                .returning(Task)
+            ).all()
+        return tasks, self._moved(before, tasks)
+
+    @staticmethod
+    def _moved(before: dict[UUID, tuple[str, int]], after: list[Task]) -> Deltas:
+        """Counter deltas of updating the tasks in before (see _lock_counted) into after."""
+
+        deltas = task_counters.deltas((task.status, task.priority) for task in after if task.uuid in before)
+        deltas.subtract(task_counters.deltas(before.values()))
+        return deltas
+
+    def _get_task(self, task_id: UUID, db: Session, user_uuid: UUID):
         try:
             task = db.query(Task).filter_by(uuid=task_id, user_uuid=user_uuid).first()
             if not task:
@@ -55,24 +612,33 @@ class TaskService:
             )
         
 
-    def update_task(self, task_id: str, task_data: TaskUpdate, user_uuid: UUID, db: Session):
+    def _update_task(self, task_id: str, task_data: TaskUpdate, user_uuid: UUID, db: Session):
+
+        if task_data.due_date is not None:
+            now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+            if task_data.due_date <= now:
+                raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Due date must be in the future")
+
+        values = {key: value for key, value in task_data.model_dump(exclude_unset=True).items() if value is not None}
+        if not values:
+            return self._get_task(task_id=task_id, db=db, user_uuid=user_uuid)
 
         try:
-            task = db.query(Task).filter_by(uuid=task_id, user_uuid=user_uuid).first()
-            if not task:
+            if "priority" in values:
+                tasks, deltas = self._update_counted(db, user_uuid, [task_id], values)
+            else:
+                tasks, deltas = db.scalars(
+                    update(Task)
+                    .where(Task.uuid == task_id, Task.user_uuid == user_uuid)
+                    .values(**values)
+                    .returning(Task)
+                ).all(), Deltas()
+            if not tasks:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found for the given ID under this user")
-            
-            if task_data.due_date is not None:
-                now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
-                if task_data.due_date <= now:
-                    raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Due date must be in the future")
-            
-            for key, value in task_data.model_dump(exclude_unset=True).items():
-                if value is not None:
-                    setattr(task, key, value)
-            
+            task = tasks[0]
+            task_counters.apply(db, user_uuid, deltas)
+            task_events.notify(db, "updated", [(user_uuid, task.uuid)])
             db.commit()
-            db.refresh(task)
             return task
         except SQLAlchemyError as e:
             db.rollback()
@@ -82,13 +648,16 @@ class TaskService:
             )
         
 
-    def delete_task(self, task_id: UUID, user_uuid: UUID, db: Session):
+    def _delete_task(self, task_id: UUID, user_uuid: UUID, db: Session):
         try:
-            task = db.query(Task).filter(Task.user_uuid==user_uuid, Task.uuid == task_id).first()
-            print(f"task: {task}")
-            if not task:
+            deleted = db.execute(
+                delete(Task).where(Task.user_uuid == user_uuid, Task.uuid == task_id).returning(Task.status, Task.priority)
+            ).one_or_none()
+            if not deleted:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found for the given ID under this user")
-            db.delete(task)
+            db.execute(insert(TaskTombstone), [{"task_uuid": task_id, "user_uuid": user_uuid}])
+            task_counters.apply(db, user_uuid, task_counters.deltas([deleted], sign=-1))
+            task_events.notify(db, "deleted", [(user_uuid, task_id)])
             db.commit()
             return {"detail": "Task deleted successfully"}
         
@@ -99,16 +668,19 @@ class TaskService:
                 detail="Failed to delete task due to database error"
             )
     
-    def update_task_status(self, task_id: str, data: TaskStatus, user_uuid: UUID, db: Session):
+    def _update_task_status(self, task_id: str, data: TaskStatus, user_uuid: UUID, db: Session):
 
         try:
-            task = db.query(Task).filter_by(uuid=task_id, user_uuid=user_uuid).first()
-            if not task:
+            tasks, deltas = self._update_counted(db, user_uuid, [task_id], {
+                "status": data.status.value,
+                "status_change": int(datetime.datetime.now(datetime.timezone.utc).timestamp()),
+            })
+            if not tasks:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found for the given ID under this user")
-            task.status = data.status.value
-            task.status_change = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+            task = tasks[0]
+            task_counters.apply(db, user_uuid, deltas)
+            task_events.notify(db, "status", [(user_uuid, task.uuid)])
             db.commit()
-            db.refresh(task)
             return task
         except SQLAlchemyError as e:
             db.rollback()
@@ -117,4 +689,84 @@ class TaskService:
                 detail="Failed to update task status due to database error"
             )
 
+    def _create_tasks(self, data: TaskBulkCreate, db: Session, user_uuid: UUID) -> list[Task]:
+        """Inserts every task with one multi-row INSERT ... RETURNING, in one transaction."""
+
+        rows = [
+            {**task.model_dump(), "status": TaskType.PENDING.value, "user_uuid": user_uuid}
+            for task in data.tasks
+        ]
+        return self._insert_rows(rows, db)
+
+    def _insert_rows(self, rows: list[dict], db: Session) -> list[Task]:
+        """
+        Inserts rows, which may belong to several users, with one multi-row
+        INSERT ... RETURNING and updates their counters, in one transaction.
+        Returns the tasks in the order of rows.
+        """
+        by_user: dict[UUID, list[Task]] = {}
+        try:
+            tasks = list(db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), rows))
+            for task in tasks:
+                by_user.setdefault(task.user_uuid, []).append(task)
+            # In user order, so concurrent batches lock counter rows in the same order
+            for user_uuid in sorted(by_user):
+                task_counters.apply(db, user_uuid, task_counters.deltas(
+                    (task.status, task.priority) for task in by_user[user_uuid]
+                ))
+            task_events.notify(db, "created", ((task.user_uuid, task.uuid) for task in tasks))
+            db.commit()
+            return tasks
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to create tasks due to database error"
+            ) from e
+
+    def _update_tasks_status(self, data: TaskBulkStatus, user_uuid: UUID, db: Session) -> dict[UUID, Task]:
+        """Updates the status of the user's tasks among data.task_ids with one UPDATE ... RETURNING."""
+
+        now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+        try:
+            tasks, deltas = self._update_counted(
+                db, user_uuid, data.task_ids, {"status": data.status.value, "status_change": now}
+            )
+            task_counters.apply(db, user_uuid, deltas)
+            task_events.notify(db, "status", ((user_uuid, task.uuid) for task in tasks))
+            db.commit()
+            return {task.uuid: task for task in tasks}
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to update task status due to database error"
+            )
+
+    def _delete_tasks(self, data: TaskBulkDelete, user_uuid: UUID, db: Session) -> set[UUID]:
+        """Deletes the user's tasks among data.task_ids with one DELETE ... RETURNING."""
+
+        try:
+            deleted = db.execute(
+                delete(Task)
+                .where(Task.user_uuid == user_uuid, Task.uuid.in_(set(data.task_ids)))
+                .returning(Task.uuid, Task.status, Task.priority)
+            ).all()
+            if deleted:
+                db.execute(insert(TaskTombstone), [
+                    {"task_uuid": task_id, "user_uuid": user_uuid} for task_id, _, _ in deleted
+                ])
+            task_counters.apply(db, user_uuid, task_counters.deltas(
+                ((task_status, priority) for _, task_status, priority in deleted), sign=-1
+            ))
+            task_events.notify(db, "deleted", ((user_uuid, task_id) for task_id, _, _ in deleted))
+            db.commit()
+            return {task_id for task_id, _, _ in deleted}
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to delete tasks due to database error"
+            )
+
 task_service = TaskService()
\ No newline at end of file
@@ -0,0 +1,67 @@
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+
+from redis.exceptions import RedisError
+
+from core.config import Config
+from db.redis import redis_client
+
+
+class TaskCache:
+    """
+    Read-through Redis cache of serialized task payloads.
+
+    Keys embed the user's task version (see TaskService.get_version), so every
+    write for a user moves all of their reads onto fresh keys at once and the
+    old ones simply age out with TASK_CACHE_TTL. Without a version, or while
+    Redis errors, reads go straight to the database.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.errors = 0
+
+    @staticmethod
+    def key(user_uuid: UUID, version: str, *parts) -> str:
+        return ":".join(["task_cache", str(user_uuid), version, *(str(part) for part in parts)])
+
+    async def get_or_load(self, key: Optional[str], load: Callable[[], Awaitable[bytes]]) -> bytes:
+        """
+        Returns the cached bytes under key, or calls load() and caches what it
+        returns. A key of None skips the cache entirely.
+        """
+        if key is None or not Config.TASK_CACHE_ENABLED:
+            self.bypassed += 1
+            return await load()
+
+        try:
+            cached = await redis_client.get(key)
+        except RedisError:
+            self.errors += 1
+            cached = None
+        if cached is not None:
+            self.hits += 1
+            return cached.encode()
+
+        self.misses += 1
+        payload = await load()
+        try:
+            await redis_client.set(key, payload, ex=Config.TASK_CACHE_TTL)
+        except RedisError:
+            self.errors += 1
+        return payload
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+task_cache = TaskCache()
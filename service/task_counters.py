@@ -0,0 +1,131 @@
+from collections import Counter
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import Task, TaskCounter, User
+from schema.task import TaskType
+
+# INSERT ... ON CONFLICT DO UPDATE of each supported dialect
+_UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# (dimension, bucket) -> change in count
+Deltas = Counter[tuple[str, str]]
+
+
+class TaskCounters:
+    """
+    Per-user task counts by status and by priority, in the task_counters
+    table.
+
+    Writers turn the rows they insert, change or delete into deltas and
+    apply them with apply() before committing, so counters and tasks
+    commit or roll back together. Reading a user's counters is a primary
+    key range of at most one row per bucket, whatever the number of tasks.
+    reconcile() recounts from the tasks table and fixes any drift.
+    """
+
+    @staticmethod
+    def deltas(tasks: Iterable[tuple[str, int]], sign: int = 1) -> Deltas:
+        """Deltas for adding (sign=1) or removing (sign=-1) tasks given as (status, priority) pairs."""
+
+        deltas = Counter()
+        for task_status, priority in tasks:
+            deltas[("status", task_status)] += sign
+            deltas[("priority", str(priority))] += sign
+        return deltas
+
+    @staticmethod
+    def _upsert(db: Session, rows: list[dict], increment: bool):
+        insert = _UPSERTS[db.get_bind().dialect.name]
+        stmt = insert(TaskCounter).values(rows)
+        count = TaskCounter.count + stmt.excluded.count if increment else stmt.excluded.count
+        return stmt.on_conflict_do_update(
+            index_elements=[TaskCounter.user_uuid, TaskCounter.dimension, TaskCounter.bucket],
+            set_={"count": count},
+        )
+
+    def apply(self, db: Session, user_uuid: UUID, deltas: Deltas) -> None:
+        """Adds deltas to the user's counters in db's transaction, with one statement."""
+
+        # Sorted, so concurrent writers of one user lock the counter rows in the same order
+        rows = [
+            {"user_uuid": user_uuid, "dimension": dimension, "bucket": bucket, "count": change}
+            for (dimension, bucket), change in sorted(deltas.items()) if change
+        ]
+        if rows:
+            db.execute(self._upsert(db, rows, increment=True))
+
+    @staticmethod
+    def _lock_users(db: Session, user_uuids: list[UUID]) -> None:
+        # In uuid order, so concurrent reconciles of overlapping users can't deadlock
+        db.execute(
+            select(User.uuid)
+            .where(User.uuid.in_(sorted(set(user_uuids))))
+            .order_by(User.uuid)
+            .with_for_update()
+        )
+
+    def read(self, db: Session, user_uuid: UUID) -> dict[str, dict[str, int]]:
+        """The user's counters as {"status": {...}, "priority": {...}}, every bucket present."""
+
+        counts = {
+            "status": {task_type.value: 0 for task_type in TaskType},
+            "priority": {str(priority): 0 for priority in range(1, 6)},
+        }
+        rows = db.execute(
+            select(TaskCounter.dimension, TaskCounter.bucket, TaskCounter.count)
+            .where(TaskCounter.user_uuid == user_uuid)
+        )
+        for dimension, bucket, count in rows:
+            counts.setdefault(dimension, {})[bucket] = count
+        return counts
+
+    def reconcile(self, db: Session, user_uuids: list[UUID]) -> int:
+        """
+        Recounts the tasks of user_uuids and overwrites every counter that
+        drifted, in db's transaction; the caller commits. Returns the number
+        of counters fixed.
+
+        The users are locked first, FOR UPDATE: that conflicts with the key
+        share lock the foreign key check takes for every task insert and
+        every new counter row, so a write creating a bucket either commits
+        before the recount or waits for the reconcile and then adds its
+        delta to the fresh count. The stored counters are locked too, so
+        writes to existing buckets wait the same way rather than being
+        overwritten by the recount.
+        """
+        self._lock_users(db, user_uuids)
+        stored = {
+            (user_uuid, dimension, bucket): count
+            for user_uuid, dimension, bucket, count in db.execute(
+                select(TaskCounter.user_uuid, TaskCounter.dimension, TaskCounter.bucket, TaskCounter.count)
+                .where(TaskCounter.user_uuid.in_(user_uuids))
+                .with_for_update()
+            )
+        }
+
+        actual = Counter()
+        for user_uuid, task_status, priority, count in db.execute(
+            select(Task.user_uuid, Task.status, Task.priority, func.count())
+            .where(Task.user_uuid.in_(user_uuids))
+            .group_by(Task.user_uuid, Task.status, Task.priority)
+        ):
+            actual[(user_uuid, "status", task_status)] += count
+            actual[(user_uuid, "priority", str(priority))] += count
+
+        drifted = sorted(
+            (key for key in stored.keys() | actual.keys() if actual[key] != stored.get(key)), key=str
+        )
+        if drifted:
+            db.execute(self._upsert(db, [
+                {"user_uuid": key[0], "dimension": key[1], "bucket": key[2], "count": actual[key]}
+                for key in drifted
+            ], increment=False))
+        return len(drifted)
+
+
+task_counters = TaskCounters()
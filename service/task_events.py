@@ -0,0 +1,245 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import AsyncIterator, Iterable, Optional
+from uuid import UUID
+
+import psycopg2
+from fastapi import HTTPException, status
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from core.config import Config
+from db.database import engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "task_events"
+
+# Postgres caps a NOTIFY payload at 8000 bytes; 100 task ids stay well below
+_IDS_PER_NOTIFY = 100
+
+# One statement for any number of payloads, so bulk writes add a single query
+_NOTIFY = text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload")
+
+# Sent instead of events a client missed (its queue overflowed, or the
+# LISTEN connection was lost); the client should refetch its tasks
+RESYNC = ("resync", '{"type":"resync","tasks":[]}')
+
+
+class Subscription:
+    """One connected client: a bounded queue of (type, json) events for one user."""
+
+    __slots__ = ("user_uuid", "queue")
+
+    def __init__(self, user_uuid: UUID, size: int):
+        self.user_uuid = user_uuid
+        self.queue: asyncio.Queue[Optional[tuple[str, str]]] = asyncio.Queue(size)
+
+    def put(self, event: Optional[tuple[str, str]]) -> bool:
+        """
+        Queues event without waiting. A full queue means a slow consumer: its
+        backlog is replaced by a single RESYNC, so memory stays bounded and
+        the writer is never held up. Returns False when events were dropped.
+        """
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC if event is not None else None)
+            return False
+
+
+class TaskEvents:
+    """
+    Live create/update/status/delete events of each user's tasks.
+
+    TaskService writes call notify() inside their transaction, which issues
+    pg_notify, so events go out on commit and never for rolled-back writes.
+    Every worker holds one LISTEN connection (psycopg2, polled from the
+    event loop) and fans each notification out to the subscriptions of
+    that user in the process; workers without subscribers for a user only
+    pay for one dictionary lookup. Events carry task ids, not rows: a
+    client fetches what it needs, through the usual cached routes.
+
+    Without Postgres (the SQLite benchmark stand-in) events are fanned out
+    in-process only, so clients see the writes made by their own worker.
+    """
+
+    def __init__(self):
+        self.events = 0
+        self.resyncs = 0
+        self._subscribers: dict[UUID, set[Subscription]] = defaultdict(set)
+        self._clients = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._listening = False
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        if make_url(Config.TASK_STREAM_LISTEN_URL or engine.url).get_backend_name() == "postgresql":
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        for subscriptions in self._subscribers.values():
+            for subscription in subscriptions:
+                subscription.put(None)
+
+    def subscribe(self, user_uuid: UUID) -> Subscription:
+        if self._clients >= Config.TASK_STREAM_MAX_CLIENTS:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many open task streams, try again later",
+                headers={"Retry-After": "5"},
+            )
+        if len(self._subscribers.get(user_uuid, ())) >= Config.TASK_STREAM_MAX_PER_USER:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many open task streams for this user",
+            )
+        subscription = Subscription(user_uuid, Config.TASK_STREAM_QUEUE_SIZE)
+        self._subscribers[user_uuid].add(subscription)
+        self._clients += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscribers.get(subscription.user_uuid)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscribers[subscription.user_uuid]
+        self._clients -= 1
+
+    async def listen(self, subscription: Subscription) -> AsyncIterator[Optional[tuple[str, str]]]:
+        """
+        The subscription's events as (type, json), with None after every
+        TASK_STREAM_HEARTBEAT idle seconds so the caller can send a
+        keep-alive. Ends when the app shuts down; unsubscribes on exit.
+        """
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), Config.TASK_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return
+                yield event
+        finally:
+            self.unsubscribe(subscription)
+
+    def notify(self, db: Session, kind: str, tasks: Iterable[tuple[UUID, UUID]]) -> None:
+        """
+        Announces a write of kind ("created", "updated", "status" or
+        "deleted") to the (user_uuid, task_uuid) pairs in tasks. Call it in
+        the write's transaction, before the commit.
+        """
+        by_user: dict[UUID, list[str]] = defaultdict(list)
+        for user_uuid, task_uuid in tasks:
+            by_user[user_uuid].append(str(task_uuid))
+        payloads = [
+            json.dumps({"user": str(user_uuid), "type": kind, "tasks": task_ids[i:i + _IDS_PER_NOTIFY]})
+            for user_uuid, task_ids in by_user.items()
+            for i in range(0, len(task_ids), _IDS_PER_NOTIFY)
+        ]
+        if not payloads:
+            return
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(_NOTIFY, {"channel": CHANNEL, "payloads": payloads})
+        elif self._loop is not None:
+            # May run in a threadpool worker; subscriptions belong to the loop
+            for payload in payloads:
+                self._loop.call_soon_threadsafe(self._dispatch, payload)
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+            subscriptions = self._subscribers.get(UUID(event.pop("user")))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed task event: %.200s", payload)
+            return
+        if not subscriptions:
+            return
+        message = (event["type"], json.dumps(event))
+        self.events += 1
+        for subscription in subscriptions:
+            if not subscription.put(message):
+                self.resyncs += 1
+
+    def _resync_all(self) -> None:
+        for subscriptions in self._subscribers.values():
+            for subscription in subscriptions:
+                subscription.put(RESYNC)
+
+    @staticmethod
+    def _connect():
+        url = make_url(Config.TASK_STREAM_LISTEN_URL or engine.url).set(drivername="postgresql")
+        conn = psycopg2.connect(
+            url.render_as_string(hide_password=False),
+            # A silently dropped connection would otherwise look like a quiet channel
+            keepalives=1, keepalives_idle=30, keepalives_interval=10, keepalives_count=3,
+        )
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        return conn
+
+    def _on_readable(self, conn, lost: asyncio.Event) -> None:
+        try:
+            conn.poll()
+        except psycopg2.Error as e:
+            logger.warning("Task events connection lost: %s", e)
+            lost.set()
+            return
+        while conn.notifies:
+            self._dispatch(conn.notifies.pop(0).payload)
+
+    async def _listen(self) -> None:
+        loop = asyncio.get_running_loop()
+        delay = 1.0
+        connected_before = False
+        while True:
+            conn = None
+            lost = asyncio.Event()
+            try:
+                conn = await asyncio.to_thread(self._connect)
+                fd = conn.fileno()
+                loop.add_reader(fd, self._on_readable, conn, lost)
+                self._listening = True
+                if connected_before:
+                    # Events sent while reconnecting were missed
+                    self._resync_all()
+                connected_before, delay = True, 1.0
+                await lost.wait()
+            except psycopg2.Error as e:
+                logger.warning("Task events LISTEN failed: %s", e)
+            finally:
+                self._listening = False
+                if conn is not None:
+                    loop.remove_reader(fd)
+                    conn.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def stats(self) -> dict:
+        return {
+            "clients": self._clients,
+            "users": len(self._subscribers),
+            "events": self.events,
+            "resyncs": self.resyncs,
+            "listening": self._listening,
+        }
+
+
+task_events = TaskEvents()
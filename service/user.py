@@ -1,41 +1,59 @@
+import hashlib
+import logging
+import time
 from typing import Optional
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from passlib.context import CryptContext
 import datetime as dt
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from jose import jwt, JWTError
+from redis.exceptions import RedisError
 from fastapi.exceptions import HTTPException
 from fastapi import Depends, status
-import redis
 
-from db.database import get_db
+from db.database import get_db, run_in_session
+from db.redis import redis_client
 from schema.token import TokenData, TokenType
-from schema.user import UserRegister, UserLogin
+from schema.user import UserData, UserRegister, UserLogin
 from core.config import Config
 from models import User
+from service.password_hasher import password_hasher
+from service.user_cache import user_cache
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
 
 oauth2_scheme = HTTPBearer()
 
 class UserService:
 
     def __init__(self):
-        self.pwdContext = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        self.redisClient = redis.Redis.from_url(Config.REDIS_URL, decode_responses=True) 
+        self.passwordHasher = password_hasher
+        self.redisClient = redis_client
+        self.userCache = user_cache
+        # Verified token claims by sha256 of the token, each expiring with the token
+        self.tokenCache = TTLCache(maxsize=Config.TOKEN_CACHE_SIZE, ttl=0)
 
-    def _hash_password(self, plainPassword: str) -> str:
-        """Securely hash a password using bcrypt."""
+    async def _hash_password(self, plainPassword: str) -> str:
+        """Securely hash a password using bcrypt, off the request workers."""
 
-        return self.pwdContext.hash(plainPassword)
+        return await self.passwordHasher.hash(plainPassword)
     
 
-    def _verify_password(self, plainPassword: str, hashedPassword: str) -> bool:
-        """Verify a password against its hashed version."""
+    async def _verify_password(self, plainPassword: str, hashedPassword: str) -> bool:
+        """Verify a password against its hashed version, off the request workers."""
 
-        return self.pwdContext.verify(plainPassword, hashedPassword)
+        try:
+            return await self.passwordHasher.verify(plainPassword, hashedPassword)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=500,
+                detail="An unexpected error occurred"
+            )
     
 
-    def _create_token(self, uuid: str, type: TokenType) -> str:
+    def _create_token(self, uuid: str, type: TokenType, username: Optional[str] = None, email: Optional[str] = None) -> str:
 
         expires = dt.datetime.now(dt.timezone.utc) + dt.timedelta(
             minutes=Config.ACCESS_TOKEN_EXPIRE_MINUTES,
@@ -45,11 +63,26 @@ class UserService:
             "exp": expires,
             "type": type.value
         }
+        # Profile claims let AUTH_STATELESS build the principal without a lookup
+        if username is not None:
+            data["username"] = username
+        if email is not None:
+            data["email"] = email
         encodedJwt = jwt.encode(data, Config.SECRET_KEY, Config.ALGORITHM)
         return encodedJwt
     
     def _verify_token(self, token: str, token_type: TokenType) -> TokenData:
 
+        key = hashlib.sha256(token.encode()).digest()
+        cached = self.tokenCache.get(key)
+        if cached is not None:
+            cached_type, token_data = cached
+            if cached_type != token_type.value:
+                raise HTTPException(
+                    detail="Invalid token type", status_code=status.HTTP_400_BAD_REQUEST
+                )
+            return token_data
+
         try:
             payload = jwt.decode(token, Config.SECRET_KEY, algorithms=[Config.ALGORITHM])
             if payload.get("type") != token_type.value:
@@ -63,7 +96,7 @@ class UserService:
                     detail="Could not validate credentials",
                     headers={"WWW-Authenticate": "Bearer"},
                 )
-            return TokenData(uuid=payload.get("uuid"))
+            token_data = TokenData(uuid=payload.get("uuid"), username=payload.get("username"), email=payload.get("email"))
 
         except JWTError as e:
             raise HTTPException(
@@ -72,7 +105,51 @@ class UserService:
                     headers={"WWW-Authenticate": "Bearer"},
                 )
 
-    def get_user_with_uuid(self, uuid, db: Session):
+        # Only tokens with an expiry are cached, and never past it
+        if isinstance(payload.get("exp"), (int, float)):
+            ttl = payload["exp"] - time.time()
+            if ttl > 0:
+                self.tokenCache.set(key, (payload["type"], token_data), ttl=ttl)
+        return token_data
+
+    def clear_token_cache(self) -> None:
+        """Forget every verified token, e.g. after rotating SECRET_KEY."""
+
+        self.tokenCache.clear()
+
+    @staticmethod
+    def _revoked_key(uuid) -> str:
+        return f"revoked_user:{uuid}"
+
+    async def revoke_user(self, uuid) -> None:
+        """
+        Reject every access token of a deleted or banned user. The entry only
+        needs to outlive the longest-lived access token already issued.
+        """
+        try:
+            await self.redisClient.setex(
+                self._revoked_key(uuid), dt.timedelta(minutes=Config.ACCESS_TOKEN_EXPIRE_MINUTES), "revoked"
+            )
+        except RedisError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Revocation list unavailable, try again",
+                headers={"Retry-After": "1"},
+            )
+        await self.userCache.invalidate(uuid)
+
+    async def _is_revoked(self, uuid) -> Optional[bool]:
+        """Whether revoke_user was called for uuid recently; None when Redis can't tell."""
+
+        try:
+            return bool(await self.redisClient.exists(self._revoked_key(uuid)))
+        except RedisError as e:
+            return None
+
+    async def get_user_with_uuid(self, uuid, db: Session | AsyncSession):
+        return await run_in_session(db, self._get_user_with_uuid, uuid=uuid)
+
+    def _get_user_with_uuid(self, uuid, db: Session):
         try:
             user = db.query(User).filter(User.uuid == uuid).first()
             if user:
@@ -81,14 +158,20 @@ class UserService:
             return None
     
     
-    def create_user(self, data: UserRegister, db:Session):
+    async def create_user(self, data: UserRegister, db: Session | AsyncSession):
+        password_hash = await self._hash_password(data.password)
+        user = await run_in_session(db, self._create_user, data=data, password_hash=password_hash)
+        await self.userCache.invalidate(user.uuid)
+        return user
+
+    def _create_user(self, data: UserRegister, password_hash: str, db: Session):
         try:
             exist = db.query(User).filter(User.email == data.email).first()
             if exist:
                 raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="email registered already")
             
             data_dict = data.model_dump(exclude="password")
-            data_dict["password_hash"] = self._hash_password(data.password)
+            data_dict["password_hash"] = password_hash
             new_user = User(**data_dict)
             db.add(new_user)
             db.commit()
@@ -106,12 +189,32 @@ class UserService:
 
     
 
-    def authenticate_user(self, data: UserLogin, db: Session):
+    async def authenticate_user(self, data: UserLogin, db: Session | AsyncSession):
+        user = await run_in_session(db, self._get_user_by_email, email=data.email)
+        if not user or not await self._verify_password(data.password, user.password_hash):
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+
+        # Upgrade hashes made with a different cost now that we know the password
+        if self.passwordHasher.needs_rehash(user.password_hash):
+            try:
+                password_hash = await self._hash_password(data.password)
+            except HTTPException as e:
+                return user
+            await run_in_session(db, self._update_password_hash, user=user, password_hash=password_hash)
+        return user
+
+    def _update_password_hash(self, user: User, password_hash: str, db: Session):
         try:
-            user = db.query(User).filter(User.email == data.email).first()
-            if not user or not self._verify_password(data.password, user.password_hash):
-                raise HTTPException(status_code=401, detail="Invalid credentials")
-            return user
+            user.password_hash = password_hash
+            db.commit()
+            db.refresh(user)
+        except SQLAlchemyError as e:
+            # The old hash still verifies, so a failed upgrade must not fail the login
+            db.rollback()
+
+    def _get_user_by_email(self, email: str, db: Session):
+        try:
+            return db.query(User).filter(User.email == email).first()
         
         except SQLAlchemyError as e:
             raise HTTPException(
@@ -137,29 +240,52 @@ class UserService:
     #     blacklisted = self.redisClient.get(f"blacklisted_token:{refreshToken}")
     #     return blacklisted is None
     
-    def get_current_user(self, credentials: HTTPAuthorizationCredentials=Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Optional[User]:
+    async def get_current_user(self, credentials: HTTPAuthorizationCredentials=Depends(oauth2_scheme), db: Session | AsyncSession = Depends(get_db)) -> Optional[UserData]:
+        return await self.authenticate(token=credentials.credentials, db=db)
+
+    async def authenticate(self, token: str, db: Session | AsyncSession) -> UserData:
+        """The user an access token belongs to, for routes that don't take it from the Authorization header."""
+
         try:
-            token = credentials.credentials
             token_data = self._verify_token(token=token, token_type=TokenType.ACCESS)
             uuid = token_data.uuid
 
-            user = self.get_user_with_uuid(uuid=uuid, db=db)
-            if not user:
+            revoked = await self._is_revoked(uuid)
+            if revoked:
                 raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="user not found, app secret key and algorithm may have been exposed",
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Could not validate credentials",
+                    headers={"WWW-Authenticate": "Bearer"},
                 )
-            return user
 
-        except Exception as e:
-            print(f"Error in get_current_user: {e}")
-            if isinstance(e, HTTPException):
-                raise e
-            else:
+            # Stateless mode trusts the signed claims; tokens issued before the
+            # profile claims existed, or an unreadable revocation list, fall
+            # back to the lookup below.
+            if Config.AUTH_STATELESS and revoked is not None and token_data.username and token_data.email:
+                return UserData(uuid=uuid, username=token_data.username, email=token_data.email)
+
+            cached = await self.userCache.get(uuid)
+            if cached is not None:
+                return cached
 
+            user = await self.get_user_with_uuid(uuid=uuid, db=db)
+            if not user:
                 raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="An unexpected error occurred while retrieving the current user"
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="user not found, app secret key and algorithm may have been exposed",
                 )
+            user_data = UserData(uuid=user.uuid, username=user.username, email=user.email)
+            await self.userCache.set(user_data)
+            return user_data
+
+        except HTTPException as e:
+            logger.debug("Authentication rejected: %s", e.detail)
+            raise
+        except Exception:
+            logger.exception("Unexpected error while authenticating")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An unexpected error occurred while retrieving the current user"
+            )
 
 user_service = UserService()
\ No newline at end of file
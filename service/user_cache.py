@@ -0,0 +1,110 @@
+import threading
+from typing import Optional
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.config import Config
+from db.redis import redis_client
+from models import User
+from schema.user import UserData
+from utils.cache import TTLCache
+
+
+class UserCache:
+    """
+    Two-tier cache of the authenticated user, keyed by uuid.
+
+    The first tier is a small per-process TTL/LRU map, the second is Redis so
+    that workers share entries. The local TTL is kept short because other
+    workers only see an invalidation once their own entry expires. Redis
+    failures are treated as misses so authentication keeps working off the
+    database.
+    """
+
+    def __init__(self):
+        self.local = TTLCache(maxsize=Config.USER_CACHE_SIZE, ttl=Config.USER_CACHE_LOCAL_TTL)
+        self.redis_hits = 0
+        self.redis_errors = 0
+        self._stale: set[UUID] = set()
+        self._stale_lock = threading.Lock()
+
+    @staticmethod
+    def _key(uuid: UUID) -> str:
+        return f"user_cache:{uuid}"
+
+    async def get(self, uuid: UUID) -> Optional[UserData]:
+        await self._flush_stale()
+        user = self.local.get(uuid)
+        if user is not None:
+            return user
+
+        try:
+            cached = await redis_client.get(self._key(uuid))
+        except RedisError:
+            self.redis_errors += 1
+            return None
+        if cached is None:
+            return None
+
+        self.redis_hits += 1
+        user = UserData.model_validate_json(cached)
+        self.local.set(uuid, user)
+        return user
+
+    async def set(self, user: UserData) -> None:
+        self.local.set(user.uuid, user)
+        try:
+            await redis_client.setex(self._key(user.uuid), Config.USER_CACHE_REDIS_TTL, user.model_dump_json())
+        except RedisError:
+            self.redis_errors += 1
+
+    async def invalidate(self, uuid: UUID) -> None:
+        self.mark_stale(uuid)
+        await self._flush_stale()
+
+    def mark_stale(self, uuid: UUID) -> None:
+        """
+        Drop the local entry now and the Redis entry on the next async call.
+        Safe to call from sync code such as ORM event hooks.
+        """
+        self.local.pop(uuid)
+        with self._stale_lock:
+            self._stale.add(uuid)
+
+    async def _flush_stale(self) -> None:
+        if not self._stale:
+            return
+        with self._stale_lock:
+            stale, self._stale = self._stale, set()
+        try:
+            await redis_client.delete(*(self._key(uuid) for uuid in stale))
+        except RedisError:
+            self.redis_errors += 1
+            with self._stale_lock:
+                self._stale |= stale
+
+    def stats(self) -> dict:
+        local = self.local.stats()
+        lookups = local["hits"] + local["misses"]
+        hits = local["hits"] + self.redis_hits
+        return {
+            "local": local,
+            "redis_hits": self.redis_hits,
+            "redis_errors": self.redis_errors,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed_users(session: Session, flush_context) -> None:
+    """Invalidate cached users whenever a User row is changed or deleted."""
+
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            user_cache.mark_stale(obj.uuid)
@@ -0,0 +1,113 @@
+"""
+Runs the app in-process against a throwaway SQLite database, the stand-in
+the benchmarks use (DB_URL). Settings already in the environment win; the
+defaults below only fill in the rest. Redis defaults to a port nothing
+listens on, so the app runs as it does with Redis down: no response
+caches, users resolved from the database on a local cache miss.
+"""
+import os
+import tempfile
+import uuid
+
+import fakeredis
+import pytest
+
+_DEFAULTS = {
+    "APP_NAME": "todo-api",
+    "APP_VERSION": "test",
+    "APP_DESCRIPTION": "todo-api tests",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_USER": "todo",
+    "DB_PASSWORD": "todo",
+    "DB_NAME": "todo",
+    "DB_URL": f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='todo-api-tests-'), 'test.db')}",
+    "SECRET_KEY": "test-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "JWT_REFRESH_EXPIRY": "10",
+    "DEBUG_MODE": "false",
+    "REDIS_URL": "redis://127.0.0.1:1/0",
+    "RATE_LIMIT_ENABLED": "false",
+    "PASSWORD_HASH_ROUNDS": "4",
+}
+for name, value in _DEFAULTS.items():
+    os.environ.setdefault(name, value)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from db.database import Base, engine  # noqa: E402
+from db.redis import redis_client  # noqa: E402
+from main import app  # noqa: E402
+from schema.token import TokenType  # noqa: E402
+from service.user import user_service  # noqa: E402
+from service.user_cache import user_cache  # noqa: E402
+
+if engine.dialect.name == "sqlite":
+    Base.metadata.create_all(engine)
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def register(client) -> dict[str, str]:
+    """Registers a new user and returns their Authorization headers."""
+
+    response = client.post("/api/v1/auth/register", json={
+        "username": "tester",
+        "email": f"{uuid.uuid4().hex[:12]}@example.com",
+        "password": "correct horse battery staple",
+    })
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['data']['accessToken']}"}
+
+
+@pytest.fixture
+def auth(client) -> dict[str, str]:
+    """Authorization headers of a newly registered user."""
+
+    return register(client)
+
+
+@pytest.fixture
+def auth_uuid(auth) -> uuid.UUID:
+    """uuid of the auth user."""
+
+    return user_service._verify_token(auth["Authorization"].split()[1], TokenType.ACCESS).uuid
+
+
+@pytest.fixture
+def other_auth(client) -> dict[str, str]:
+    """Authorization headers of a second user, whose tasks auth must not reach."""
+
+    return register(client)
+
+
+@pytest.fixture
+def cold_user_cache():
+    """Forgets resolved users, so the next request looks its user up as on a cache miss."""
+
+    user_cache.local.clear()
+
+
+@pytest.fixture
+def redis_server() -> fakeredis.FakeServer:
+    """The in-memory server behind fake_redis; set connected = False to take it down."""
+
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def fake_redis(redis_server):
+    """Serves Redis commands from an in-memory fakeredis for the test."""
+
+    client, owned = redis_client._client, redis_client._owned
+    fake = fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True)
+    redis_client.use(fake)
+    # Tests without it have tripped the breaker against the unreachable REDIS_URL
+    redis_client.breaker.record_success()
+    yield fake
+    redis_client._client, redis_client._owned = client, owned
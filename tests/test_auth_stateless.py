@@ -0,0 +1,50 @@
+"""
+AUTH_STATELESS: the current user is built from the access token's claims,
+without reading the users table, as long as the revocation list in Redis
+can be read. Revoked users are still rejected; with Redis down every
+request falls back to the lookup.
+"""
+import asyncio
+import re
+
+import pytest
+
+from core.config import Config
+from schema.token import TokenType
+from service.user import user_service
+from utils.query_budget import QueryCounter
+
+_USERS = re.compile(r"\bFROM\s+users\b", re.IGNORECASE)
+
+
+def _looks_up_user(client, auth) -> bool:
+    with QueryCounter() as counter:
+        response = client.get("/api/v1/tasks/", headers=auth)
+    assert response.status_code == 200, response.text
+    return any(_USERS.search(statement) for statement in counter.statements)
+
+
+@pytest.fixture
+def stateless(monkeypatch):
+    monkeypatch.setattr(Config, "AUTH_STATELESS", True)
+
+
+def test_stateless_skips_the_user_lookup(client, auth, fake_redis, cold_user_cache, stateless):
+    assert not _looks_up_user(client, auth)
+
+
+def test_lookup_without_stateless(client, auth, fake_redis, cold_user_cache):
+    assert _looks_up_user(client, auth)
+
+
+def test_stateless_rejects_revoked_users(client, auth, fake_redis, stateless):
+    token_data = user_service._verify_token(auth["Authorization"].split()[1], TokenType.ACCESS)
+    asyncio.run(user_service.revoke_user(token_data.uuid))
+
+    assert client.get("/api/v1/tasks/", headers=auth).status_code == 401
+
+
+def test_stateless_looks_up_while_redis_is_down(client, auth, fake_redis, redis_server, cold_user_cache, stateless):
+    redis_server.connected = False
+
+    assert _looks_up_user(client, auth)
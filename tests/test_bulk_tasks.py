@@ -0,0 +1,111 @@
+"""
+The bulk task routes: POST /tasks/bulk creates all of its tasks or none,
+while PATCH /tasks/bulk/status and DELETE /tasks/bulk apply to the ids
+that belong to the user and report every other id as not_found, in
+request order.
+"""
+import time
+import uuid
+
+from sqlalchemy.exc import OperationalError
+
+from service.task_counters import task_counters
+
+
+def _due() -> int:
+    return int(time.time()) + 3600
+
+
+def _create(client, auth, count: int) -> list[str]:
+    response = client.post("/api/v1/tasks/bulk", headers=auth, json={
+        "tasks": [{"title": f"bulk {i}", "due_date": _due(), "priority": i % 5 + 1} for i in range(count)]
+    })
+    assert response.status_code == 201, response.text
+    return [result["uuid"] for result in response.json()["data"]["results"]]
+
+
+def _task_ids(client, auth) -> set[str]:
+    response = client.get("/api/v1/tasks/", headers=auth, params={"limit": 100})
+    assert response.status_code == 200, response.text
+    return {task["uuid"] for task in response.json()["data"]["tasks"]}
+
+
+def test_bulk_create(client, auth):
+    response = client.post("/api/v1/tasks/bulk", headers=auth, json={
+        "tasks": [{"title": f"bulk {i}", "due_date": _due()} for i in range(3)]
+    })
+
+    assert response.status_code == 201, response.text
+    results = response.json()["data"]["results"]
+    assert [result["result"] for result in results] == ["created"] * 3
+    # In request order
+    assert [result["task"]["title"] for result in results] == ["bulk 0", "bulk 1", "bulk 2"]
+    assert _task_ids(client, auth) == {result["uuid"] for result in results}
+
+
+def test_bulk_create_is_all_or_nothing(client, auth):
+    response = client.post("/api/v1/tasks/bulk", headers=auth, json={
+        "tasks": [{"title": "fine", "due_date": _due()}, {"title": "overdue", "due_date": int(time.time()) - 60}]
+    })
+
+    assert response.status_code == 422, response.text
+    assert _task_ids(client, auth) == set()
+
+
+def test_bulk_create_needs_a_task(client, auth):
+    response = client.post("/api/v1/tasks/bulk", headers=auth, json={"tasks": []})
+
+    assert response.status_code == 422, response.text
+
+
+def test_bulk_status_skips_ids_of_others(client, auth, other_auth):
+    mine = _create(client, auth, 2)
+    theirs = _create(client, other_auth, 1)
+    missing = str(uuid.uuid4())
+
+    response = client.patch("/api/v1/tasks/bulk/status", headers=auth, json={
+        "task_ids": [mine[0], theirs[0], missing, mine[1]], "status": "completed",
+    })
+
+    assert response.status_code == 200, response.text
+    results = response.json()["data"]["results"]
+    assert [(result["uuid"], result["result"]) for result in results] == [
+        (mine[0], "updated"), (theirs[0], "not_found"), (missing, "not_found"), (mine[1], "updated"),
+    ]
+    assert all(result["task"]["status"] == "completed" for result in results if result["result"] == "updated")
+    theirs_now = client.get(f"/api/v1/tasks/{theirs[0]}", headers=other_auth).json()["data"]["task"]
+    assert theirs_now["status"] == "pending"
+
+
+def test_bulk_delete_skips_ids_of_others(client, auth, other_auth):
+    mine = _create(client, auth, 3)
+    theirs = _create(client, other_auth, 1)
+
+    response = client.request("DELETE", "/api/v1/tasks/bulk", headers=auth, json={
+        "task_ids": [mine[0], theirs[0], mine[1]],
+    })
+
+    assert response.status_code == 200, response.text
+    assert [result["result"] for result in response.json()["data"]["results"]] == ["deleted", "not_found", "deleted"]
+    assert _task_ids(client, auth) == {mine[2]}
+    assert _task_ids(client, other_auth) == set(theirs)
+
+    # Already gone
+    response = client.request("DELETE", "/api/v1/tasks/bulk", headers=auth, json={"task_ids": [mine[0]]})
+    assert [result["result"] for result in response.json()["data"]["results"]] == ["not_found"]
+
+
+def test_bulk_status_rolls_back_on_database_error(client, auth, monkeypatch):
+    mine = _create(client, auth, 2)
+
+    def fail(*args, **kwargs):
+        raise OperationalError("UPDATE task_counters", {}, Exception("connection lost"))
+
+    # The counters are written after the tasks, in the same transaction
+    monkeypatch.setattr(task_counters, "apply", fail)
+    response = client.patch("/api/v1/tasks/bulk/status", headers=auth, json={"task_ids": mine, "status": "completed"})
+    monkeypatch.undo()
+
+    assert response.status_code == 500, response.text
+    for task_id in mine:
+        assert client.get(f"/api/v1/tasks/{task_id}", headers=auth).json()["data"]["task"]["status"] == "pending"
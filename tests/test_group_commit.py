@@ -0,0 +1,104 @@
+"""
+GroupCommit (utils.group_commit): concurrent submits are written in
+batches of at most max_batch, or after max_delay; a batch that fails with
+one of retry_on (or with an error caused by one) is retried item by item,
+and any other failure fails the whole batch with a single write.
+"""
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import DataError, IntegrityError, OperationalError
+
+from service.task import task_service
+from utils.group_commit import GroupCommit
+
+
+class Writer:
+    """A write function recording its batches; items in bad fail any batch holding them."""
+
+    def __init__(self, error: Exception = None, bad: set = frozenset()):
+        self.batches = []
+        self.error = error
+        self.bad = bad
+
+    async def __call__(self, items: list) -> list:
+        self.batches.append(list(items))
+        if self.bad & set(items):
+            raise self.error
+        return [item * 10 for item in items]
+
+
+def _submit_all(group: GroupCommit, items: list) -> list:
+    async def scenario():
+        return await asyncio.gather(*(group.submit(item) for item in items), return_exceptions=True)
+
+    return asyncio.run(scenario())
+
+
+def test_batches_by_size():
+    writer = Writer()
+    group = GroupCommit(writer, max_delay=60, max_batch=2)
+
+    assert _submit_all(group, [1, 2, 3, 4]) == [10, 20, 30, 40]
+    assert writer.batches == [[1, 2], [3, 4]]
+
+
+def test_batches_by_delay():
+    writer = Writer()
+    group = GroupCommit(writer, max_delay=0.01, max_batch=100)
+
+    assert _submit_all(group, [1, 2, 3]) == [10, 20, 30]
+    assert writer.batches == [[1, 2, 3]]
+    assert group.stats()["avg_batch"] == 3
+
+
+@pytest.mark.parametrize("error", [
+    IntegrityError("INSERT", {}, Exception("not null")),
+    DataError("INSERT", {}, Exception("out of range")),
+])
+def test_retries_items_on_their_own(error):
+    writer = Writer(error, bad={2})
+    group = GroupCommit(writer, max_delay=0.01, max_batch=100, retry_on=(IntegrityError, DataError))
+
+    first, second, third = _submit_all(group, [1, 2, 3])
+
+    assert (first, third) == (10, 30)
+    assert second is error
+    assert writer.batches == [[1, 2, 3], [1], [2], [3]]
+    assert group.retried == 3
+
+
+def test_retries_when_caused_by_retry_on():
+    cause = IntegrityError("INSERT", {}, Exception("not null"))
+    error = HTTPException(status_code=500)
+    error.__cause__ = cause
+    writer = Writer(error, bad={1})
+    group = GroupCommit(writer, max_delay=0.01, max_batch=100, retry_on=(IntegrityError,))
+
+    assert _submit_all(group, [1, 2]) == [error, 20]
+    assert group.retried == 2
+
+
+def test_other_errors_fail_the_whole_batch():
+    error = OperationalError("INSERT", {}, Exception("connection refused"))
+    writer = Writer(error, bad={1})
+    group = GroupCommit(writer, max_delay=0.01, max_batch=100, retry_on=(IntegrityError, DataError))
+
+    assert _submit_all(group, [1, 2, 3]) == [error, error, error]
+    assert writer.batches == [[1, 2, 3]]
+    assert group.failed == 3 and group.retried == 0
+
+
+def test_task_batch_isolates_a_bad_row(client, auth, auth_uuid):
+    due_date = int(time.time()) + 3600
+    rows = [{"title": title, "description": None, "due_date": due_date, "priority": 1, "status": "pending",
+             "user_uuid": auth_uuid} for title in ("first", None, "third")]
+
+    first, bad, third = _submit_all(task_service.group_commit, rows)
+
+    assert (first.title, third.title) == ("first", "third")
+    assert isinstance(bad, HTTPException) and isinstance(bad.__cause__, IntegrityError)
+    titles = [task["title"] for task in client.get("/api/v1/tasks/", headers=auth).json()["data"]["tasks"]]
+    assert sorted(titles) == ["first", "third"]
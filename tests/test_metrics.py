@@ -0,0 +1,19 @@
+"""GET /metrics is only served to callers with the admin key (X-Admin-Key)."""
+from core.config import Config
+
+
+def test_metrics_off_without_admin_key(client, monkeypatch):
+    monkeypatch.setattr(Config, "ADMIN_API_KEY", None)
+
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_need_the_admin_key(client, monkeypatch):
+    monkeypatch.setattr(Config, "ADMIN_API_KEY", "scrape-key")
+
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"X-Admin-Key": "wrong"}).status_code == 403
+
+    response = client.get("/metrics", headers={"X-Admin-Key": "scrape-key"})
+    assert response.status_code == 200
+    assert "db_pool_checkouts_total" in response.text
@@ -0,0 +1,58 @@
+"""
+PasswordHasher: hashes are only ever upgraded to a higher cost, and a pool
+whose worker died is replaced instead of failing every later login.
+"""
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+import pytest
+
+from service.password_hasher import PasswordHasher
+
+
+def _hash_with(rounds: int) -> str:
+    return bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=rounds)).decode()
+
+
+def test_rehash_only_upgrades():
+    hasher = PasswordHasher()
+    hasher.rounds = 5
+
+    assert hasher.needs_rehash(_hash_with(4))
+    assert not hasher.needs_rehash(_hash_with(5))
+    assert not hasher.needs_rehash(_hash_with(6))
+    assert hasher.needs_rehash("not a bcrypt hash")
+
+
+def test_broken_pool_is_replaced():
+    hasher = PasswordHasher()
+    hasher.rounds = 4
+
+    async def crash_worker():
+        broken = hasher._get_pool()
+        # Kills the worker process, which breaks the pool for every later job
+        await asyncio.get_running_loop().run_in_executor(broken, os._exit, 1)
+
+    async def hash_and_verify():
+        hashed = await hasher.hash("secret")
+        return await hasher.verify("secret", hashed)
+
+    try:
+        with pytest.raises(BrokenProcessPool):
+            asyncio.run(crash_worker())
+        broken = hasher._pool
+
+        assert asyncio.run(hash_and_verify())
+        assert hasher._pool is not broken
+    finally:
+        hasher.shutdown()
+
+
+def test_workers_share_the_first_calibrated_cost(fake_redis):
+    first, second = PasswordHasher(), PasswordHasher()
+
+    assert asyncio.run(first._shared_rounds(11)) == 11
+    # Timed bcrypt slower, but hashes at the cost already in use
+    assert asyncio.run(second._shared_rounds(12)) == 11
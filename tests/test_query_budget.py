@@ -0,0 +1,144 @@
+"""
+Every task route against its query budget (utils.query_budget), run with
+a cold user cache so the current-user lookup is counted too. BUDGETS pins
+the declared budgets: raising one means changing it here as well.
+"""
+import logging
+import time
+import uuid
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from api.router.task import task_router
+from core.config import Config
+from db.database import engine, get_db
+from models import Task
+from utils.metrics import MetricsMiddleware
+from utils.query_budget import QueryCounter
+
+BUDGETS = {
+    ("POST", "/tasks/"): 4,
+    ("GET", "/tasks/"): 2,
+    ("GET", "/tasks/export"): 2,
+    ("GET", "/tasks/stream"): 1,
+    ("GET", "/tasks/search"): 2,
+    ("GET", "/tasks/stats"): 3,
+    ("GET", "/tasks/changes"): 4,
+    ("POST", "/tasks/bulk"): 4,
+    ("PATCH", "/tasks/bulk/status"): 5,
+    ("DELETE", "/tasks/bulk"): 5,
+    ("GET", "/tasks/{task_id}"): 2,
+    ("PUT", "/tasks/{task_id}"): 5,
+    ("DELETE", "/tasks/{task_id}"): 5,
+    ("PUT", "/tasks/{task_id}/status"): 5,
+}
+
+
+def _due() -> int:
+    return int(time.time()) + 3600
+
+
+@pytest.fixture
+def tasks(client, auth) -> dict:
+    """Three tasks of the auth user, and a sync token taken before one of them was deleted."""
+
+    response = client.post("/api/v1/tasks/bulk", headers=auth, json={
+        "tasks": [{"title": f"task {i}", "due_date": _due(), "priority": i + 1} for i in range(3)]
+    })
+    assert response.status_code == 201, response.text
+    ids = [result["uuid"] for result in response.json()["data"]["results"]]
+    token = client.get("/api/v1/tasks/changes", headers=auth).json()["data"]["next_token"]
+    assert client.delete(f"/api/v1/tasks/{ids.pop()}", headers=auth).status_code == 204
+    return {"ids": ids, "token": token}
+
+
+CALLS = {
+    ("POST", "/tasks/"): lambda client, auth, tasks: client.post(
+        "/api/v1/tasks/", headers=auth, json={"title": "new", "due_date": _due()}),
+    ("GET", "/tasks/"): lambda client, auth, tasks: client.get(
+        "/api/v1/tasks/", headers=auth, params={"sort": "due_date", "overdue": False, "priority_min": 1}),
+    ("GET", "/tasks/export"): lambda client, auth, tasks: client.get(
+        "/api/v1/tasks/export", headers=auth, params={"format": "csv"}),
+    ("GET", "/tasks/stats"): lambda client, auth, tasks: client.get("/api/v1/tasks/stats", headers=auth),
+    ("GET", "/tasks/changes"): lambda client, auth, tasks: client.get(
+        "/api/v1/tasks/changes", headers=auth, params={"since": tasks["token"]}),
+    ("POST", "/tasks/bulk"): lambda client, auth, tasks: client.post(
+        "/api/v1/tasks/bulk", headers=auth, json={"tasks": [{"title": "bulk", "due_date": _due()}] * 5}),
+    ("PATCH", "/tasks/bulk/status"): lambda client, auth, tasks: client.patch(
+        "/api/v1/tasks/bulk/status", headers=auth, json={"task_ids": tasks["ids"], "status": "completed"}),
+    ("DELETE", "/tasks/bulk"): lambda client, auth, tasks: client.request(
+        "DELETE", "/api/v1/tasks/bulk", headers=auth, json={"task_ids": tasks["ids"]}),
+    ("GET", "/tasks/{task_id}"): lambda client, auth, tasks: client.get(
+        f"/api/v1/tasks/{tasks['ids'][0]}", headers=auth),
+    ("PUT", "/tasks/{task_id}"): lambda client, auth, tasks: client.put(
+        f"/api/v1/tasks/{tasks['ids'][0]}", headers=auth, json={"title": "renamed", "priority": 5}),
+    ("DELETE", "/tasks/{task_id}"): lambda client, auth, tasks: client.delete(
+        f"/api/v1/tasks/{tasks['ids'][0]}", headers=auth),
+    ("PUT", "/tasks/{task_id}/status"): lambda client, auth, tasks: client.put(
+        f"/api/v1/tasks/{tasks['ids'][0]}/status", headers=auth, json={"status": "in_progress"}),
+    ("GET", "/tasks/search"): lambda client, auth, tasks: client.get(
+        "/api/v1/tasks/search", headers=auth, params={"q": "task"}),
+}
+
+
+def test_every_task_route_has_its_budget():
+    declared = {
+        (method, route.path): getattr(route.endpoint, "__query_budget__", None)
+        for route in task_router.routes if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+    assert declared == BUDGETS
+
+
+@pytest.mark.parametrize("route", list(CALLS), ids=" ".join)
+def test_route_within_budget(client, auth, tasks, cold_user_cache, route):
+    if route == ("GET", "/tasks/search") and engine.dialect.name != "postgresql":
+        pytest.skip("full-text search needs Postgres")
+
+    with QueryCounter(max_queries=BUDGETS[route]):
+        response = CALLS[route](client, auth, tasks)
+
+    assert response.status_code < 400, response.text
+
+
+def test_stream_within_budget(client, auth, cold_user_cache):
+    token = auth["Authorization"].split()[1]
+
+    # Same subscription as the SSE route, whose response never ends
+    with QueryCounter(max_queries=BUDGETS[("GET", "/tasks/stream")]):
+        with client.websocket_connect(f"/api/v1/tasks/stream?access_token={token}"):
+            pass
+
+
+def test_repeated_statement_warns_in_debug_mode(monkeypatch, caplog):
+    monkeypatch.setattr(Config, "DEBUG_MODE", True)
+    n_plus_one = FastAPI()
+    n_plus_one.add_middleware(MetricsMiddleware)
+
+    @n_plus_one.get("/tasks/{count}")
+    def load_one_by_one(count: int, db: Session = Depends(get_db)):
+        for _ in range(count):
+            db.execute(select(Task).where(Task.uuid == uuid.uuid4())).all()
+
+    with TestClient(n_plus_one) as client, caplog.at_level(logging.WARNING, logger="utils.query_budget"):
+        client.get(f"/tasks/{Config.QUERY_REPEAT_WARN_THRESHOLD - 1}")
+        assert "Possible N+1" not in caplog.text
+
+        client.get(f"/tasks/{Config.QUERY_REPEAT_WARN_THRESHOLD}")
+    assert f"Possible N+1 on /tasks/{{count}}: statement ran {Config.QUERY_REPEAT_WARN_THRESHOLD} times" in caplog.text
+
+
+def test_task_routes_do_not_warn_in_debug_mode(client, auth, tasks, monkeypatch, caplog):
+    monkeypatch.setattr(Config, "DEBUG_MODE", True)
+
+    with caplog.at_level(logging.WARNING, logger="utils.query_budget"):
+        for route, call in CALLS.items():
+            if route != ("GET", "/tasks/search"):
+                call(client, auth, tasks)
+
+    assert caplog.text == ""
@@ -0,0 +1,119 @@
+"""
+RateLimiter (utils.rate_limit): the sliding-window script, run by
+fakeredis, admits up to limit requests per window and records a request
+under every limit or under none; while Redis is down the same limits come
+from the in-process token buckets. The auth routes answer a request over
+the limit with a 429 and Retry-After.
+"""
+import asyncio
+import uuid
+
+import pytest
+
+from core.config import Config
+from utils import rate_limit as rate_limit_module
+from utils.rate_limit import RateLimiter, TokenBucket
+
+
+@pytest.fixture
+def limiter() -> RateLimiter:
+    return RateLimiter()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """time.monotonic, as seen by the token buckets, moved by hand."""
+
+    class Clock:
+        now = 1000.0
+
+    monkeypatch.setattr(rate_limit_module.time, "monotonic", lambda: Clock.now)
+    return Clock
+
+
+def _key() -> str:
+    return uuid.uuid4().hex
+
+
+def _hits(limiter: RateLimiter, *calls: list[tuple[str, int, int]]) -> list[float]:
+    async def scenario():
+        return [await limiter.hit(keys) for keys in calls]
+
+    return asyncio.run(scenario())
+
+
+def test_sliding_window_in_redis(limiter, fake_redis):
+    keys = [(_key(), 2, 60)]
+
+    first, second, third = _hits(limiter, keys, keys, keys)
+
+    assert first == second == 0
+    assert 0 < third <= 60
+    assert limiter.stats() == {"allowed": 2, "limited": 1, "fallbacks": 0, "local_keys": 0}
+
+
+def test_limited_request_is_recorded_nowhere(limiter, fake_redis):
+    strict, loose = (_key(), 1, 60), (_key(), 3, 60)
+
+    results = _hits(limiter, [strict, loose], [strict, loose], [loose], [loose], [loose])
+
+    # The second request was over strict, so loose only counts the first
+    assert results[0] == 0 and results[1] > 0
+    assert results[2:4] == [0, 0]
+    assert results[4] > 0
+
+
+def test_falls_back_to_token_buckets(limiter, fake_redis, redis_server, clock):
+    redis_server.connected = False
+    keys = [(_key(), 2, 60)]
+
+    assert _hits(limiter, keys, keys, keys) == [0, 0, 30]
+    assert limiter.fallbacks == 3
+    assert len(limiter.local) == 1
+
+
+def test_token_bucket_refills(clock):
+    bucket = TokenBucket(maxsize=10)
+    keys = [("k", 2, 60)]
+
+    assert [bucket.hit(keys), bucket.hit(keys)] == [0, 0]
+    assert bucket.hit(keys) == pytest.approx(30)
+    clock.now += 15
+    assert bucket.hit(keys) == pytest.approx(15)
+    clock.now += 15
+    assert bucket.hit(keys) == 0
+
+
+def test_token_bucket_takes_from_every_key_or_none(clock):
+    bucket = TokenBucket(maxsize=10)
+    strict, loose = ("strict", 1, 60), ("loose", 2, 60)
+
+    assert bucket.hit([strict, loose]) == 0
+    assert bucket.hit([strict, loose]) == pytest.approx(60)
+    assert bucket.hit([loose]) == 0
+    assert bucket.hit([loose]) > 0
+
+
+def test_token_bucket_evicts_least_recent(clock):
+    bucket = TokenBucket(maxsize=2)
+    bucket.hit([("a", 1, 60)])
+    bucket.hit([("b", 1, 60)])
+    bucket.hit([("c", 1, 60)])
+
+    assert len(bucket) == 2
+    # Evicted, so a full bucket again
+    assert bucket.hit([("a", 1, 60)]) == 0
+    assert bucket.hit([("c", 1, 60)]) > 0
+
+
+def test_login_over_the_limit(client, fake_redis, monkeypatch):
+    monkeypatch.setattr(Config, "RATE_LIMIT_ENABLED", True)
+    body = {"email": f"{_key()}@example.com", "password": "wrong-password"}
+
+    statuses = [client.post("/api/v1/auth/login", json=body).status_code
+                for _ in range(Config.RATE_LIMIT_LOGIN_PER_ACCOUNT)]
+    response = client.post("/api/v1/auth/login", json=body)
+
+    assert 429 not in statuses
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= Config.RATE_LIMIT_WINDOW
@@ -0,0 +1,136 @@
+"""
+RedisClient's circuit breaker, against fakeredis: consecutive connection
+errors open it, calls then fail fast without touching the network, and
+after REDIS_BREAKER_RESET one probe decides whether it closes again.
+"""
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError, ResponseError
+
+from db import redis as redis_module
+from db.redis import CircuitBreaker, RedisClient, RedisUnavailable
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(redis_module.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def guarded(fake_redis) -> RedisClient:
+    client = RedisClient()
+    client.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    client.use(fake_redis)
+    return client
+
+
+def test_breaker_transitions(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and breaker.opened == 1
+    assert not breaker.allow()
+
+    clock.now += 10
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe per reset_timeout
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and breaker.opened == 2
+    assert not breaker.allow()
+
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+    assert breaker.allow()
+
+
+def test_client_fails_fast_while_open(guarded, redis_server, clock):
+    async def scenario():
+        await guarded.set("key", "value")
+
+        redis_server.connected = False
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                await guarded.get("key")
+        assert guarded.breaker.state == CircuitBreaker.OPEN
+
+        # Rejected before reaching the server, as a RedisError callers already handle
+        redis_server.connected = True
+        with pytest.raises(RedisUnavailable):
+            await guarded.get("key")
+        assert guarded.metrics.rejected == 1
+        assert guarded.metrics.errors == 3
+
+        clock.now += 10
+        assert await guarded.get("key") == "value"
+        assert guarded.breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_failed_probe_reopens(guarded, redis_server, clock):
+    async def scenario():
+        redis_server.connected = False
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                await guarded.get("key")
+
+        clock.now += 10
+        with pytest.raises(ConnectionError):
+            await guarded.get("key")
+        assert guarded.breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(RedisUnavailable):
+            await guarded.get("key")
+
+    asyncio.run(scenario())
+
+
+def test_command_errors_do_not_trip_the_breaker(guarded):
+    async def scenario():
+        await guarded.set("key", "value")
+        for _ in range(3):
+            with pytest.raises(ResponseError):
+                await guarded.incr("key")
+        assert guarded.breaker.state == CircuitBreaker.CLOSED
+        assert guarded.metrics.errors == 3
+
+    asyncio.run(scenario())
+
+
+def test_pipeline_goes_through_the_breaker(guarded, redis_server):
+    async def scenario():
+        async with guarded.pipeline(transaction=False) as pipe:
+            assert await pipe.set("key", 1).incr("key").execute() == [True, 2]
+        assert guarded.metrics.calls == 1
+
+        redis_server.connected = False
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                async with guarded.pipeline(transaction=False) as pipe:
+                    await pipe.get("key").execute()
+        redis_server.connected = True
+
+        with pytest.raises(RedisUnavailable):
+            async with guarded.pipeline(transaction=False) as pipe:
+                await pipe.get("key").execute()
+
+    asyncio.run(scenario())
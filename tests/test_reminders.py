@@ -0,0 +1,115 @@
+"""
+ReminderScheduler (jobs.reminders), driven with explicit clock values: it
+loads the open tasks whose reminder fires inside its window, sends each
+one once when it comes due, drops reminders of tasks completed or
+rescheduled since they were loaded, and retries a batch its sink failed.
+"""
+import asyncio
+import itertools
+import time
+import uuid
+
+import pytest
+
+from jobs.reminders import ReminderScheduler
+
+# Windows far past the due dates the other tests use, one per test, so
+# only the test's own tasks fall in its window
+_WINDOWS = itertools.count(int(time.time()) + 30 * 24 * 3600, 10_000)
+
+
+@pytest.fixture
+def base() -> int:
+    return next(_WINDOWS)
+
+
+class ListSink:
+    def __init__(self, failures: int = 0):
+        self.sent = []
+        self.failures = failures
+
+    async def send(self, reminders) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("sink down")
+        self.sent.extend(reminders)
+
+
+def _create(client, auth, due_dates: list[int]) -> list[str]:
+    response = client.post("/api/v1/tasks/bulk", headers=auth, json={
+        "tasks": [{"title": "remind me", "due_date": due_date} for due_date in due_dates]
+    })
+    assert response.status_code == 201, response.text
+    return [result["uuid"] for result in response.json()["data"]["results"]]
+
+
+def _scheduler(sink, start: int, **kwargs) -> ReminderScheduler:
+    scheduler = ReminderScheduler(sink, horizon=kwargs.pop("horizon", 100), lead=kwargs.pop("lead", 0), **kwargs)
+    scheduler.watermark = scheduler.loaded_until = start
+    return scheduler
+
+
+def test_sends_each_reminder_once_when_due(client, auth, base):
+    ids = _create(client, auth, [base + 10, base + 20, base + 200])
+    sink = ListSink()
+    scheduler = _scheduler(sink, base, batch_size=2)
+
+    async def scenario():
+        await scheduler.extend(base)
+        assert await scheduler.fire(base + 5) == 0
+        assert await scheduler.fire(base + 15) == 1
+        assert await scheduler.fire(base + 50) == 1
+        # Not loaded yet: beyond the window
+        assert await scheduler.fire(base + 250) == 0
+
+    asyncio.run(scenario())
+    assert [str(reminder.task_uuid) for reminder in sink.sent] == ids[:2]
+
+
+def test_lead_sends_early(client, auth, base):
+    ids = _create(client, auth, [base + 40])
+    sink = ListSink()
+    scheduler = _scheduler(sink, base, lead=30)
+
+    async def scenario():
+        await scheduler.extend(base)
+        assert await scheduler.fire(base + 9) == 0
+        assert await scheduler.fire(base + 10) == 1
+
+    asyncio.run(scenario())
+    assert [str(reminder.task_uuid) for reminder in sink.sent] == ids
+
+
+def test_skips_completed_and_rescheduled_tasks(client, auth, base):
+    completed, moved = _create(client, auth, [base + 10, base + 20])
+    sink = ListSink()
+    scheduler = _scheduler(sink, base)
+
+    async def scenario():
+        await scheduler.extend(base)
+        client.put(f"/api/v1/tasks/{completed}/status", headers=auth, json={"status": "completed"})
+        client.put(f"/api/v1/tasks/{moved}", headers=auth, json={"due_date": base + 60})
+        # What TaskService publishes for a write inside the window
+        scheduler.schedule(uuid.UUID(moved), base + 60)
+
+        assert await scheduler.fire(base + 30) == 0
+        assert await scheduler.fire(base + 60) == 1
+
+    asyncio.run(scenario())
+    assert [str(reminder.task_uuid) for reminder in sink.sent] == [moved]
+    assert sink.sent[0].due_date == base + 60
+
+
+def test_retries_when_the_sink_fails(client, auth, base):
+    ids = _create(client, auth, [base + 10])
+    sink = ListSink(failures=1)
+    scheduler = _scheduler(sink, base)
+
+    async def scenario():
+        await scheduler.extend(base)
+        assert await scheduler.fire(base + 10) == 0
+        assert scheduler.watermark == base
+        assert await scheduler.fire(base + 11) == 1
+
+    asyncio.run(scenario())
+    assert [str(reminder.task_uuid) for reminder in sink.sent] == ids
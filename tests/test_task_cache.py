@@ -0,0 +1,84 @@
+"""
+Conditional requests and the task cache, with Redis served by fakeredis:
+reads carry an ETag built from the user's task version, a matching
+If-None-Match gets a 304, repeated reads come from the cache, and every
+write moves the user's reads onto a new version. With Redis down reads go
+to the database and carry no ETag.
+"""
+import time
+
+from service.task_cache import task_cache
+from utils.query_budget import QueryCounter
+
+
+def _create(client, auth, title: str = "cached") -> str:
+    response = client.post("/api/v1/tasks/", headers=auth, json={"title": title, "due_date": int(time.time()) + 3600})
+    assert response.status_code == 201, response.text
+    return response.json()["data"]["task"]["uuid"]
+
+
+def test_not_modified_until_a_write(client, auth, fake_redis):
+    task_id = _create(client, auth)
+
+    first = client.get("/api/v1/tasks/", headers=auth)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "private, no-cache"
+
+    with QueryCounter() as counter:
+        response = client.get("/api/v1/tasks/", headers={**auth, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert counter.count == 0
+
+    client.put(f"/api/v1/tasks/{task_id}/status", headers=auth, json={"status": "completed"})
+    response = client.get("/api/v1/tasks/", headers={**auth, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["data"]["tasks"][0]["status"] == "completed"
+
+
+def test_etag_differs_per_representation(client, auth, fake_redis):
+    task_id = _create(client, auth)
+
+    listed = client.get("/api/v1/tasks/", headers=auth).headers["ETag"]
+    single = client.get(f"/api/v1/tasks/{task_id}", headers=auth).headers["ETag"]
+    sorted_ = client.get("/api/v1/tasks/", headers=auth, params={"sort": "priority"}).headers["ETag"]
+
+    assert len({listed, single, sorted_}) == 3
+    response = client.get(f"/api/v1/tasks/{task_id}", headers={**auth, "If-None-Match": f'W/{single}, "other"'})
+    assert response.status_code == 304
+
+
+def test_reads_come_from_the_cache_until_a_write(client, auth, fake_redis):
+    task_id = _create(client, auth)
+    client.get(f"/api/v1/tasks/{task_id}", headers=auth)
+
+    hits = task_cache.hits
+    with QueryCounter() as counter:
+        response = client.get(f"/api/v1/tasks/{task_id}", headers=auth)
+    assert response.status_code == 200
+    assert task_cache.hits == hits + 1
+    assert counter.count == 0
+
+    client.put(f"/api/v1/tasks/{task_id}", headers=auth, json={"title": "renamed"})
+    response = client.get(f"/api/v1/tasks/{task_id}", headers=auth)
+    assert response.json()["data"]["task"]["title"] == "renamed"
+
+
+def test_no_etag_while_redis_is_down(client, auth, fake_redis, redis_server):
+    task_id = _create(client, auth)
+    redis_server.connected = False
+
+    response = client.get(f"/api/v1/tasks/{task_id}", headers={**auth, "If-None-Match": "*"})
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+
+def test_overdue_list_has_no_etag(client, auth, fake_redis):
+    _create(client, auth)
+
+    response = client.get("/api/v1/tasks/", headers=auth, params={"overdue": True})
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
@@ -0,0 +1,109 @@
+"""
+GET /tasks/changes: a sync without a token returns every task, and the
+next_token it ends with returns only what was written or deleted after
+it, deletes as tombstones, paged by limit with has_more. Tokens that
+were not issued by it get a 400, tokens past the tombstone retention a 410.
+"""
+import datetime
+import time
+
+import pytest
+
+from core.config import Config
+from utils.pagination import _encode, encode_sync_token
+
+
+def _create(client, auth, count: int) -> list[str]:
+    response = client.post("/api/v1/tasks/bulk", headers=auth, json={
+        "tasks": [{"title": f"synced {i}", "due_date": int(time.time()) + 3600} for i in range(count)]
+    })
+    assert response.status_code == 201, response.text
+    return [result["uuid"] for result in response.json()["data"]["results"]]
+
+
+def _changes(client, auth, since: str = None, limit: int = 500) -> dict:
+    params = {"limit": limit}
+    if since is not None:
+        params["since"] = since
+    response = client.get("/api/v1/tasks/changes", headers=auth, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+def test_full_sync_then_deltas(client, auth):
+    first, second, third = _create(client, auth, 3)
+    full = _changes(client, auth)
+    assert sorted(task["uuid"] for task in full["tasks"]) == sorted([first, second, third])
+    assert full["deleted"] == [] and not full["has_more"]
+
+    client.put(f"/api/v1/tasks/{first}", headers=auth, json={"title": "renamed"})
+    client.delete(f"/api/v1/tasks/{second}", headers=auth)
+    delta = _changes(client, auth, full["next_token"])
+
+    assert [(task["uuid"], task["title"]) for task in delta["tasks"]] == [(first, "renamed")]
+    assert delta["deleted"] == [second]
+
+    caught_up = _changes(client, auth, delta["next_token"])
+    assert caught_up["tasks"] == [] and caught_up["deleted"] == [] and not caught_up["has_more"]
+
+
+def test_bulk_delete_leaves_tombstones(client, auth):
+    ids = _create(client, auth, 3)
+    token = _changes(client, auth)["next_token"]
+
+    response = client.request("DELETE", "/api/v1/tasks/bulk", headers=auth, json={"task_ids": ids[:2]})
+    assert response.status_code == 200, response.text
+
+    assert sorted(_changes(client, auth, token)["deleted"]) == sorted(ids[:2])
+
+
+def test_pages_by_limit(client, auth):
+    token = _changes(client, auth)["next_token"]
+    ids = _create(client, auth, 3)
+    client.delete(f"/api/v1/tasks/{ids[0]}", headers=auth)
+
+    seen, deleted, pages = [], [], 0
+    while True:
+        page = _changes(client, auth, token, limit=2)
+        seen.extend(task["uuid"] for task in page["tasks"])
+        deleted.extend(page["deleted"])
+        token, pages = page["next_token"], pages + 1
+        if not page["has_more"]:
+            break
+
+    # ids[0] was created, then deleted: it may come as both, but ends deleted
+    assert set(seen) >= set(ids[1:])
+    assert deleted == [ids[0]]
+    assert pages >= 2
+
+
+def test_changes_are_per_user(client, auth, other_auth):
+    token = _changes(client, other_auth)["next_token"]
+    task_id = _create(client, auth, 1)[0]
+    client.delete(f"/api/v1/tasks/{task_id}", headers=auth)
+
+    delta = _changes(client, other_auth, token)
+
+    assert delta["tasks"] == [] and delta["deleted"] == []
+
+
+@pytest.mark.parametrize("token", [
+    "not-a-token",
+    # The format before tokens held transaction ids: (changed_at, uuid)
+    _encode(["sync", datetime.datetime(2026, 1, 1).isoformat(), "00000000-0000-0000-0000-000000000000"]),
+    _encode(["cursor", 1, None, datetime.datetime(2026, 1, 1).isoformat()]),
+])
+def test_invalid_token(client, auth, token):
+    response = client.get("/api/v1/tasks/changes", headers=auth, params={"since": token})
+
+    assert response.status_code == 400
+
+
+def test_expired_token(client, auth):
+    issued_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) \
+        - datetime.timedelta(days=Config.TASK_TOMBSTONE_RETENTION_DAYS + 1)
+
+    response = client.get("/api/v1/tasks/changes", headers=auth,
+                          params={"since": encode_sync_token(0, None, issued_at)})
+
+    assert response.status_code == 410
@@ -0,0 +1,101 @@
+"""
+task_counters behind GET /tasks/stats: every write keeps the user's
+counters equal to a recount of their tasks, and reconcile() (run by
+jobs.reconcile_counters) puts drifted counters back.
+"""
+import time
+
+from sqlalchemy import delete, update
+
+from db.database import SessionLocal
+from jobs.reconcile_counters import reconcile_all
+from models import TaskCounter
+from service.task_counters import task_counters
+
+
+def _stats(client, auth) -> dict:
+    response = client.get("/api/v1/tasks/stats", headers=auth)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+def _recount(client, auth) -> tuple[dict, dict]:
+    tasks = client.get("/api/v1/tasks/", headers=auth, params={"limit": 100}).json()["data"]["tasks"]
+    by_status = {"pending": 0, "in_progress": 0, "completed": 0}
+    by_priority = {str(priority): 0 for priority in range(1, 6)}
+    for task in tasks:
+        by_status[task["status"]] += 1
+        by_priority[str(task["priority"])] += 1
+    return by_status, by_priority
+
+
+def _create(client, auth, priorities: list[int]) -> list[str]:
+    response = client.post("/api/v1/tasks/bulk", headers=auth, json={
+        "tasks": [{"title": "counted", "due_date": int(time.time()) + 3600, "priority": p} for p in priorities]
+    })
+    assert response.status_code == 201, response.text
+    return [result["uuid"] for result in response.json()["data"]["results"]]
+
+
+def test_writes_keep_the_counters(client, auth):
+    ids = _create(client, auth, [1, 2, 3, 3])
+    client.post("/api/v1/tasks/", headers=auth, json={"title": "single", "due_date": int(time.time()) + 3600})
+    client.put(f"/api/v1/tasks/{ids[0]}/status", headers=auth, json={"status": "in_progress"})
+    client.put(f"/api/v1/tasks/{ids[1]}", headers=auth, json={"priority": 5})
+    client.patch("/api/v1/tasks/bulk/status", headers=auth, json={"task_ids": ids[2:], "status": "completed"})
+    client.delete(f"/api/v1/tasks/{ids[3]}", headers=auth)
+
+    stats = _stats(client, auth)
+    by_status, by_priority = _recount(client, auth)
+    assert stats["by_status"] == by_status == {"pending": 2, "in_progress": 1, "completed": 1}
+    assert stats["by_priority"] == by_priority
+    assert stats["total"] == 4
+
+
+def test_reconcile_fixes_drift(client, auth, auth_uuid):
+    _create(client, auth, [1, 1, 4])
+    expected = _stats(client, auth)
+
+    with SessionLocal() as db:
+        db.execute(update(TaskCounter).where(TaskCounter.user_uuid == auth_uuid, TaskCounter.bucket == "1").values(count=7))
+        db.execute(delete(TaskCounter).where(TaskCounter.user_uuid == auth_uuid, TaskCounter.bucket == "4"))
+        db.commit()
+    assert _stats(client, auth) != expected
+
+    with SessionLocal() as db:
+        assert task_counters.reconcile(db, [auth_uuid]) == 2
+        db.commit()
+    assert _stats(client, auth) == expected
+
+    with SessionLocal() as db:
+        assert task_counters.reconcile(db, [auth_uuid]) == 0
+
+
+def test_reconcile_zeroes_counters_without_tasks(client, auth, auth_uuid):
+    ids = _create(client, auth, [2])
+    with SessionLocal() as db:
+        db.execute(update(TaskCounter).where(TaskCounter.user_uuid == auth_uuid, TaskCounter.bucket == "2").values(count=3))
+        db.commit()
+    client.delete(f"/api/v1/tasks/{ids[0]}", headers=auth)
+
+    with SessionLocal() as db:
+        task_counters.reconcile(db, [auth_uuid])
+        db.commit()
+
+    stats = _stats(client, auth)
+    assert stats["total"] == 0
+    assert stats["by_priority"]["2"] == 0
+
+
+def test_reconcile_job_walks_every_user(client, auth, other_auth, auth_uuid):
+    _create(client, auth, [3])
+    _create(client, other_auth, [3])
+    with SessionLocal() as db:
+        db.execute(update(TaskCounter).where(TaskCounter.bucket == "3").values(count=TaskCounter.count + 1))
+        db.commit()
+
+    users, fixed = reconcile_all(batch_size=2)
+
+    assert users >= 2 and fixed >= 2
+    assert _stats(client, auth)["by_priority"]["3"] == 1
+    assert _stats(client, other_auth)["by_priority"]["3"] == 1
@@ -0,0 +1,99 @@
+"""
+The SQL each single-task write sends for the tasks table: one INSERT,
+UPDATE or DELETE ... RETURNING, with no SELECT to check ownership first
+and none to refresh the row afterwards. Before they were rewritten, an
+update or delete took three to four statements on tasks (ownership
+SELECT, the write, a refresh SELECT) and a create two (INSERT, refresh).
+"""
+import re
+import time
+import uuid
+
+from sqlalchemy.dialects import postgresql
+
+from db.database import engine
+from service.task import TaskService
+from utils.query_budget import QueryCounter
+
+# tasks itself, not task_counters or task_tombstones
+_TASKS = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+tasks\b", re.IGNORECASE)
+
+
+def _task_statements(counter: QueryCounter) -> list[str]:
+    return [statement.split(None, 1)[0].upper() for statement in counter.statements if _TASKS.search(statement)]
+
+
+def _create(client, auth) -> str:
+    response = client.post("/api/v1/tasks/", headers=auth,
+                           json={"title": "write me", "due_date": int(time.time()) + 3600})
+    assert response.status_code == 201, response.text
+    return response.json()["data"]["task"]["uuid"]
+
+
+def test_create_is_one_insert(client, auth):
+    with QueryCounter() as counter:
+        task_id = _create(client, auth)
+
+    assert task_id
+    assert _task_statements(counter) == ["INSERT"]
+
+
+def test_update_is_one_update(client, auth):
+    task_id = _create(client, auth)
+
+    with QueryCounter() as counter:
+        response = client.put(f"/api/v1/tasks/{task_id}", headers=auth, json={"title": "renamed"})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["task"]["title"] == "renamed"
+    assert _task_statements(counter) == ["UPDATE"]
+
+
+def test_status_update_is_one_update(client, auth):
+    task_id = _create(client, auth)
+
+    with QueryCounter() as counter:
+        response = client.put(f"/api/v1/tasks/{task_id}/status", headers=auth, json={"status": "completed"})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["task"]["status"] == "completed"
+    if engine.dialect.name == "postgresql":
+        assert _task_statements(counter) == ["UPDATE"]
+    else:
+        # SQLite cannot return the replaced status from the UPDATE, so it is read first
+        assert _task_statements(counter) == ["SELECT", "UPDATE"]
+
+
+def test_counted_update_returns_the_old_row():
+    """What a status or priority change sends on Postgres, whatever DB_URL the tests run on."""
+
+    sql = str(TaskService._counted_update(uuid.uuid4(), [uuid.uuid4()], {"status": "completed"})
+              .compile(dialect=postgresql.dialect()))
+
+    assert sql.count("UPDATE tasks SET") == 1
+    assert re.search(r"FROM \(SELECT tasks\.uuid .* FOR UPDATE\) AS old_task", sql, re.DOTALL), sql
+    assert re.search(r"RETURNING .*old_task\.status .*old_task\.priority", sql, re.DOTALL), sql
+
+
+def test_delete_is_one_delete(client, auth):
+    task_id = _create(client, auth)
+
+    with QueryCounter() as counter:
+        response = client.delete(f"/api/v1/tasks/{task_id}", headers=auth)
+
+    assert response.status_code == 204, response.text
+    assert _task_statements(counter) == ["DELETE"]
+    assert client.get(f"/api/v1/tasks/{task_id}", headers=auth).status_code == 404
+
+
+def test_delete_of_missing_task_is_one_delete(client, auth):
+    task_id = _create(client, auth)
+    assert client.delete(f"/api/v1/tasks/{task_id}", headers=auth).status_code == 204
+
+    with QueryCounter() as counter:
+        response = client.delete(f"/api/v1/tasks/{task_id}", headers=auth)
+
+    assert response.status_code == 404, response.text
+    assert _task_statements(counter) == ["DELETE"]
+    # Nothing was deleted, so no tombstone or counter update follows
+    assert len(counter.statements) == 1
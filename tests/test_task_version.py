@@ -0,0 +1,52 @@
+"""
+The per-user task version behind ETags and the task cache, when the bump
+after a write fails. The worker whose bump failed stops using the version
+until the bump lands; the others keep it until the key expires.
+"""
+import asyncio
+import uuid
+
+from core.config import Config
+from service.task import TaskService
+
+
+def test_failed_bump(fake_redis, redis_server):
+    worker, other_worker = TaskService(), TaskService()
+    user_uuid = uuid.uuid4()
+    key = TaskService._version_key(user_uuid)
+
+    async def scenario():
+        before = await worker.get_version(user_uuid)
+        assert 0 < await fake_redis.ttl(key) <= Config.TASK_VERSION_TTL
+
+        redis_server.connected = False
+        assert not await worker._bump_version(user_uuid)
+        # The worker that knows about the write never serves the stale version
+        assert await worker.get_version(user_uuid) is None
+        redis_server.connected = True
+
+        # Other workers cannot know: they serve it until the key expires
+        assert await other_worker.get_version(user_uuid) == before
+        await fake_redis.delete(key)  # as if TASK_VERSION_TTL had passed
+        assert await other_worker.get_version(user_uuid) != before
+
+        # Once Redis answers again the bump is retried and the version moves on
+        after = await worker.get_version(user_uuid)
+        assert after is not None and after != before
+        assert user_uuid not in worker._unbumped
+
+    asyncio.run(scenario())
+
+
+def test_bump_keeps_the_expiry(fake_redis):
+    service = TaskService()
+    user_uuid = uuid.uuid4()
+    key = TaskService._version_key(user_uuid)
+
+    async def scenario():
+        before = await service.get_version(user_uuid)
+        assert await service._bump_version(user_uuid)
+        assert await service.get_version(user_uuid) != before
+        assert 0 < await fake_redis.ttl(key) <= Config.TASK_VERSION_TTL
+
+    asyncio.run(scenario())
@@ -0,0 +1,106 @@
+"""
+UserService's cache of verified JWTs: a cached token skips the signature
+check, an entry never outlives the token's exp, a token of the wrong type
+is still rejected, and clear_token_cache() (DELETE /admin/cache/tokens)
+forgets every entry.
+"""
+import time
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from core.config import Config
+from schema.token import TokenType
+from service import user as user_module
+from service.user import UserService
+
+
+@pytest.fixture
+def service() -> UserService:
+    return UserService()
+
+
+@pytest.fixture
+def decodes(monkeypatch) -> list[str]:
+    """Tokens whose signature was checked, i.e. that missed the cache."""
+
+    decoded = []
+    decode = jwt.decode
+
+    def counting_decode(token, *args, **kwargs):
+        decoded.append(token)
+        return decode(token, *args, **kwargs)
+
+    monkeypatch.setattr(user_module.jwt, "decode", counting_decode)
+    return decoded
+
+
+def _token(token_type: TokenType, expires_in: float) -> str:
+    return jwt.encode({"uuid": str(uuid.uuid4()), "type": token_type.value, "exp": int(time.time() + expires_in)},
+                      Config.SECRET_KEY, Config.ALGORITHM)
+
+
+def test_verified_token_is_cached(service, decodes):
+    token = _token(TokenType.ACCESS, 600)
+
+    first = service._verify_token(token, TokenType.ACCESS)
+    second = service._verify_token(token, TokenType.ACCESS)
+
+    assert first == second
+    assert decodes == [token]
+    assert service.tokenCache.hits == 1
+
+
+def test_entry_expires_with_the_token(service, decodes):
+    token = _token(TokenType.ACCESS, 1)
+    service._verify_token(token, TokenType.ACCESS)
+
+    time.sleep(2)  # past exp by whole seconds, the resolution jose checks it at
+    with pytest.raises(HTTPException) as rejected:
+        service._verify_token(token, TokenType.ACCESS)
+
+    assert rejected.value.status_code == 401
+    assert decodes == [token, token]
+
+
+def test_cached_token_of_the_wrong_type(service):
+    token = _token(TokenType.REFRESH, 600)
+    service._verify_token(token, TokenType.REFRESH)
+
+    with pytest.raises(HTTPException) as rejected:
+        service._verify_token(token, TokenType.ACCESS)
+
+    assert rejected.value.status_code == 400
+
+
+def test_invalid_token_is_not_cached(service):
+    token = _token(TokenType.ACCESS, 600)[:-2] + "xx"
+
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            service._verify_token(token, TokenType.ACCESS)
+
+    assert len(service.tokenCache) == 0
+
+
+def test_clear(service, decodes):
+    token = _token(TokenType.ACCESS, 600)
+    service._verify_token(token, TokenType.ACCESS)
+
+    service.clear_token_cache()
+    service._verify_token(token, TokenType.ACCESS)
+
+    assert len(decodes) == 2
+
+
+def test_admin_clear(client, monkeypatch):
+    monkeypatch.setattr(Config, "ADMIN_API_KEY", "admin-key")
+    token = _token(TokenType.ACCESS, 600)
+    user_module.user_service._verify_token(token, TokenType.ACCESS)
+
+    response = client.delete("/api/v1/admin/cache/tokens", headers={"X-Admin-Key": "admin-key"})
+
+    assert response.status_code == 200, response.text
+    assert len(user_module.user_service.tokenCache) == 0
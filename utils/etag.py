@@ -0,0 +1,40 @@
+import hashlib
+from typing import Optional
+from uuid import UUID
+
+from fastapi import Request
+
+
+def make_etag(version: str, user_uuid: UUID, request: Request) -> str:
+    """
+    Builds a strong ETag for one representation of a user's tasks.
+
+    Args:
+        version (str): the user's current task version
+        user_uuid (UUID): owner of the tasks
+        request (Request): the request, whose path and query pick the representation
+
+    Returns:
+        str: quoted ETag value
+    """
+    raw = f"{user_uuid}:{version}:{request.url.path}?{request.url.query}"
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against our ETag, as RFC 9110
+    requires for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (value.strip() for value in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def etag_headers(etag: str) -> dict:
+    """Headers that let clients cache the response but revalidate it on every use."""
+
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
@@ -0,0 +1,94 @@
+import asyncio
+import contextvars
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class GroupCommit(Generic[T, R]):
+    """
+    Coalesces concurrent single-item writes into batches.
+
+    submit() queues an item and waits. The first item of a batch arms a
+    max_delay timer; the batch is written when the timer fires or when it
+    reaches max_batch items, whichever comes first, by one call to
+    write(items), which returns one result per item, in order. When that
+    call fails with one of retry_on (raised directly or as the __cause__ of
+    what was raised), the failure is likely a single bad item, so every
+    item is retried on its own, and each caller gets its own result or its
+    own error. Any other failure (the database down or overloaded) fails
+    the whole batch at once rather than multiplying the load by retrying.
+
+    Batches are written in an empty context, so their queries are not
+    billed to whichever request happened to open the batch (see
+    utils.metrics.request_stats).
+    """
+
+    def __init__(self, write: Callable[[list[T]], Awaitable[list[R]]], max_delay: float, max_batch: int,
+                 retry_on: tuple[type[BaseException], ...] = ()):
+        self.write = write
+        self.retry_on = retry_on
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.batches = 0
+        self.items = 0
+        self.retried = 0
+        self.failed = 0
+        self._pending: list[tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            loop.call_soon(self._flush, context=contextvars.Context())
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush, context=contextvars.Context())
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            asyncio.get_running_loop().create_task(self._write(batch))
+
+    async def _write(self, batch: list[tuple[T, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.write([item for item, _ in batch])
+        except Exception as e:
+            if not isinstance(e, self.retry_on) and not isinstance(e.__cause__, self.retry_on):
+                self.failed += len(batch)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            self.retried += len(batch)
+            for item, future in batch:
+                try:
+                    result = (await self.write([item]))[0]
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+            return
+        for (_, future), result in zip(batch, results):
+            # A caller that went away (client disconnect) cancelled its future
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "retried": self.retried,
+            "failed": self.failed,
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
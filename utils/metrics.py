@@ -0,0 +1,248 @@
+import bisect
+import threading
+import time
+from collections import Counter as StatementCounter
+from contextvars import ContextVar
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config import Config
+from utils.query_budget import check_request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+class RequestStats:
+    """
+    DB and Redis work done on behalf of the current request. Statement
+    texts are only kept in DEBUG_MODE, for the N+1 check.
+    """
+
+    __slots__ = ("db_queries", "db_time", "redis_calls", "redis_time", "statements")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.redis_calls = 0
+        self.redis_time = 0.0
+        self.statements: Optional[StatementCounter] = StatementCounter() if Config.DEBUG_MODE else None
+
+
+# Set by MetricsMiddleware for the lifetime of a request. Threadpool workers
+# and AsyncSession.run_sync inherit the context, so they add to the same stats.
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in values:
+            yield f"{self.name}{_labels(self.labels, label_values)} {value}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # per label set: [count per bucket (non-cumulative, last is +Inf), sum]
+        self._values: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            values = [(label_values, list(counts), total) for label_values, (counts, total) in self._values.items()]
+        for label_values, counts, total in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_labels(self.labels, label_values, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, label_values)} {total}"
+            yield f"{self.name}_count{_labels(self.labels, label_values)} {cumulative}"
+
+
+class Registry:
+    """
+    Metrics of this process in the Prometheus text exposition format.
+
+    Collectors are callables run at scrape time that return extra lines,
+    for values that already live elsewhere (pool and Redis client stats).
+    With several workers every scrape sees one worker, so each series also
+    needs the scrape target's instance label to be summed correctly.
+    """
+
+    def __init__(self):
+        self.metrics: list = []
+        self.collectors: list[Callable[[], Iterable[str]]] = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], Iterable[str]]) -> Callable[[], Iterable[str]]:
+        self.collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = [line for metric in self.metrics for line in metric.render()]
+        lines += [line for collector in self.collectors for line in collector()]
+        return "\n".join(lines) + "\n"
+
+
+def gauge_lines(name: str, help: str, samples: Iterable[tuple[dict, float]], type: str = "gauge") -> Iterable[str]:
+    """Exposition lines for a metric whose values are read at scrape time."""
+
+    yield f"# HELP {name} {help}"
+    yield f"# TYPE {name} {type}"
+    for labels, value in samples:
+        yield f"{name}{_labels(tuple(labels), tuple(labels.values()))} {value}"
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+)
+http_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+http_db_queries = registry.histogram(
+    "http_request_db_queries", "Database queries per HTTP request", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+http_db_time = registry.histogram(
+    "http_request_db_seconds", "Time spent in database queries per HTTP request", ("method", "route")
+)
+http_redis_time = registry.histogram(
+    "http_request_redis_seconds", "Time spent in Redis calls per HTTP request", ("method", "route")
+)
+http_query_budget_exceeded = registry.counter(
+    "http_query_budget_exceeded_total", "Requests that ran more SQL statements than their route's budget",
+    ("method", "route"),
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if request_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = request_stats.get()
+    started = conn.info.get("query_started")
+    if stats is None or not started:
+        return
+    stats.db_queries += 1
+    stats.db_time += time.perf_counter() - started.pop()
+    if stats.statements is not None:
+        stats.statements[statement] += 1
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def record_redis_call(elapsed: float) -> None:
+    stats = request_stats.get()
+    if stats is not None:
+        stats.redis_calls += 1
+        stats.redis_time += elapsed
+
+
+class MetricsMiddleware:
+    """
+    Times every HTTP request and records it, with the DB and Redis work it
+    caused, under its route template (e.g. /api/v1/tasks/{task_id}).
+    Requests that match no route share one "unmatched" label so random
+    paths can't blow up the series count. Plain ASGI middleware, to keep
+    the per-request cost to a few dict updates. It also enforces the
+    routes' query budgets (see utils.query_budget).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            request_stats.reset(token)
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.inc(method, route_label, str(status_code))
+            http_duration.observe(elapsed, method, route_label)
+            http_db_queries.observe(stats.db_queries, method, route_label)
+            http_db_time.observe(stats.db_time, method, route_label)
+            http_redis_time.observe(stats.redis_time, method, route_label)
+            if check_request(getattr(route, "endpoint", None), route_label, stats.db_queries, stats.statements,
+                             Config.QUERY_REPEAT_WARN_THRESHOLD):
+                http_query_budget_exceeded.inc(method, route_label)
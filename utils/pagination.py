@@ -0,0 +1,125 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+
+def _encode(parts: list) -> str:
+    raw = json.dumps(parts, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(created_at: datetime, uuid: UUID) -> str:
+    """
+    Builds the opaque cursor that points just past the given row.
+
+    Args:
+        created_at (datetime): created_at of the last row on the page
+        uuid (UUID): uuid of the last row on the page
+
+    Returns:
+        str: url-safe cursor string
+    """
+    return _encode([created_at.isoformat(), str(uuid)])
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Reverses encode_cursor.
+
+    Args:
+        cursor (str): cursor received from the client
+
+    Raises:
+        HTTPException: 400 when the cursor was not produced by encode_cursor
+
+    Returns:
+        tuple[datetime, UUID]: the (created_at, uuid) key of the last row seen
+    """
+    try:
+        created_at, uuid = _decode(cursor)
+        return datetime.fromisoformat(created_at), UUID(uuid)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+
+def encode_key_cursor(sort: str, key: int | float, uuid: UUID) -> str:
+    """
+    Cursor for pages ordered by a numeric key (due_date, priority, search
+    rank) and uuid. The sort name is embedded so a cursor can't be replayed
+    against a different ordering. JSON round-trips floats exactly, so the
+    next page resumes on the same key.
+
+    Args:
+        sort (str): name of the ordering the cursor belongs to
+        key (int | float): sort key of the last row on the page
+        uuid (UUID): uuid of the last row on the page
+
+    Returns:
+        str: url-safe cursor string
+    """
+    return _encode([sort, key, str(uuid)])
+
+
+def decode_key_cursor(cursor: str, sort: str) -> tuple[int | float, UUID]:
+    """
+    Reverses encode_key_cursor.
+
+    Raises:
+        HTTPException: 400 when the cursor was not produced by encode_key_cursor for this sort
+
+    Returns:
+        tuple[int | float, UUID]: the (key, uuid) of the last row seen
+    """
+    try:
+        cursor_sort, key, uuid = _decode(cursor)
+        if cursor_sort != sort or isinstance(key, bool) or not isinstance(key, (int, float)):
+            raise ValueError(cursor)
+        return key, UUID(uuid)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+
+def encode_sync_token(xid: int, uuid: Optional[UUID], issued_at: datetime) -> str:
+    """
+    Sync token of GET /tasks/changes: where the client stands in the
+    (transaction id, uuid) order of changes, and when its sync began.
+
+    Args:
+        xid (int): change_xid or deleted_xid of the last change received,
+            or the snapshot xmin once the client has caught up
+        uuid (UUID | None): uuid of the task of that last change; None when
+            every change from xid on is still to come
+        issued_at (datetime): database time the sync began, for expiry
+
+    Returns:
+        str: url-safe token string
+    """
+    return _encode(["sync", xid, str(uuid) if uuid is not None else None, issued_at.isoformat()])
+
+
+def decode_sync_token(token: str) -> tuple[int, Optional[UUID], datetime]:
+    """
+    Reverses encode_sync_token.
+
+    Raises:
+        HTTPException: 400 when the token was not produced by encode_sync_token
+
+    Returns:
+        tuple[int, UUID | None, datetime]: the (xid, uuid, issued_at) of the token
+    """
+    try:
+        kind, xid, uuid, issued_at = _decode(token)
+        if kind != "sync" or not isinstance(xid, int):
+            raise ValueError(token)
+        return xid, UUID(uuid) if uuid is not None else None, datetime.fromisoformat(issued_at)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync token")
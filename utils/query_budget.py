@@ -0,0 +1,96 @@
+import logging
+import threading
+from collections import Counter
+from contextlib import ContextDecorator
+from typing import Callable, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable)
+
+_active: list["QueryCounter"] = []
+_active_lock = threading.Lock()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _count(conn, cursor, statement, parameters, context, executemany):
+    if _active:
+        with _active_lock:
+            for counter in _active:
+                counter.statements.append(statement)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter(ContextDecorator):
+    """
+    Records every SQL statement run on any engine while active. Works as a
+    context manager or decorator; with max_queries it fails on exit when
+    more statements ran, listing them:
+
+        with QueryCounter(max_queries=2):
+            client.get("/api/v1/tasks/", headers=auth)
+
+    It counts process-wide rather than per request, so requests made from
+    a TestClient (which runs the app in another thread) are included.
+    """
+
+    def __init__(self, max_queries: Optional[int] = None):
+        self.max_queries = max_queries
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self) -> "QueryCounter":
+        self.statements = []
+        with _active_lock:
+            _active.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        with _active_lock:
+            _active.remove(self)
+        if exc_type is None and self.max_queries is not None and self.count > self.max_queries:
+            listing = "\n".join(f"  {i}. {statement}" for i, statement in enumerate(self.statements, 1))
+            raise QueryBudgetExceeded(f"{self.count} queries, budget is {self.max_queries}:\n{listing}")
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """
+    Declares how many SQL statements a route may issue per request,
+    dependencies (such as resolving the current user) included. The
+    endpoint is returned unchanged; MetricsMiddleware checks the budget
+    after each request.
+    """
+    def decorate(endpoint: F) -> F:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+
+    return decorate
+
+
+def check_request(endpoint: Optional[Callable], route: str, queries: int, statements: Optional[Counter],
+                  repeat_threshold: int) -> bool:
+    """
+    Logs a request that went over its route's query budget and, when
+    statements were collected (DEBUG_MODE), any statement run
+    repeat_threshold or more times, the usual sign of an N+1. Returns
+    whether the budget was exceeded.
+    """
+    if statements:
+        for statement, times in statements.items():
+            if times >= repeat_threshold:
+                logger.warning("Possible N+1 on %s: statement ran %d times: %s", route, times, statement)
+
+    budget = getattr(endpoint, "__query_budget__", None)
+    if budget is not None and queries > budget:
+        logger.warning("Query budget exceeded on %s: %d queries, budget is %d", route, queries, budget)
+        return True
+    return False
@@ -0,0 +1,210 @@
+import hashlib
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from fastapi import HTTPException, Request, status
+from redis.exceptions import NoScriptError, RedisError
+
+from core.config import Config
+from db.redis import redis_client
+
+# Sliding-window log: one sorted set of request timestamps (ms) per key.
+# KEYS are the limits' keys; ARGV[1] is a unique request id, followed by
+# limit and window (ms) of each key. Either every limit admits the request
+# and it is recorded under all of them, or nothing is written and the
+# script returns how many ms until every limit would admit it.
+_SLIDING_WINDOW = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local retry = 0
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[2 * i])
+    local window = tonumber(ARGV[2 * i + 1])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    local count = redis.call('ZCARD', key)
+    if count >= limit then
+        local freeing = redis.call('ZRANGE', key, count - limit, count - limit, 'WITHSCORES')
+        retry = math.max(retry, tonumber(freeing[2]) + window - now)
+    end
+end
+if retry > 0 then
+    return retry
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[1])
+    redis.call('PEXPIRE', key, ARGV[2 * i + 1])
+end
+return 0
+"""
+_SLIDING_WINDOW_SHA = hashlib.sha1(_SLIDING_WINDOW.encode()).hexdigest()
+
+
+class RateLimit(NamedTuple):
+    """At most limit requests per window seconds for each value of key(request)."""
+
+    name: str
+    limit: int
+    window: int
+    key: Callable[[Request], Awaitable[Optional[str]]]
+
+
+class TokenBucket:
+    """
+    In-process token buckets, used while Redis is unreachable. Each key
+    holds up to limit tokens, refilled at limit per window, so bursts and
+    sustained rates match the Redis limit per worker. Buckets are kept in a
+    bounded LRU; an evicted key starts again with a full bucket.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _tokens(self, key: str, limit: int, window: int, now: float) -> float:
+        entry = self._buckets.get(key)
+        if entry is None:
+            return float(limit)
+        tokens, updated = entry
+        return min(float(limit), tokens + (now - updated) * limit / window)
+
+    def hit(self, keys: list[tuple[str, int, int]]) -> float:
+        """Takes a token from every (key, limit, window) bucket, or from none; returns seconds to wait, 0 if admitted."""
+
+        now = time.monotonic()
+        with self._lock:
+            tokens = [self._tokens(key, limit, window, now) for key, limit, window in keys]
+            retry = max(
+                ((1 - available) * window / limit for available, (_, limit, window) in zip(tokens, keys) if available < 1),
+                default=0.0,
+            )
+            if retry:
+                return retry
+            for available, (key, _, _) in zip(tokens, keys):
+                self._buckets[key] = (available - 1, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return 0.0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RateLimiter:
+    """
+    Fixed-count sliding-window limits enforced in Redis with one atomic
+    script call per request, whatever the number of limits checked.
+
+    When Redis fails (or its circuit breaker is open) the same limits are
+    enforced per worker from in-process token buckets, so an outage
+    loosens limits by at most the number of workers instead of lifting
+    them.
+    """
+
+    PREFIX = "rate_limit"
+
+    def __init__(self):
+        self.local = TokenBucket(Config.RATE_LIMIT_LOCAL_KEYS)
+        self.allowed = 0
+        self.limited = 0
+        self.fallbacks = 0
+
+    async def _redis_hit(self, keys: list[tuple[str, int, int]]) -> float:
+        args = [uuid.uuid4().hex]
+        for _, limit, window in keys:
+            args.extend((limit, window * 1000))
+        names = [key for key, _, _ in keys]
+        try:
+            retry_ms = await redis_client.evalsha(_SLIDING_WINDOW_SHA, len(names), *names, *args)
+        except NoScriptError:
+            # First call since Redis started: EVAL loads the script into its cache
+            retry_ms = await redis_client.eval(_SLIDING_WINDOW, len(names), *names, *args)
+        return int(retry_ms) / 1000
+
+    async def hit(self, keys: list[tuple[str, int, int]]) -> float:
+        """Records a request against every (key, limit, window); returns seconds to wait, 0 if admitted."""
+
+        keys = [(f"{self.PREFIX}:{key}", limit, window) for key, limit, window in keys]
+        try:
+            retry = await self._redis_hit(keys)
+        except RedisError:
+            self.fallbacks += 1
+            retry = self.local.hit(keys)
+        if retry:
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return retry
+
+    def stats(self) -> dict:
+        return {
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "fallbacks": self.fallbacks,
+            "local_keys": len(self.local),
+        }
+
+
+rate_limiter = RateLimiter()
+
+
+async def client_ip(request: Request) -> Optional[str]:
+    """
+    The peer address. Behind a reverse proxy, run uvicorn with
+    --proxy-headers (and --forwarded-allow-ips) so this is the client's.
+    """
+    return request.client.host if request.client else None
+
+
+def body_field(name: str) -> Callable[[Request], Awaitable[Optional[str]]]:
+    """Keys on a string field of the JSON body, case-insensitively, e.g. the email being logged into."""
+
+    async def key(request: Request) -> Optional[str]:
+        try:
+            # Already parsed by FastAPI for the endpoint; this reads the cached copy
+            body = await request.json()
+        except ValueError:
+            return None
+        value = body.get(name) if isinstance(body, dict) else None
+        return value.strip().lower()[:320] if isinstance(value, str) else None
+
+    return key
+
+
+def rate_limit(*limits: RateLimit) -> Callable[[Request], Awaitable[None]]:
+    """
+    A route dependency enforcing limits; a request over any of them gets a
+    429 with Retry-After (rendered by the app's HTTPException handler) and
+    does not count against the others. Limits whose key is None for a
+    request are skipped.
+
+        @router.post("/login", dependencies=[Depends(rate_limit(
+            RateLimit("login:ip", 30, 60, client_ip),
+        ))])
+    """
+
+    async def check(request: Request) -> None:
+        if not Config.RATE_LIMIT_ENABLED:
+            return
+        keys = []
+        for limit in limits:
+            value = await limit.key(request)
+            if value is not None:
+                keys.append((f"{limit.name}:{value}", limit.limit, limit.window))
+        if not keys:
+            return
+        retry = await rate_limiter.hit(keys)
+        if retry:
+            retry_after = max(1, math.ceil(retry))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Too many requests, retry in {retry_after} seconds",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+    return check
@@ -1,37 +1,71 @@
 from typing import Any, Dict, List, Optional, Union
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from pydantic_core import to_json
 
-from schema.response import ResponseSchemas
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    JSONResponse that serializes with pydantic-core in a single pass.
+
+    The content may mix plain dicts/lists with pydantic models, UUIDs,
+    datetimes and enums; everything is written straight to JSON bytes
+    without an intermediate model_dump or jsonable_encoder walk. The output
+    matches what JSONResponse produced from jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
 
 
 def success_response(
-    data: Optional[Union[Dict[str, Any], List[Any]]] = None, message: str = "Request Successful", status_code: int = 200
+    data: Optional[Union[Dict[str, Any], List[Any], BaseModel]] = None, message: str = "Request Successful", status_code: int = 200
 ) -> JSONResponse:
     """
      Returns a success response with the given data and message.
 
     Args:
-        data (Any, optional): Defaults to None.
+        data (Any, optional): dict, list or pydantic model. Defaults to None.
         message (str):  Defaults to "Success".
         status_code (int, optional):  Defaults to 200.
 
     Returns:
         JSONResponse: it's a dict format with status, message, and data.
     """
-    response = ResponseSchemas(
-        status="success",
-        message=message,
-        data=data,
-        errors=None,
-    )
-    return JSONResponse(content=jsonable_encoder(response.model_dump()), status_code=status_code)
+    content = {
+        "status": "success",
+        "message": message,
+        "data": data,
+        "errors": None,
+    }
+    return PydanticJSONResponse(content=content, status_code=status_code)
+
+
+def success_json_response(
+    data: bytes, message: str = "Request Successful", status_code: int = 200, headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Same envelope as success_response, for a data payload that is already
+    serialized (e.g. read from a cache). The bytes are spliced in as-is.
+
+    Args:
+        data (bytes): JSON encoded payload
+        message (str):  Defaults to "Success".
+        status_code (int, optional):  Defaults to 200.
+        headers (Dict[str, str], optional): Extra response headers. Defaults to None.
+
+    Returns:
+        Response: application/json response with status, message, and data.
+    """
+    content = b'{"status":"success","message":' + to_json(message) + b',"data":' + data + b',"errors":null}'
+    return Response(content=content, status_code=status_code, headers=headers, media_type="application/json")
 
 
 def error_response(
     message: str = "An internal server error occurred",
     status_code: int = 500,
     errors: Any = None,
+    headers: Optional[Dict[str, str]] = None,
 ) -> JSONResponse:
     """
     Returns an error response with the given message and errors.
@@ -40,11 +74,15 @@ def error_response(
         message(str): The error message. Defaults to 'An internal server error occurred'
         status_code (int, optional): The HTTP status code. Defaults to 500.
         errors (Any, optional): Additional error details. Defaults to None.
+        headers (Dict[str, str], optional): Extra response headers, e.g. Retry-After. Defaults to None.
 
     Returns:
         JSONResponse: A JSON response containing the error details.
     """
-    response = ResponseSchemas(
-        status="error", message=message, data=None, errors=errors
-    )
-    return JSONResponse(content=jsonable_encoder(response.model_dump()), status_code=status_code)
+    content = {
+        "status": "error",
+        "message": message,
+        "data": None,
+        "errors": errors,
+    }
+    return PydanticJSONResponse(content=content, status_code=status_code, headers=headers)